@@ -0,0 +1,45 @@
+"""
+Benchmarks of saving wavefunction data with each storage backend.
+"""
+
+import os
+import shutil
+from pathlib import Path
+
+from .common import GRIDS, make_params, make_wavefunction, system_module
+
+
+class SaveWavefunction:
+    """Times saving a frame of a 2D spin-1 wavefunction, in real or Fourier
+    space.
+    """
+
+    params = (["hdf5", "zarr", "memmap"], [False, True])
+    param_names = ["backend", "fourier"]
+
+    def setup(self, backend, fourier):
+        if backend == "zarr":
+            try:
+                import zarr  # type: ignore # noqa: F401
+            except ImportError:
+                raise NotImplementedError("zarr is not installed")
+        module = system_module("spinone")
+        params = make_params("spinone")
+        self.wfn = make_wavefunction("spinone", GRIDS["2D"], params)
+        self.data_path = f"benchmark_data_{os.getpid()}"
+        Path(self.data_path).mkdir(exist_ok=True)
+        self.data = module.DataManager(
+            "data.hdf5",
+            self.data_path,
+            self.wfn,
+            params,
+            backend=backend,
+            fourier=fourier,
+        )
+
+    def teardown(self, backend, fourier):
+        self.data.close()
+        shutil.rmtree(self.data_path, ignore_errors=True)
+
+    def time_save_wavefunction(self, backend, fourier):
+        self.data.save_wavefunction(self.wfn)
@@ -0,0 +1,78 @@
+"""
+Benchmarks of the time evolution and Fourier transforms of every system, on
+1D, 2D and 3D grids. The array backend (NumPy or CuPy) is the one PyGPE
+uses, i.e. the one installed in the benchmark environment or set by
+`PYGPE_BACKEND`.
+"""
+
+from .common import (
+    GRIDS,
+    SYSTEMS,
+    make_params,
+    make_wavefunction,
+    synchronise,
+    system_module,
+)
+
+
+class StepWavefunction:
+    """Times a single time step in real and imaginary time, which also
+    renormalises the wavefunction.
+    """
+
+    params = (SYSTEMS, list(GRIDS), ["real", "imaginary"])
+    param_names = ["system", "grid", "time"]
+
+    def setup(self, system, grid, time):
+        self.step = system_module(system).step_wavefunction
+        self.params_ = make_params(system, time)
+        self.wfn = make_wavefunction(system, GRIDS[grid], self.params_)
+        self.step(self.wfn, self.params_)  # Warm-up, e.g. FFT plans
+        synchronise()
+
+    def time_step_wavefunction(self, system, grid, time):
+        self.step(self.wfn, self.params_)
+        synchronise()
+
+
+class FourierTransform:
+    """Times the Fourier transforms of all components of a wavefunction."""
+
+    params = (SYSTEMS, list(GRIDS))
+    param_names = ["system", "grid"]
+
+    def setup(self, system, grid):
+        self.wfn = make_wavefunction(system, GRIDS[grid], make_params(system))
+        synchronise()
+
+    def time_fft(self, system, grid):
+        self.wfn.fft()
+        synchronise()
+
+    def time_ifft(self, system, grid):
+        self.wfn.ifft()
+        synchronise()
+
+
+class Evolution:
+    """Times a short production-like run of 100 time steps in 2D, as a macro
+    benchmark, and records its peak memory.
+    """
+
+    params = SYSTEMS
+    param_names = ["system"]
+    timeout = 300
+
+    def setup(self, system):
+        self.step = system_module(system).step_wavefunction
+        self.params_ = make_params(system)
+        self.wfn = make_wavefunction(system, GRIDS["2D"], self.params_)
+
+    def time_100_steps(self, system):
+        for _ in range(100):
+            self.step(self.wfn, self.params_)
+        synchronise()
+
+    def peakmem_100_steps(self, system):
+        for _ in range(100):
+            self.step(self.wfn, self.params_)
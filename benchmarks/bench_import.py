@@ -0,0 +1,30 @@
+"""
+Benchmarks of the time to import PyGPE in a fresh interpreter, e.g. the
+start-up cost of every worker of an ensemble. Each benchmark returns the code
+asv times in a new process.
+"""
+
+
+def timeraw_import_scalar():
+    return "import pygpe.scalar"
+
+
+def timeraw_import_spintwo():
+    return "import pygpe.spintwo"
+
+
+def timeraw_import_all_systems():
+    return "import pygpe.scalar, pygpe.spinhalf, pygpe.spinone, pygpe.spintwo"
+
+
+def timeraw_import_and_step():
+    # Includes resolving the array backend on the first step
+    return """
+        from pygpe.shared.grid import Grid
+        import pygpe.scalar as gpe
+
+        grid = Grid((64, 64), (0.5, 0.5))
+        psi = gpe.ScalarWavefunction(grid)
+        psi.set_wavefunction(grid.x_mesh * 0 + 1.0)
+        gpe.step_wavefunction(psi, {"g": 1.0, "trap": 0.0, "dt": 1e-2})
+    """
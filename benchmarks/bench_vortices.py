@@ -0,0 +1,27 @@
+"""
+Benchmarks of the generation of vortex phase profiles.
+"""
+
+import contextlib
+import io
+
+from pygpe.shared.grid import Grid
+from pygpe.shared.vortices import vortex_phase_profile
+
+from .common import synchronise
+
+
+class VortexPhaseProfile:
+    """Times the phase profile of a number of randomly placed vortices."""
+
+    params = [10, 100]
+    param_names = ["num_vortices"]
+
+    def setup(self, num_vortices):
+        self.grid = Grid((256, 256), (0.5, 0.5))
+
+    def time_vortex_phase_profile(self, num_vortices):
+        # Silences the progress messages of the position search
+        with contextlib.redirect_stdout(io.StringIO()):
+            vortex_phase_profile(self.grid, num_vortices, 1.0)
+        synchronise()
@@ -0,0 +1,64 @@
+"""
+Helpers shared by the benchmarks, constructing a noisy wavefunction and the
+matching parameters of each system on grids of each dimension.
+"""
+
+import importlib
+
+from pygpe.shared.backend import cp, synchronise
+from pygpe.shared.grid import Grid
+
+SYSTEMS = ["scalar", "spinhalf", "spinone", "spintwo"]
+
+# Grids of comparable size in each dimension
+GRIDS = {
+    "1D": Grid(65536, 0.5),
+    "2D": Grid((256, 256), (0.5, 0.5)),
+    "3D": Grid((64, 64, 64), (0.5, 0.5, 0.5)),
+}
+
+PARAMS = {
+    "scalar": {"g": 1.0},
+    "spinhalf": {"g_plus": 1.0, "g_minus": 1.0, "g_pm": 0.5},
+    "spinone": {"c0": 10.0, "c2": -0.5, "p": 0.0, "q": 0.5},
+    "spintwo": {"c0": 10.0, "c2": 0.5, "c4": 1.0, "p": 0.0, "q": 0.5},
+}
+
+
+def system_module(system: str):
+    """Returns the package of the system, e.g. `pygpe.spinone`."""
+    return importlib.import_module(f"pygpe.{system}")
+
+
+def make_params(system: str, time: str = "real") -> dict:
+    """Returns the parameters of the system, evolving in real or imaginary
+    time.
+    """
+    dt = 1e-3 if time == "real" else -1j * 1e-3
+    return {**PARAMS[system], "n0": 1.0, "trap": 0.0, "dt": dt, "t": 0.0}
+
+
+def make_wavefunction(system: str, grid: Grid, params: dict):
+    """Returns a uniform wavefunction of the system with added noise, whose
+    Fourier-space components are up-to-date.
+    """
+    module = system_module(system)
+    if system == "scalar":
+        wfn = module.ScalarWavefunction(grid)
+        wfn.set_wavefunction(cp.ones(grid.shape, dtype="complex128"))
+        wfn.add_noise(0.0, 1e-2)
+    elif system == "spinhalf":
+        wfn = module.SpinHalfWavefunction(grid)
+        component = cp.ones(grid.shape, dtype="complex128") / 2**0.5
+        wfn.set_wavefunction(component, component.copy())
+        wfn.add_noise("all", 0.0, 1e-2)
+    elif system == "spinone":
+        wfn = module.SpinOneWavefunction(grid)
+        wfn.set_ground_state("polar", params)
+        wfn.add_noise("all", 0.0, 1e-2)
+    else:
+        wfn = module.SpinTwoWavefunction(grid)
+        wfn.set_ground_state("UN", params)
+        wfn.add_noise("all", 0.0, 1e-2)
+    wfn.fft()
+    return wfn
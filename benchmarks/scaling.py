@@ -0,0 +1,348 @@
+"""
+Strong and weak scaling study of representative workloads, used to choose the
+most efficient number of cores per job and to tell when a workload is limited
+by memory bandwidth::
+
+    python -m benchmarks.scaling --threads 1 2 4 --processes 1 2 4 8 \\
+        --sizes 128 256 512 --output scaling.json
+
+Workloads follow `examples/`: the decay of a vortex dipole in a dissipative
+scalar condensate and the imprinting of vortices in a spin-1 polar
+condensate, in imaginary time. Each measurement runs in fresh worker
+processes, so that thread counts are applied before NumPy is imported:
+
+- Thread scaling (strong scaling): a single process on `threads` threads.
+  Note that NumPy's FFTs and element-wise operations are single-threaded, so
+  threads only affect the BLAS/OpenMP pools; CuPy ignores the thread count.
+- Process scaling (weak scaling): `processes` identical, independent
+  simulations running at once, as for an ensemble of realisations.
+
+Throughput is reported in grid-point updates per second, i.e. the number of
+grid points times the time steps per second, summed over processes. Parallel
+efficiency is the throughput per core relative to a single core on the same
+grid. The achieved bandwidth counts each component being read and written
+once in each of the five passes of a split-step (two kinetic half-steps, the
+interaction step and two FFTs), plus the renormalisation in imaginary time,
+so it is a lower bound of the actual memory traffic. It is compared with a
+STREAM-like copy baseline, measured on the same number of processes.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+WORKLOADS = ["scalar_dipole", "spinone_sqv"]
+
+# Environment variables controlling the size of the threading pools
+THREAD_VARIABLES = [
+    "OMP_NUM_THREADS",
+    "OPENBLAS_NUM_THREADS",
+    "MKL_NUM_THREADS",
+    "NUMEXPR_NUM_THREADS",
+]
+
+
+def _build_workload(workload: str, size: int):
+    """Returns the wavefunction, parameters and step function of a workload
+    on a `size` x `size` grid.
+    """
+    from pygpe.shared.backend import cp
+
+    from pygpe.shared.grid import Grid
+    from pygpe.shared.vortices import add_dipole_pair, vortex_phase_profile
+
+    grid = Grid((size, size), (0.5, 0.5))
+    if workload == "scalar_dipole":
+        from pygpe.scalar import ScalarWavefunction, step_wavefunction
+
+        params = {"g": 1, "trap": 0, "dt": 1e-2, "t": 0, "gamma": 0.01}
+        wfn = ScalarWavefunction(grid)
+        wfn.set_wavefunction(cp.ones(grid.shape, dtype="complex128"))
+        wfn.add_noise(mean=0.0, std_dev=1e-2)
+        wfn.apply_phase(add_dipole_pair(grid, 2.0))
+    elif workload == "spinone_sqv":
+        from pygpe.spinone import SpinOneWavefunction, step_wavefunction
+
+        params = {
+            "c0": 10,
+            "c2": 0.5,
+            "p": 0.0,
+            "q": 0.0,
+            "trap": 0.0,
+            "n0": 1,
+            "dt": -1j * 1e-2,
+            "t": 0,
+        }
+        wfn = SpinOneWavefunction(grid)
+        wfn.set_ground_state("polar", params)
+        wfn.add_noise("outer", 0.0, 1e-2)
+        # The vortex density of the example, i.e. 100 vortices on 512^2 points
+        wfn.apply_phase(vortex_phase_profile(grid, max(1, 100 * size**2 // 512**2), 1))
+    else:
+        raise ValueError(f"Workload {workload} is unsupported")
+    wfn.fft()
+    return wfn, params, step_wavefunction
+
+
+def _bytes_per_step(wfn, params: dict) -> int:
+    """Returns the memory traffic of a time step, counting each component
+    read and written once per pass, in bytes.
+    """
+    accesses = 10  # Five passes, each reading and writing the components
+    if isinstance(params["dt"], complex) or params.get("gamma", 0) != 0:
+        accesses += 7  # Renormalisation: ifft, atom number, rescaling and fft
+    components = [
+        value
+        for name, value in vars(wfn).items()
+        if name.startswith("fourier_") and hasattr(value, "nbytes")
+    ]
+    return accesses * sum(component.nbytes for component in components)
+
+
+def _stream_copy(num_bytes: int, repeats: int = 10) -> float:
+    """Returns the best bandwidth, in bytes per second, of copying an array of
+    `num_bytes`, counting the read and the write.
+    """
+    from pygpe.shared.backend import cp, synchronise
+
+    source = cp.ones(num_bytes // 8)
+    target = cp.empty_like(source)
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        cp.copyto(target, source)
+        synchronise()
+        best = min(best, time.perf_counter() - start)
+    return 2 * source.nbytes / best
+
+
+def _run_worker(args: argparse.Namespace) -> None:
+    """Runs a single measurement, once the parent process signals all workers
+    to start at the same time, printing its result as JSON.
+    """
+    from pygpe.shared.backend import synchronise
+
+    if args.mode == "stream":
+        print("ready", flush=True)
+        sys.stdin.readline()
+        print(json.dumps({"bandwidth": _stream_copy(args.stream_bytes)}))
+        return
+
+    wfn, params, step = _build_workload(args.workload, args.size)
+    for _ in range(args.warmup):
+        step(wfn, params)
+    synchronise()
+    print("ready", flush=True)
+    sys.stdin.readline()
+
+    start = time.perf_counter()
+    for _ in range(args.steps):
+        step(wfn, params)
+    synchronise()
+    elapsed = time.perf_counter() - start
+    print(
+        json.dumps(
+            {
+                "elapsed": elapsed,
+                "points": args.size**2,
+                "bytes_per_step": _bytes_per_step(wfn, params),
+            }
+        )
+    )
+
+
+def _launch(worker_args: list[str], threads: int, processes: int) -> list[dict]:
+    """Runs `processes` workers at once, each using `threads` threads, and
+    returns their results.
+    """
+    env = {**os.environ, **{name: str(threads) for name in THREAD_VARIABLES}}
+    command = [sys.executable, "-m", "benchmarks.scaling", "--worker", *worker_args]
+    workers = [
+        subprocess.Popen(
+            command,
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            text=True,
+            env=env,
+        )
+        for _ in range(processes)
+    ]
+    for worker in workers:
+        # Skips any output of the workload setup, e.g. of vortex placement
+        for line in worker.stdout:
+            if line.strip() == "ready":
+                break
+        else:
+            raise RuntimeError(f"Worker failed to start: {' '.join(command)}")
+    for worker in workers:  # Start all workers together
+        worker.stdin.write("go\n")
+        worker.stdin.flush()
+
+    results = []
+    for worker in workers:
+        output, _ = worker.communicate()
+        if worker.returncode != 0:
+            raise RuntimeError(f"Worker failed: {' '.join(command)}")
+        results.append(json.loads(output.strip().splitlines()[-1]))
+    return results
+
+
+def measure_stream(processes: int, num_bytes: int) -> float:
+    """Returns the total copy bandwidth, in bytes per second, of `processes`
+    processes copying arrays at the same time.
+    """
+    results = _launch(
+        ["--mode", "stream", "--stream-bytes", str(num_bytes)], 1, processes
+    )
+    return sum(result["bandwidth"] for result in results)
+
+
+def measure(
+    workload: str,
+    size: int,
+    threads: int,
+    processes: int,
+    steps: int,
+    warmup: int = 5,
+) -> dict:
+    """Measures the throughput of `processes` simultaneous simulations of
+    `workload` on a `size` x `size` grid, each using `threads` threads.
+
+    :return: The throughput, in grid-point updates per second, and the
+        achieved bandwidth, in bytes per second, summed over processes.
+    :rtype: dict
+    """
+    results = _launch(
+        [
+            "--workload",
+            workload,
+            "--size",
+            str(size),
+            "--steps",
+            str(steps),
+            "--warmup",
+            str(warmup),
+        ],
+        threads,
+        processes,
+    )
+    # Throughput over the span of the slowest process
+    elapsed = max(result["elapsed"] for result in results)
+    return {
+        "workload": workload,
+        "size": size,
+        "threads": threads,
+        "processes": processes,
+        "cores": threads * processes,
+        "updates_per_second": processes * steps * results[0]["points"] / elapsed,
+        "bandwidth": processes * steps * results[0]["bytes_per_step"] / elapsed,
+    }
+
+
+def scaling_study(
+    workloads: list[str],
+    sizes: list[int],
+    threads: list[int],
+    processes: list[int],
+    steps: int = 50,
+    stream_bytes: int = 2**28,
+) -> list[dict]:
+    """Measures every workload and grid size on each number of threads, with a
+    single process, and each number of processes, with a single thread.
+
+    :return: One record per measurement, with the parallel efficiency and the
+        fraction of the STREAM-like bandwidth achieved.
+    :rtype: list[dict]
+    """
+    stream = {n: measure_stream(n, stream_bytes) for n in sorted({1, *processes})}
+    configurations = sorted(
+        {(n, 1) for n in threads} | {(1, n) for n in processes} | {(1, 1)}
+    )
+
+    records = []
+    for workload in workloads:
+        for size in sizes:
+            baseline = None
+            for num_threads, num_processes in configurations:
+                record = measure(workload, size, num_threads, num_processes, steps)
+                if baseline is None:  # The single-core run comes first
+                    baseline = record["updates_per_second"]
+                record["updates_per_core"] = (
+                    record["updates_per_second"] / record["cores"]
+                )
+                record["efficiency"] = record["updates_per_core"] / baseline
+                record["stream_bandwidth"] = stream[num_processes]
+                record["bandwidth_fraction"] = (
+                    record["bandwidth"] / stream[num_processes]
+                )
+                records.append(record)
+                _print_record(record)
+    return records
+
+
+def _print_header() -> None:
+    print(
+        f"{'workload':<14}{'grid':>7}{'thr':>5}{'proc':>5}{'GPUPS':>11}"
+        f"{'per core':>11}{'eff':>7}{'GB/s':>8}{'STREAM':>8}"
+    )
+
+
+def _print_record(record: dict) -> None:
+    print(
+        f"{record['workload']:<14}{record['size']:>7}{record['threads']:>5}"
+        f"{record['processes']:>5}{record['updates_per_second']:>11.3e}"
+        f"{record['updates_per_core']:>11.3e}{record['efficiency']:>7.2f}"
+        f"{record['bandwidth'] / 1e9:>8.2f}{record['bandwidth_fraction']:>8.0%}",
+        flush=True,
+    )
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Strong and weak scaling study of pygpe workloads."
+    )
+    parser.add_argument("--workloads", nargs="+", choices=WORKLOADS, default=WORKLOADS)
+    parser.add_argument(
+        "--sizes", nargs="+", type=int, default=[128, 256, 512], help="grid sides"
+    )
+    parser.add_argument("--threads", nargs="+", type=int, default=[1, 2, 4])
+    parser.add_argument(
+        "--processes", nargs="+", type=int, default=[1, 2, 4, os.cpu_count()]
+    )
+    parser.add_argument("--steps", type=int, default=50, help="timed steps")
+    parser.add_argument(
+        "--stream-bytes",
+        type=int,
+        default=2**28,
+        help="size of the arrays copied by the bandwidth baseline",
+    )
+    parser.add_argument("--output", help="JSON file the results are written to")
+    # Options of the worker processes
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--mode", default="workload", help=argparse.SUPPRESS)
+    parser.add_argument("--workload", help=argparse.SUPPRESS)
+    parser.add_argument("--size", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--warmup", type=int, default=5, help=argparse.SUPPRESS)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = _parse_args()
+    if args.worker:
+        _run_worker(args)
+    else:
+        _print_header()
+        records = scaling_study(
+            args.workloads,
+            args.sizes,
+            args.threads,
+            args.processes,
+            args.steps,
+            args.stream_bytes,
+        )
+        if args.output is not None:
+            with open(args.output, "w") as file:
+                json.dump(records, file, indent=2)
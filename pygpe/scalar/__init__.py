@@ -1,6 +1,8 @@
 from . import data_manager
+from . import data_reader
 from . import evolution
 from . import wavefunction
 from .data_manager import *
+from .data_reader import *
 from .evolution import *
 from .wavefunction import *
@@ -0,0 +1,58 @@
+import numpy as np
+
+from pygpe.shared.backend import cp
+from pygpe.shared.data_reader import _DataReader
+from pygpe.scalar.data_manager import DataManager
+from pygpe.scalar.wavefunction import ScalarWavefunction
+
+
+class DataReader(_DataReader):
+    """This object reads the data of a saved simulation, including the
+    wavefunction, grid, and parameter data.
+    Frames are read lazily from the file when indexed or iterated over.
+
+    :param filename: The name of the data file.
+    :type filename: str
+    :param data_path: The relative path to the folder containing the data file.
+    :type data_path: str
+    :param realisation: The realisation to read from a file combining several
+        shards. By default, frames contain all realisations.
+    :type realisation: int, optional
+    :param swmr: If True, a HDF5 file is read in single-writer/multiple-reader
+        mode, so a file still being written by a simulation can be followed
+        with :meth:`tail`.
+    :type swmr: bool
+
+    :ivar grid: The grid of the saved frames, which is a sub-grid of
+        `full_grid` if only part of the grid was saved.
+    :ivar full_grid: The grid of the saved simulation.
+    :ivar origin: The coordinates of the first point of the saved frames.
+    :ivar params: The parameters of the saved simulation.
+    :ivar num_frames: The number of saved frames.
+    :ivar frame_table: The table of the step, simulation time, wall time,
+        atom numbers and, if recorded, energy of each saved frame.
+    :ivar times: The simulation time of each saved frame.
+    :ivar observables: The names of the saved observables.
+    :ivar pyramid_levels: The saved levels of the density pyramid.
+    """
+
+    _components = DataManager._components
+
+    _observables = DataManager._observables
+
+    def __init__(
+        self,
+        filename: str,
+        data_path: str,
+        realisation: int | None = None,
+        swmr: bool = False,
+    ):
+        """Constructs the DataReader object."""
+        super().__init__(filename, data_path, realisation, swmr)
+
+    def _build_wavefunction(self, frame: dict[str, np.ndarray]) -> ScalarWavefunction:
+        """Constructs a scalar wavefunction from a single frame."""
+        wfn = ScalarWavefunction(self.grid)
+        wfn.set_wavefunction(cp.array(frame["component"]))
+        wfn.fft()
+        return wfn
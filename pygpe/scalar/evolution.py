@@ -1,8 +1,6 @@
-try:
-    import cupy as cp  # type: ignore
-except ImportError:
-    import numpy as cp
+from pygpe.shared.backend import cp
 from pygpe.scalar.wavefunction import ScalarWavefunction
+from pygpe.shared.spectral import _kinetic_energy
 
 
 def step_wavefunction(wfn: ScalarWavefunction, params: dict) -> None:
@@ -68,3 +66,20 @@ def _calculate_atom_num(wfn: ScalarWavefunction) -> float:
     :return: The atom number.
     """
     return wfn.grid.grid_spacing_product * cp.sum(cp.abs(wfn.component) ** 2)
+
+
+def _calculate_energy(wfn: ScalarWavefunction, pm: dict) -> float:
+    """Calculates the total energy of the system. Both the real-space and
+    Fourier-space components must be up-to-date.
+
+    :param wfn: The wavefunction of the system.
+    :param pm: The parameters' dictionary.
+    :return: The total energy.
+    """
+    kinetic = _kinetic_energy(wfn.grid, [wfn.fourier_component])
+    dens = cp.abs(wfn.component) ** 2
+    potential = wfn.grid.grid_spacing_product * cp.sum(
+        pm["trap"] * dens + pm["g"] / 2 * dens**2
+    )
+
+    return kinetic + float(potential)
@@ -0,0 +1,73 @@
+"""
+The array backend and the lazily imported dependencies of PyGPE.
+Modules access arrays through :data:`cp`, which is CuPy if it is installed
+and NumPy otherwise, and HDF5 files through :data:`h5py`. Neither is imported
+until first used, and the array backend is resolved once per process, so
+importing PyGPE is fast, e.g. in short-lived worker processes that never
+touch the GPU or HDF5 files.
+
+The array backend can be chosen with the `PYGPE_BACKEND` environment
+variable, e.g. `PYGPE_BACKEND=numpy` runs on the CPU without importing CuPy.
+"""
+
+import importlib
+import os
+from types import ModuleType
+from typing import Callable
+
+BACKENDS = ["cupy", "numpy"]
+
+
+class _LazyModule:
+    """Stands in for a module, which is imported on first attribute access.
+    Attributes are cached once resolved, so later accesses are ordinary
+    attribute lookups.
+
+    :param load: The function importing the module.
+    """
+
+    def __init__(self, load: Callable[[], ModuleType]) -> None:
+        self._load = load
+        self._module = None
+
+    @property
+    def resolved(self) -> bool:
+        """Whether the module has been imported."""
+        return self._module is not None
+
+    def __getattr__(self, name: str):
+        if self._module is None:
+            self._module = self._load()
+        value = getattr(self._module, name)
+        setattr(self, name, value)
+        return value
+
+    def __repr__(self) -> str:
+        if self._module is None:
+            return "<lazily imported module>"
+        return repr(self._module)
+
+
+def _import_array_module() -> ModuleType:
+    """Imports the array backend, from `PYGPE_BACKEND` if it is set."""
+    name = os.environ.get("PYGPE_BACKEND")
+    if name is not None:
+        if name not in BACKENDS:
+            raise ValueError(f"PYGPE_BACKEND={name} is unsupported, use {BACKENDS}")
+        return importlib.import_module(name)
+    try:
+        return importlib.import_module("cupy")
+    except ImportError:
+        return importlib.import_module("numpy")
+
+
+cp = _LazyModule(_import_array_module)
+h5py = _LazyModule(lambda: importlib.import_module("h5py"))
+
+
+def synchronise() -> None:
+    """Waits for queued GPU work to finish, e.g. before reading a timer. Does
+    nothing on the CPU.
+    """
+    if cp.__name__ == "cupy":
+        cp.cuda.Device().synchronize()
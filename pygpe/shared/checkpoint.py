@@ -0,0 +1,275 @@
+"""
+Checkpointing and restarting of simulations.
+A checkpoint holds everything needed to resume a run: the Fourier-space
+wavefunction components, the parameters including the current time `t`, the
+random number generator state and the position of the DataManager in its
+data file. Checkpoints are written to a temporary file that is renamed over
+the previous checkpoint, so a checkpoint on disk is always complete, even if
+the process is killed while writing.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import signal
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+import pygpe.shared.data_manager_paths as dmp
+from pygpe.shared.backend import cp, h5py
+from pygpe.shared.data_manager import _DataManager, _grid_params
+from pygpe.shared.data_reader import _read_params
+from pygpe.shared.storage import HDF5Backend
+from pygpe.shared.utils import handle_array
+from pygpe.shared.wavefunction import _Wavefunction
+
+
+def _fourier_components(wfn: _Wavefunction) -> list[str]:
+    """Returns the names of the Fourier-space components of the wavefunction,
+    e.g. "fourier_plus_component".
+    """
+    return [name for name in vars(wfn) if name.startswith("fourier_")]
+
+
+def _atom_numbers(wfn: _Wavefunction) -> list[str]:
+    """Returns the names of the atom number attributes of the wavefunction,
+    which are used when re-normalising in imaginary time.
+    """
+    return [name for name in vars(wfn) if name.startswith("atom_num")]
+
+
+def save_checkpoint(
+    filename: str,
+    data_path: str,
+    wfn: _Wavefunction,
+    params: dict,
+    data_manager: _DataManager | None = None,
+    rng: np.random.Generator | None = None,
+) -> None:
+    """Atomically writes a checkpoint of the current state of the simulation.
+
+    :param filename: The name of the checkpoint file.
+    :type filename: str
+    :param data_path: The relative path to the folder of the checkpoint file.
+    :type data_path: str
+    :param wfn: The wavefunction of the system. Its Fourier-space components
+        must be up-to-date, as they are after every time step.
+    :type wfn: :class:`Wavefunction`
+    :param params: The parameters of the system, including the current time.
+    :type params: dict
+    :param data_manager: The DataManager saving the trajectory, whose
+        position in the data file is recorded.
+    :type data_manager: DataManager, optional
+    :param rng: A random number generator whose state is recorded, in
+        addition to the global NumPy random state.
+    :type rng: numpy.random.Generator, optional
+    """
+    path = Path(f"./{data_path}") / filename
+    temp_path = path.with_name(f"{path.name}.tmp")
+    if data_manager is not None:
+        # The frames before the recorded position must be on disk first
+        data_manager._backend.flush()
+
+    backend = HDF5Backend(temp_path, "w")
+    backend.write_values(_grid_params(wfn.grid))
+    backend.write_values(
+        {f"{dmp.PARAMETERS}/{key}": value for key, value in params.items()}
+    )
+    with h5py.File(temp_path, "r+") as file:
+        group = file.create_group(dmp.CHECKPOINT_WAVEFUNCTION)
+        for name in _fourier_components(wfn):
+            group.create_dataset(name, data=handle_array(getattr(wfn, name)))
+        for name in _atom_numbers(wfn):
+            group.attrs[name] = float(getattr(wfn, name))
+
+        _save_rng_state(file.create_group(dmp.CHECKPOINT_RNG), rng)
+        if data_manager is not None:
+            file.attrs[dmp.CHECKPOINT_DATA_FILE] = data_manager.filename
+            file.attrs[dmp.CHECKPOINT_TIME_INDEX] = data_manager._time_index
+
+    with open(temp_path, "rb+") as file:  # Ensure the data is on disk first
+        os.fsync(file.fileno())
+    os.replace(temp_path, path)
+
+
+def load_checkpoint(
+    filename: str,
+    data_path: str,
+    wfn: _Wavefunction,
+    rng: np.random.Generator | None = None,
+) -> tuple[dict, int | None]:
+    """Restores the state of a simulation from a checkpoint. The wavefunction
+    and random number generators are updated in place.
+
+    To continue saving the trajectory, construct the DataManager with
+    `append=True` and `time_index` set to the returned position.
+
+    :param filename: The name of the checkpoint file.
+    :type filename: str
+    :param data_path: The relative path to the folder of the checkpoint file.
+    :type data_path: str
+    :param wfn: The wavefunction to restore, on the same grid as the
+        checkpointed wavefunction.
+    :type wfn: :class:`Wavefunction`
+    :param rng: A random number generator whose state is restored, if it was
+        recorded.
+    :type rng: numpy.random.Generator, optional
+    :return: The parameters of the system and the position of the DataManager
+        in its data file, or None if no DataManager was checkpointed.
+    :rtype: tuple[dict, int | None]
+    """
+    path = Path(f"./{data_path}") / filename
+    backend = HDF5Backend(path, "r")
+    try:
+        for key, value in _grid_params(wfn.grid).items():
+            if backend.read_value(key) != value:
+                raise ValueError(f"Grid of {path} does not match the wavefunction")
+        params = _read_params(backend)
+
+        file = backend._file
+        group = file[dmp.CHECKPOINT_WAVEFUNCTION]
+        for name in group:
+            setattr(wfn, name, cp.asarray(group[name][()]))
+        for name, value in group.attrs.items():
+            setattr(wfn, name, float(value))
+        wfn.ifft()
+
+        _load_rng_state(file[dmp.CHECKPOINT_RNG], rng)
+        time_index = file.attrs.get(dmp.CHECKPOINT_TIME_INDEX)
+    finally:
+        backend.close()
+
+    return params, None if time_index is None else int(time_index)
+
+
+def _save_rng_state(group: h5py.Group, rng: np.random.Generator | None) -> None:
+    """Records the global NumPy random state and, if given, the state of a
+    random number generator. The CuPy random state cannot be recorded.
+    """
+    name, keys, position, has_gauss, cached_gaussian = np.random.get_state()
+    group.create_dataset("numpy_keys", data=keys)
+    group.attrs["numpy_bit_generator"] = name
+    group.attrs["numpy_position"] = position
+    group.attrs["numpy_has_gauss"] = has_gauss
+    group.attrs["numpy_cached_gaussian"] = cached_gaussian
+    if rng is not None:
+        group.attrs["generator_state"] = json.dumps(rng.bit_generator.state)
+
+
+def _load_rng_state(group: h5py.Group, rng: np.random.Generator | None) -> None:
+    """Restores the random states recorded by :func:`_save_rng_state`."""
+    np.random.set_state(
+        (
+            str(group.attrs["numpy_bit_generator"]),
+            group["numpy_keys"][()],
+            int(group.attrs["numpy_position"]),
+            int(group.attrs["numpy_has_gauss"]),
+            float(group.attrs["numpy_cached_gaussian"]),
+        )
+    )
+    if rng is not None and "generator_state" in group.attrs:
+        rng.bit_generator.state = json.loads(group.attrs["generator_state"])
+
+
+class Checkpointer:
+    """Writes checkpoints of a running simulation on a wall-clock interval
+    and/or when the process receives SIGTERM, as sent by schedulers before
+    preempting a job. Call :meth:`maybe_checkpoint` once per time step, which
+    is where checkpoints are written, so they always hold a consistent state.
+
+    :param filename: The name of the checkpoint file.
+    :type filename: str
+    :param data_path: The relative path to the folder of the checkpoint file.
+    :type data_path: str
+    :param wfn: The wavefunction of the system.
+    :type wfn: :class:`Wavefunction`
+    :param params: The parameters of the system, including the current time.
+    :type params: dict
+    :param data_manager: The DataManager saving the trajectory.
+    :type data_manager: DataManager, optional
+    :param interval: The wall-clock time between checkpoints, in seconds. By
+        default, checkpoints are only written on SIGTERM.
+    :type interval: float, optional
+    :param handle_sigterm: If True, SIGTERM triggers a checkpoint at the next
+        call of :meth:`maybe_checkpoint`, after which the process exits.
+        Defaults to False.
+    :type handle_sigterm: bool
+    :param rng: A random number generator whose state is recorded.
+    :type rng: numpy.random.Generator, optional
+
+    :ivar num_checkpoints: The number of checkpoints written.
+    """
+
+    def __init__(
+        self,
+        filename: str,
+        data_path: str,
+        wfn: _Wavefunction,
+        params: dict,
+        data_manager: _DataManager | None = None,
+        interval: float | None = None,
+        handle_sigterm: bool = False,
+        rng: np.random.Generator | None = None,
+    ) -> None:
+        """Constructs the Checkpointer object."""
+        self.filename = filename
+        self.data_path = data_path
+        self.wfn = wfn
+        self.params = params
+        self.data_manager = data_manager
+        self.interval = interval
+        self.rng = rng
+        self.num_checkpoints = 0
+
+        self._last_checkpoint = time.monotonic()
+        self._signal_received = None
+        self._previous_handler = None
+        if handle_sigterm:
+            self._previous_handler = signal.signal(signal.SIGTERM, self._on_signal)
+
+    def _on_signal(self, signum: int, frame) -> None:
+        """Records the signal, deferring the checkpoint to a safe point."""
+        self._signal_received = signum
+
+    def checkpoint(self) -> None:
+        """Writes a checkpoint of the current state."""
+        save_checkpoint(
+            self.filename,
+            self.data_path,
+            self.wfn,
+            self.params,
+            self.data_manager,
+            self.rng,
+        )
+        self.num_checkpoints += 1
+        self._last_checkpoint = time.monotonic()
+
+    def maybe_checkpoint(self) -> bool:
+        """Writes a checkpoint if the interval has elapsed or a SIGTERM was
+        received. After a SIGTERM, the process exits once the checkpoint is
+        written, with exit code `128 + SIGTERM`.
+
+        :return: Whether a checkpoint was written.
+        :rtype: bool
+        """
+        if self._signal_received is not None:
+            self.checkpoint()
+            self.close()
+            sys.exit(128 + self._signal_received)
+        if (
+            self.interval is not None
+            and time.monotonic() - self._last_checkpoint >= self.interval
+        ):
+            self.checkpoint()
+            return True
+        return False
+
+    def close(self) -> None:
+        """Restores the SIGTERM handler replaced by the Checkpointer."""
+        if self._previous_handler is not None:
+            signal.signal(signal.SIGTERM, self._previous_handler)
+            self._previous_handler = None
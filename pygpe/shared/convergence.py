@@ -0,0 +1,357 @@
+"""
+Convergence studies for choosing the time step, grid resolution and
+integrator of a simulation. :func:`convergence_study` evolves a scenario to a
+final time for every combination of grid, time step and integrator, and
+compares the final state with a fine reference run. The error of the
+wavefunction, its energy and its norm is reported against the wall time of
+each run, and :func:`recommend` selects the cheapest setting meeting given
+tolerances.
+
+Runs on different grids are compared spectrally, so every grid must span the
+same box, and the scenario must prepare the same continuous initial state on
+each grid, e.g. without random noise. The supported integrators are
+
+- "split-step": the second-order split-step of `step_wavefunction`.
+- "yoshida": a fourth-order composition of three split-steps, see
+  H. Yoshida, Phys. Lett. A 150, 262 (1990). The composition steps backwards
+  in time, so it only supports real-time evolution without dissipation.
+
+A study of the decay of a vortex dipole in a scalar condensate can be run
+from the command line::
+
+    python -m pygpe.shared.convergence --tolerance 1e-3
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from typing import Callable
+
+import numpy as np
+
+from pygpe.shared.backend import cp, synchronise
+from pygpe.shared.grid import Grid
+from pygpe.shared.spectral import _resample_indices
+from pygpe.shared.subgrid import _build_grid, _grid_points, _grid_spacings
+from pygpe.shared.wavefunction import _Wavefunction
+
+INTEGRATORS = ["split-step", "yoshida"]
+
+# Weights of the fourth-order composition of second-order steps
+_YOSHIDA_OUTER = 1 / (2 - 2 ** (1 / 3))
+_YOSHIDA_INNER = -(2 ** (1 / 3)) / (2 - 2 ** (1 / 3))
+
+
+def _is_dissipative(params: dict) -> bool:
+    return isinstance(params["dt"], complex) or params.get("gamma", 0) != 0
+
+
+def _integrator(
+    name: str, step: Callable[[_Wavefunction, dict], None], params: dict
+) -> Callable[[_Wavefunction, dict], None]:
+    """Returns the function advancing the wavefunction one time step with the
+    integrator `name`, built from the split-step `step`.
+    """
+    if name == "split-step":
+        return step
+    if name == "yoshida":
+        if _is_dissipative(params):
+            raise ValueError(
+                "The yoshida integrator only supports real-time evolution "
+                "without dissipation"
+            )
+
+        def yoshida_step(wfn: _Wavefunction, pm: dict) -> None:
+            dt = pm["dt"]
+            for weight in (_YOSHIDA_OUTER, _YOSHIDA_INNER, _YOSHIDA_OUTER):
+                pm["dt"] = weight * dt
+                step(wfn, pm)
+            pm["dt"] = dt
+
+        return yoshida_step
+    raise ValueError(f"Integrator {name} is unsupported, use one of {INTEGRATORS}")
+
+
+def _fourier_components(wfn: _Wavefunction) -> list[cp.ndarray]:
+    """Returns the Fourier-space components of the wavefunction, in a fixed
+    order.
+    """
+    return [
+        value
+        for name, value in sorted(vars(wfn).items())
+        if name.startswith("fourier_") and hasattr(value, "shape")
+    ]
+
+
+def _box_lengths(grid: Grid) -> tuple[float, ...]:
+    return tuple(
+        points * spacing
+        for points, spacing in zip(_grid_points(grid), _grid_spacings(grid))
+    )
+
+
+class _FinalState:
+    """The final state of a run, from which errors against the reference are
+    computed.
+
+    :ivar points: The number of points along each axis of the grid.
+    :ivar coefficients: The Fourier coefficients of each component,
+        normalised so that they are independent of the resolution.
+    :ivar energy: The total energy.
+    :ivar norm: The atom number.
+    :ivar wall_time: The wall time of the evolution, in seconds.
+    """
+
+    def __init__(
+        self,
+        wfn: _Wavefunction,
+        params: dict,
+        energy: Callable[[_Wavefunction, dict], float],
+        wall_time: float,
+    ) -> None:
+        wfn.ifft()  # Energies need up-to-date real-space components
+        self.points = _grid_points(wfn.grid)
+        self.coefficients = [
+            component / wfn.grid.total_num_points
+            for component in _fourier_components(wfn)
+        ]
+        self.energy = float(energy(wfn, params))
+        self.norm = float(
+            wfn.grid.grid_spacing_product
+            * sum(
+                cp.sum(cp.abs(component) ** 2) for component in _fourier_components(wfn)
+            )
+            / wfn.grid.total_num_points
+        )
+        self.wall_time = wall_time
+
+    def wavefunction_error(self, reference: "_FinalState") -> float:
+        """Returns the relative L2 error of the wavefunction against the
+        reference, including the reference's modes not resolved by this grid.
+        """
+        indices = tuple(
+            cp.asarray(index)
+            for index in _resample_indices(reference.points, self.points)
+        )
+        difference = 0.0
+        total = 0.0
+        for coefficients, reference_coefficients in zip(
+            self.coefficients, reference.coefficients
+        ):
+            resolved = reference_coefficients[cp.ix_(*indices)]
+            reference_power = float(cp.sum(cp.abs(reference_coefficients) ** 2))
+            difference += float(cp.sum(cp.abs(coefficients - resolved) ** 2))
+            difference += reference_power - float(cp.sum(cp.abs(resolved) ** 2))
+            total += reference_power
+        return float(np.sqrt(max(difference, 0.0) / total))
+
+
+def _run(
+    initial_state: Callable[[Grid], tuple[_Wavefunction, dict]],
+    step: Callable[[_Wavefunction, dict], None],
+    energy: Callable[[_Wavefunction, dict], float],
+    grid: Grid,
+    dt: float,
+    integrator: str,
+    final_time: float,
+) -> _FinalState:
+    """Evolves the scenario on `grid` to the final time."""
+    num_steps = round(final_time / dt)
+    if not np.isclose(num_steps * dt, final_time):
+        raise ValueError(f"The final time {final_time} is not a multiple of {dt}")
+
+    wfn, params = initial_state(grid)
+    params = dict(params)
+    # The time step keeps the phase of the scenario's, e.g. imaginary time
+    params["dt"] = dt * params["dt"] / abs(params["dt"])
+    advance = _integrator(integrator, step, params)
+    wfn.fft()
+    synchronise()
+
+    start = time.perf_counter()
+    for _ in range(num_steps):
+        advance(wfn, params)
+    synchronise()
+    return _FinalState(wfn, params, energy, time.perf_counter() - start)
+
+
+def convergence_study(
+    initial_state: Callable[[Grid], tuple[_Wavefunction, dict]],
+    step: Callable[[_Wavefunction, dict], None],
+    energy: Callable[[_Wavefunction, dict], float],
+    final_time: float,
+    grids: list[Grid],
+    dts: list[float],
+    integrators: list[str] | None = None,
+    reference: tuple[Grid, float, str] | None = None,
+) -> list[dict]:
+    """Evolves a scenario to `final_time` with every combination of grid,
+    time step and integrator, and measures the error of each final state
+    against a reference run.
+
+    :param initial_state: The function preparing the initial wavefunction and
+        parameters of the scenario on a grid. The same continuous state must
+        be prepared on every grid.
+    :type initial_state: Callable[[Grid], tuple[Wavefunction, dict]]
+    :param step: The split-step of the system, e.g.
+        :func:`pygpe.scalar.step_wavefunction`.
+    :type step: Callable[[Wavefunction, dict], None]
+    :param energy: The function computing the total energy of the system,
+        e.g. `pygpe.scalar.DataManager._energy`.
+    :type energy: Callable[[Wavefunction, dict], float]
+    :param final_time: The time the scenario is evolved to, which must be a
+        multiple of every time step.
+    :type final_time: float
+    :param grids: The grids, which must span the same box.
+    :type grids: list[Grid]
+    :param dts: The magnitudes of the time steps. Imaginary time steps are
+        used if the scenario's time step is imaginary.
+    :type dts: list[float]
+    :param integrators: The integrators, see :data:`INTEGRATORS`. Defaults to
+        the split-step.
+    :type integrators: list[str], optional
+    :param reference: The grid, time step and integrator of the reference
+        run. Defaults to the finest grid, a quarter of the smallest time step
+        and the most accurate integrator.
+    :type reference: tuple[Grid, float, str], optional
+    :return: One record per run, holding its settings, wall time and the
+        relative errors of its wavefunction, energy and norm.
+    :rtype: list[dict]
+    """
+    integrators = integrators or ["split-step"]
+    lengths = _box_lengths(grids[0])
+    if reference is None:
+        finest = max(grids, key=lambda grid: grid.total_num_points)
+        accurate = "yoshida" if "yoshida" in integrators else integrators[0]
+        reference = (finest, min(dts) / 4, accurate)
+    for grid in [*grids, reference[0]]:
+        if not np.allclose(_box_lengths(grid), lengths):
+            raise ValueError(
+                f"Grids must span the same box, {_box_lengths(grid)} != {lengths}"
+            )
+        if any(n > m for n, m in zip(_grid_points(grid), _grid_points(reference[0]))):
+            raise ValueError("The reference grid must be the finest grid")
+
+    exact = _run(initial_state, step, energy, *reference, final_time)
+    records = []
+    for integrator in integrators:
+        for grid in grids:
+            for dt in dts:
+                state = _run(
+                    initial_state, step, energy, grid, dt, integrator, final_time
+                )
+                records.append(
+                    {
+                        "integrator": integrator,
+                        "points": _grid_points(grid),
+                        "dt": dt,
+                        "steps": round(final_time / dt),
+                        "wall_time": state.wall_time,
+                        "wavefunction_error": state.wavefunction_error(exact),
+                        "energy_error": abs(state.energy - exact.energy)
+                        / abs(exact.energy),
+                        "norm_error": abs(state.norm - exact.norm) / exact.norm,
+                    }
+                )
+    return records
+
+
+def recommend(
+    records: list[dict],
+    tolerance: float,
+    energy_tolerance: float | None = None,
+    norm_tolerance: float | None = None,
+) -> dict:
+    """Returns the record of the cheapest run whose errors are within the
+    tolerances.
+
+    :param records: The records of a convergence study.
+    :type records: list[dict]
+    :param tolerance: The largest acceptable relative error of the
+        wavefunction.
+    :type tolerance: float
+    :param energy_tolerance: The largest acceptable relative error of the
+        energy. By default, the energy is unconstrained.
+    :type energy_tolerance: float, optional
+    :param norm_tolerance: The largest acceptable relative error of the norm.
+        By default, the norm is unconstrained.
+    :type norm_tolerance: float, optional
+    :return: The record of the recommended setting.
+    :rtype: dict
+    """
+    tolerances = {
+        "wavefunction_error": tolerance,
+        "energy_error": energy_tolerance,
+        "norm_error": norm_tolerance,
+    }
+    accurate = [
+        record
+        for record in records
+        if all(
+            limit is None or record[error] <= limit
+            for error, limit in tolerances.items()
+        )
+    ]
+    if not accurate:
+        raise ValueError(
+            "No setting meets the tolerances, add finer grids or smaller time steps"
+        )
+    return min(accurate, key=lambda record: record["wall_time"])
+
+
+def _dipole_decay(grid: Grid) -> tuple[_Wavefunction, dict]:
+    """A vortex dipole in a uniform scalar condensate, in real time."""
+    from pygpe.scalar import ScalarWavefunction
+    from pygpe.shared.vortices import add_dipole_pair
+
+    wfn = ScalarWavefunction(grid)
+    wfn.set_wavefunction(cp.ones(grid.shape, dtype="complex128"))
+    wfn.apply_phase(add_dipole_pair(grid, 4.0))
+    return wfn, {"g": 1, "trap": 0, "dt": 1e-2, "t": 0}
+
+
+if __name__ == "__main__":
+    from pygpe.scalar import DataManager, step_wavefunction
+
+    parser = argparse.ArgumentParser(
+        description="Convergence study of the decay of a vortex dipole in a "
+        "2D scalar condensate."
+    )
+    parser.add_argument("--tolerance", type=float, default=1e-3)
+    parser.add_argument("--length", type=float, default=32.0, help="box length")
+    parser.add_argument("--points", nargs="+", type=int, default=[32, 64, 128])
+    parser.add_argument(
+        "--dts", nargs="+", type=float, default=[0.04, 0.02, 0.01, 0.005]
+    )
+    parser.add_argument("--final-time", type=float, default=1.0)
+    parser.add_argument(
+        "--integrators", nargs="+", choices=INTEGRATORS, default=INTEGRATORS
+    )
+    args = parser.parse_args()
+
+    study = convergence_study(
+        _dipole_decay,
+        step_wavefunction,
+        DataManager._energy,
+        args.final_time,
+        [_build_grid((n, n), (args.length / n, args.length / n)) for n in args.points],
+        args.dts,
+        args.integrators,
+    )
+    print(
+        f"{'integrator':<12}{'points':>8}{'dt':>9}{'time (s)':>10}"
+        f"{'wfn error':>11}{'energy':>11}{'norm':>11}"
+    )
+    for record in study:
+        print(
+            f"{record['integrator']:<12}{record['points'][0]:>8}"
+            f"{record['dt']:>9.4g}{record['wall_time']:>10.3f}"
+            f"{record['wavefunction_error']:>11.2e}"
+            f"{record['energy_error']:>11.2e}{record['norm_error']:>11.2e}"
+        )
+    best = recommend(study, args.tolerance)
+    print(
+        f"Cheapest setting within {args.tolerance:g}: {best['integrator']}, "
+        f"{best['points'][0]} points per axis, dt = {best['dt']:g}"
+    )
@@ -1,21 +1,115 @@
-from abc import ABC, abstractmethod
+from __future__ import annotations
+
+import time
+from abc import ABC
 from pathlib import Path
+from typing import Callable
 
-import h5py
+import numpy as np
 
 import pygpe.shared.data_manager_paths as dmp
+from pygpe.shared.backend import cp
 from pygpe.shared.grid import Grid
+from pygpe.shared.pyramid import _pyramid_path, _pyramid_subgrids
+from pygpe.shared.save_policy import SavePolicy
+from pygpe.shared.sharding import shard_filename
+from pygpe.shared.spectral import (
+    _energy_cutoff,
+    _truncate,
+    _truncation_indices,
+    _truncation_mask,
+)
+from pygpe.shared.storage import _create_backend, _open_backend
+from pygpe.shared.subgrid import (
+    _CoarseSubGrid,
+    _RegionSubGrid,
+    _grid_origin,
+    _grid_points,
+    _grid_spacings,
+)
+from pygpe.shared.utils import handle_array
 from pygpe.shared.wavefunction import _Wavefunction
+from pygpe.shared.xdmf import (
+    _XdmfSeries,
+    _save_document,
+    _saved_frame_times,
+    _xdmf_document,
+)
+
+
+def _frame_shape(grid: Grid) -> tuple[int, ...]:
+    """Returns the shape of a single saved frame on the given grid."""
+    if grid.ndim == 1:
+        return (grid.shape,)
+    return grid.shape
+
+
+def _grid_params(grid: Grid) -> dict:
+    """Returns the grid parameters saved alongside the data."""
+    grid_params = {dmp.GRID_NX: grid.num_points_x, dmp.GRID_DX: grid.grid_spacing_x}
+    if grid.ndim >= 2:
+        grid_params[dmp.GRID_NY] = grid.num_points_y
+        grid_params[dmp.GRID_DY] = grid.grid_spacing_y
+    if grid.ndim == 3:
+        grid_params[dmp.GRID_NZ] = grid.num_points_z
+        grid_params[dmp.GRID_DZ] = grid.grid_spacing_z
+    return grid_params
+
+
+def _atom_num_field(name: str) -> str:
+    """Returns the frame table field holding the atom number of the
+    component `name`, e.g. "atom_num_plus" for "plus_component".
+    """
+    if name == "component":
+        return "atom_num"
+    return f"atom_num_{name.removesuffix('_component')}"
+
+
+def _time_value(t: float | complex) -> float:
+    """Returns the simulation time as a real number, i.e. the magnitude of
+    the time in imaginary time evolution.
+    """
+    return abs(complex(t)) if isinstance(t, complex) else float(t)
 
 
 class _DataManager(ABC):
     """Defines the abstract DataManager base class.
-    Each system's DataManager inherits from this class and provides overrides
-    for the abstract methods.
+    Each system's DataManager inherits from this class and specifies the
+    dataset path of each of its wavefunction components in `_components`, and
+    the functions computing each of its supported observables in
+    `_observables`, and the function computing its energy in `_energy`.
     """
 
+    _components: dict[str, str] = {}
+    _observables: dict[str, Callable[[_Wavefunction], cp.ndarray]] = {}
+    _energy: Callable[[_Wavefunction, dict], float] | None = None
+
     def __init__(
-        self, filename: str, data_path: str, wfn: _Wavefunction, params: dict
+        self,
+        filename: str,
+        data_path: str,
+        wfn: _Wavefunction,
+        params: dict,
+        shard: int | None = None,
+        backend: str = "hdf5",
+        fourier: bool = False,
+        k_cutoff: float | None = None,
+        energy_tolerance: float | None = None,
+        observables: list[str] | None = None,
+        save_components: bool = True,
+        observable_dtype: str = "float64",
+        region: tuple[slice | int, ...] | None = None,
+        stride: int | tuple[int, ...] | None = None,
+        coarsen: int | tuple[int, ...] | None = None,
+        pyramid_levels: int = 0,
+        policies: list[SavePolicy] | None = None,
+        record_energy: bool = False,
+        append: bool = False,
+        time_index: int | None = None,
+        swmr: bool = False,
+        flush_every: int = 1,
+        xdmf: bool = False,
+        xdmf_every: int | None = None,
     ) -> None:
         """The default constructor for the abstract `DataManager` class, to be
         inherited by sucblasses of `DataManager`.
@@ -28,52 +122,422 @@ class _DataManager(ABC):
         :type wfn: _Wavefunction
         :param params: Parametesr of the system.
         :type params: dict
+        :param shard: Index of the shard (e.g. worker rank or realisation) to
+            write to. If specified, data is written to the shard's own file,
+            see :func:`~pygpe.shared.sharding.shard_filename`.
+        :type shard: int, optional
+        :param backend: "hdf5", "zarr" or "memmap". The storage backend of the
+            data, see :mod:`pygpe.shared.storage`. Defaults to "hdf5".
+        :type backend: str
+        :param fourier: If True, the Fourier-space components are saved
+            directly, avoiding the inverse Fourier transform on every save.
+            Readers transform the frames back to real space on demand.
+        :type fourier: bool
+        :param k_cutoff: If specified, only the Fourier coefficients with
+            wave number at most `k_cutoff` are saved, which implies `fourier`.
+            Readers reconstruct full-resolution frames by zero-padding.
+        :type k_cutoff: float, optional
+        :param energy_tolerance: If specified instead of `k_cutoff`, the cutoff
+            is chosen from the initial wavefunction as the smallest one
+            discarding at most this fraction of the kinetic energy.
+        :type energy_tolerance: float, optional
+        :param observables: Names of the observables, e.g. "density", to be
+            computed on the device and saved as real-valued time series on
+            every save.
+        :type observables: list[str], optional
+        :param save_components: If False, only the observables are saved and
+            the wavefunction components are not. Defaults to True.
+        :type save_components: bool
+        :param observable_dtype: Data type of the saved observables. Defaults
+            to "float64".
+        :type observable_dtype: str
+        :param region: Saves only a region of interest of the grid. For each
+            axis, a slice selects a range of points and an integer selects a
+            single point, e.g. `(slice(None), slice(None), 64)` saves the
+            `z = 64` plane of a 3D grid.
+        :type region: tuple[slice | int, ...], optional
+        :param stride: Saves only every `stride`-th point along each axis, or
+            along all axes if an integer. Can be combined with `region`.
+        :type stride: int or tuple[int, ...], optional
+        :param coarsen: Saves a Fourier-downsampled version of the data on a
+            grid with `coarsen` times fewer points along each axis, or along
+            all axes if an integer.
+        :type coarsen: int or tuple[int, ...], optional
+        :param pyramid_levels: The number of levels of a multi-resolution
+            pyramid of the density saved alongside the data, where level `l`
+            is Fourier-downsampled by a factor of `2**l` along each axis.
+            Defaults to 0, i.e. no pyramid.
+        :type pyramid_levels: int
+        :param policies: Save policies deciding when :meth:`maybe_save` saves
+            a frame, see :mod:`pygpe.shared.save_policy`.
+        :type policies: list[SavePolicy], optional
+        :param record_energy: If True, the total energy of every saved frame
+            is recorded in the frame table, using the current values of
+            `params`. Defaults to False.
+        :type record_energy: bool
+        :param append: If True, an existing data file is reopened to append
+            further frames, e.g. when resuming from a checkpoint, instead of
+            being truncated. The other output settings must match those the
+            file was created with. Defaults to False.
+        :type append: bool
+        :param time_index: When appending, the index at which the next frame
+            is saved, e.g. the position recorded in a checkpoint. Any frames
+            saved after this position are overwritten. Defaults to the end of
+            the existing data.
+        :type time_index: int, optional
+        :param swmr: If True, the HDF5 file is written in single-writer/
+            multiple-reader mode, so it can be read while the simulation is
+            running, e.g. with `DataReader(..., swmr=True)`. The file is held
+            open until :meth:`close` is called. Defaults to False.
+        :type swmr: bool
+        :param flush_every: In SWMR mode, the saved frames are flushed to disk,
+            and so become visible to readers, every `flush_every` saves.
+            Defaults to 1.
+        :type flush_every: int
+        :param xdmf: If True, an XDMF descriptor of the saved observables, e.g.
+            `data.xmf` next to `data.hdf5`, is written when the DataManager is
+            closed, so that ParaView or VisIt can read the data in place, see
+            :mod:`pygpe.shared.xdmf`. Defaults to False.
+        :type xdmf: bool
+        :param xdmf_every: If specified, the XDMF descriptor is also rewritten
+            every `xdmf_every` saves, e.g. to view a running simulation.
+        :type xdmf_every: int, optional
         """
+        if shard is not None:
+            filename = shard_filename(filename, shard)
         self.filename = filename
         self.data_path = Path(f"./{data_path}")
         self.data_path_and_file = self.data_path / self.filename
         self._time_index = 0
+        self.save_time = 0.0
+        self._fourier = fourier
+        self._params = params  # Kept to evaluate the energy with current values
+        if record_energy and self._energy is None:
+            raise ValueError("Recording the energy is unsupported for this system")
+        self._record_energy = record_energy
+
+        self.observables = list(observables or [])
+        for name in self.observables:
+            if name not in self._observables:
+                raise ValueError(
+                    f"Observable {name} is unsupported, choose from "
+                    f"{list(self._observables)}"
+                )
+        if not save_components and not self.observables:
+            raise ValueError("Nothing to save without components or observables")
+        self._save_components = save_components
+        self._observable_dtype = observable_dtype
+
+        if append and k_cutoff is None and energy_tolerance is not None:
+            raise ValueError("Pass the recorded k_cutoff when appending")
+        if k_cutoff is None and energy_tolerance is not None:
+            k_cutoff = _energy_cutoff(
+                wfn.grid,
+                [cp.fft.fftn(getattr(wfn, name)) for name in self._components],
+                energy_tolerance,
+            )
+        self.k_cutoff = k_cutoff
+        if k_cutoff is not None:
+            if k_cutoff < 0:
+                raise ValueError(f"Momentum cutoff {k_cutoff} must be non-negative")
+            self._fourier = True
+            self._truncation_indices = _truncation_indices(wfn.grid, k_cutoff)
+            self._truncation_mask = _truncation_mask(
+                wfn.grid, self._truncation_indices, k_cutoff
+            )
+
+        self._subgrid = None
+        if coarsen is not None:
+            if region is not None or stride is not None:
+                raise ValueError("coarsen cannot be combined with region or stride")
+            self._subgrid = _CoarseSubGrid(wfn.grid, coarsen)
+        elif region is not None or stride is not None:
+            self._subgrid = _RegionSubGrid(wfn.grid, region, stride)
+        if self._subgrid is not None and self._fourier:
+            raise ValueError("Sub-grids cannot be saved in Fourier space")
+        if pyramid_levels and self._subgrid is not None:
+            raise ValueError("A pyramid cannot be combined with a sub-grid")
+        self._pyramid = _pyramid_subgrids(wfn.grid, pyramid_levels)
+
+        self._xdmf_times = None  # Times of the frames described by the XDMF file
+        self._xdmf_every = xdmf_every
+        self._xdmf_written = None  # The number of frames in the written descriptor
+        if xdmf_every is not None and xdmf_every < 1:
+            raise ValueError(f"XDMF descriptors cannot be written every {xdmf_every}")
+        if xdmf:
+            if backend != "hdf5":
+                raise ValueError("XDMF descriptors require the hdf5 backend")
+            if not self.observables:
+                raise ValueError(
+                    "XDMF descriptors reference the saved observables, pass e.g. "
+                    "observables=['density']"
+                )
+            if self._subgrid is not None:
+                self._xdmf_grid = (
+                    self._subgrid.shape,
+                    self._subgrid.grid_spacings,
+                    self._subgrid.origin,
+                )
+            else:
+                self._xdmf_grid = (
+                    _grid_points(wfn.grid),
+                    _grid_spacings(wfn.grid),
+                    _grid_origin(wfn.grid),
+                )
+            if len(self._xdmf_grid[0]) not in (2, 3):
+                raise ValueError("XDMF descriptors require 2D or 3D frames")
+            self._xdmf_times = []
+
+        self.policies = list(policies or [])
+        for policy in self.policies:
+            policy._bind(self)
+
+        self._flush_every = flush_every
+        self._append = append
+        if append:
+            self._backend = _create_backend(backend, self.data_path_and_file, "a", swmr)
+            self._time_index = (
+                self._backend.series_length(dmp.FRAMES)
+                if time_index is None
+                else time_index
+            )
+            if xdmf:
+                times = _saved_frame_times(self.data_path_and_file)
+                self._xdmf_times = list(times[: self._time_index])
+            if self.policies and self._time_index > 0:
+                last_time = self._saved_time(self._time_index - 1)
+                for policy in self.policies:
+                    policy._resume(last_time)
+            return
 
         # Create file and save initial parameters
-        h5py.File(self.data_path_and_file, "w")
+        self._backend = _create_backend(backend, self.data_path_and_file, "w", swmr)
         self._save_grid_params(wfn.grid)
         self._save_params(params)
 
+    def _saved_time(self, index: int) -> float:
+        """Returns the simulation time of a frame in the data file, from the
+        frame table.
+        """
+        reader = _open_backend(self.data_path_and_file)
+        try:
+            return float(reader.series(dmp.FRAMES)[index]["t"])
+        finally:
+            reader.close()
+
     def _save_grid_params(self, grid: Grid) -> None:
         """Saves grid parameters to dataset."""
-        with h5py.File(self.data_path_and_file, "r+") as file:
-            if grid.ndim == 1:
-                file.create_dataset(dmp.GRID_NX, data=grid.num_points_x)
-                file.create_dataset(dmp.GRID_DX, data=grid.grid_spacing_x)
-            elif grid.ndim == 2:
-                file.create_dataset(dmp.GRID_NX, data=grid.num_points_x)
-                file.create_dataset(dmp.GRID_NY, data=grid.num_points_y)
-                file.create_dataset(dmp.GRID_DX, data=grid.grid_spacing_x)
-                file.create_dataset(dmp.GRID_DY, data=grid.grid_spacing_y)
-            elif grid.ndim == 3:
-                file.create_dataset(dmp.GRID_NX, data=grid.num_points_x)
-                file.create_dataset(dmp.GRID_NY, data=grid.num_points_y)
-                file.create_dataset(dmp.GRID_NZ, data=grid.num_points_z)
-                file.create_dataset(dmp.GRID_DX, data=grid.grid_spacing_x)
-                file.create_dataset(dmp.GRID_DY, data=grid.grid_spacing_y)
-                file.create_dataset(dmp.GRID_DZ, data=grid.grid_spacing_z)
+        self._backend.write_values(_grid_params(grid))
 
     def _save_params(self, parameters: dict) -> None:
         """Saves condensate parameters to dataset."""
-        with h5py.File(self.data_path / self.filename, "r+") as file:
-            for key in parameters:
-                file.create_dataset(f"{dmp.PARAMETERS}/{key}", data=parameters[key])
+        self._backend.write_values(
+            {f"{dmp.PARAMETERS}/{key}": value for key, value in parameters.items()}
+        )
 
-    @abstractmethod
     def _save_initial_wfn(self, wfn: _Wavefunction) -> None:
-        """Saves initial wavefunction to dataset."""
-        pass
+        """Creates new datasets in file for the wavefunction components."""
+        if not self._append:  # Otherwise, the datasets already exist
+            self._create_series(wfn)
+        # In SWMR mode, this switches the file to SWMR, after which readers can
+        # open it
+        self._backend.flush()
 
-    @abstractmethod
-    def save_wavefunction(self, wfn: _Wavefunction) -> None:
-        """Saves current wavefunction data to the dataset.
+    def _create_series(self, wfn: _Wavefunction) -> None:
+        """Creates the time series of every saved quantity."""
+        frame_shape = _frame_shape(wfn.grid)
+        subgrid_attrs = {}
+        if self._subgrid is not None:
+            frame_shape = self._subgrid.shape
+            subgrid_attrs = self._subgrid.attrs()
 
-        :param wfn: Wavefunction of the system.
-        :type wfn: _Wavefunction
+        if self._save_components:
+            attrs = {dmp.SPACE: "fourier" if self._fourier else "real"}
+            component_shape = frame_shape
+            if self.k_cutoff is not None:
+                attrs[dmp.K_CUTOFF] = self.k_cutoff
+                component_shape = tuple(len(i) for i in self._truncation_indices)
+            for path in self._components.values():
+                self._backend.create_series(
+                    path, component_shape, "complex128", {**attrs, **subgrid_attrs}
+                )
+        for name in self.observables:
+            self._backend.create_series(
+                f"{dmp.OBSERVABLES}/{name}",
+                frame_shape,
+                self._observable_dtype,
+                {dmp.SPACE: "real", **subgrid_attrs},
+            )
+        self._backend.create_series(dmp.FRAMES, (), self._frame_table_dtype())
+        for level, subgrid in self._pyramid.items():
+            self._backend.create_series(
+                _pyramid_path(level),
+                subgrid.shape,
+                self._observable_dtype,
+                {dmp.SPACE: "real", **subgrid.attrs()},
+            )
+
+    def _frame_table_dtype(self) -> np.dtype:
+        """Returns the data type of a row of the frame table."""
+        fields = [("step", "i8"), ("t", "f8"), ("wall_time", "f8")]
+        fields += [(_atom_num_field(name), "f8") for name in self._components]
+        if self._record_energy:
+            fields.append(("energy", "f8"))
+        return np.dtype(fields)
+
+    def _frame_table_row(
+        self, wfn: _Wavefunction, t: float, step: int | None
+    ) -> np.ndarray:
+        """Returns the row of the frame table describing the current frame.
+        Atom numbers are computed from the Fourier-space components.
+        """
+        grid = wfn.grid
+        row = [-1 if step is None else step, t, time.time()]
+        row += [
+            float(
+                grid.grid_spacing_product
+                / grid.total_num_points
+                * cp.sum(cp.abs(getattr(wfn, f"fourier_{name}")) ** 2)
+            )
+            for name in self._components
+        ]
+        if self._record_energy:
+            row.append(self._energy(wfn, self._params))
+        return np.array(tuple(row), dtype=self._frame_table_dtype())
+
+    def maybe_save(
+        self, wfn: _Wavefunction, t: float | complex, step: int | None = None
+    ) -> bool:
+        """Saves the current wavefunction data if any of the save policies of
+        the DataManager asks for it.
+
+        :param wfn: The wavefunction of the system.
+        :type wfn: :class:`Wavefunction`
+        :param t: The current simulation time, e.g. `params["t"]`.
+        :type t: float or complex
+        :param step: The current time step, recorded in the frame table.
+        :type step: int, optional
+        :return: Whether a frame was saved.
+        :rtype: bool
+        """
+        if not self.policies:
+            raise ValueError(
+                "maybe_save needs save policies, pass e.g. "
+                "policies=[LogSpacedTimes(1, 1e4, 100)] to the DataManager"
+            )
+        t = _time_value(t)
+        # Every policy is consulted so that each sees every call
+        if not any([policy.should_save(wfn, t) for policy in self.policies]):
+            return False
+        self.save_wavefunction(wfn, t, step)
+        return True
+
+    def save_wavefunction(
+        self,
+        wfn: _Wavefunction,
+        t: float | complex | None = None,
+        step: int | None = None,
+    ) -> None:
+        """Saves the current wavefunction data to the dataset, and appends the
+        frame's step, time, wall time, atom numbers and, optionally, energy to
+        the frame table.
+
+        :param wfn: The wavefunction of the system.
+        :type wfn: :class:`Wavefunction`
+        :param t: The current simulation time, e.g. `params["t"]`, recorded
+            alongside the frame. If not specified, NaN is recorded.
+        :type t: float or complex, optional
+        :param step: The current time step, recorded alongside the frame. If
+            not specified, -1 is recorded.
+        :type step: int, optional
         """
-        pass
+        start = time.perf_counter()
+        t = float("nan") if t is None else _time_value(t)
+        # Coarse sub-grids are computed from the Fourier-space components
+        coarse = isinstance(self._subgrid, _CoarseSubGrid)
+        prefix = "fourier_" if self._fourier or coarse else ""
+        if (
+            self.observables
+            or self._pyramid
+            or self._record_energy
+            or (self._save_components and not prefix)
+        ):
+            wfn.ifft()  # Update real-space wavefunction before saving
+
+        frames = {}
+        if self._save_components:
+            for name, path in self._components.items():
+                component = getattr(wfn, prefix + name)
+                if self.k_cutoff is not None:
+                    component = _truncate(
+                        component, self._truncation_indices, self._truncation_mask
+                    )
+                elif coarse:
+                    component = self._subgrid.reduce_fourier(component)
+                elif self._subgrid is not None:
+                    component = self._subgrid.reduce(component)
+                frames[path] = handle_array(component)
+        for name in self.observables:
+            observable = self._observables[name](wfn)
+            if self._subgrid is not None:
+                observable = self._subgrid.reduce(observable)
+            frames[f"{dmp.OBSERVABLES}/{name}"] = handle_array(
+                observable.astype(self._observable_dtype)
+            )
+        if self._pyramid:
+            fourier_density = cp.fft.fftn(self._observables["density"](wfn))
+            for level, subgrid in self._pyramid.items():
+                density = subgrid.reduce_fourier(fourier_density).real
+                frames[_pyramid_path(level)] = handle_array(
+                    density.astype(self._observable_dtype)
+                )
+        frames[dmp.FRAMES] = self._frame_table_row(wfn, t, step)
+        self._backend.write_frames(self._time_index, frames)
+        for policy in self.policies:
+            policy.record_save(wfn, t)
+
+        self._time_index += 1
+        if self._time_index % self._flush_every == 0:
+            self._backend.flush()
+        if self._xdmf_times is not None:
+            # Frames without a time are ordered by index instead
+            self._xdmf_times.append(self._time_index - 1 if np.isnan(t) else t)
+            if self._xdmf_every and self._time_index % self._xdmf_every == 0:
+                self._write_xdmf()
+        self.save_time += time.perf_counter() - start
+
+    def _write_xdmf(self) -> None:
+        """Writes the XDMF descriptor of the frames saved so far."""
+        if self._xdmf_written == len(self._xdmf_times):
+            return
+        shape, grid_spacings, origin = self._xdmf_grid
+        series = [
+            _XdmfSeries(
+                name,
+                f"{dmp.OBSERVABLES}/{name}",
+                (*shape, self._time_index),
+                self._observable_dtype,
+                len(shape),
+                self._time_index,
+            )
+            for name in self.observables
+        ]
+        tree = _xdmf_document(
+            self.filename, shape, grid_spacings, origin, series, self._xdmf_times
+        )
+        _save_document(tree, self.data_path_and_file.with_suffix(".xmf"))
+        self._xdmf_written = len(self._xdmf_times)
+
+    def close(self) -> None:
+        """Flushes the saved frames and closes the data file, if it is held
+        open, e.g. in SWMR mode, and writes the XDMF descriptor, if any.
+        """
+        self._backend.close()
+        if self._xdmf_times is not None:
+            self._write_xdmf()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
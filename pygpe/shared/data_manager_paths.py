@@ -36,3 +36,39 @@ SPIN2_WAVEFUNCTION_PLUS_ONE = "wavefunction/psi_plus1"
 SPIN2_WAVEFUNCTION_ZERO = "wavefunction/psi_zero"
 SPIN2_WAVEFUNCTION_MINUS_ONE = "wavefunction/psi_minus1"
 SPIN2_WAVEFUNCTION_MINUS_TWO = "wavefunction/psi_minus2"
+
+# Dataset attributes
+TIME_AXIS = "time_axis"  # Axis indexing the saved frames (last axis if absent)
+REALISATION_AXIS = "realisation_axis"  # Axis indexing the shards of a combined file
+NUM_FRAMES = "num_frames"  # Number of frames held by each shard
+NUM_SAVED = "num_saved"  # Frames saved to a series holding a placeholder frame
+REDUCED = "reduced"  # Marks results reduced over all frames, i.e. not a series
+
+# Shard files of a combined file
+SHARDS = "shards"
+
+# Space of saved frames
+SPACE = "space"  # "real" or "fourier", the space in which frames are stored
+
+# Spectrally truncated frames, holding only the modes within a momentum cutoff
+K_CUTOFF = "k_cutoff"  # Momentum cutoff of spectrally truncated frames
+
+# Observables computed at save time
+OBSERVABLES = "observables"
+
+# Sub-grid of frames saving only part of the grid
+SUBGRID_SHAPE = "subgrid_shape"
+SUBGRID_SPACING = "subgrid_spacing"
+SUBGRID_ORIGIN = "subgrid_origin"  # Coordinates of the first saved point
+
+# Multi-resolution pyramid of the density
+PYRAMID = "pyramid"
+
+# Table of the step, time, wall time, atom numbers and energy of each frame
+FRAMES = "frames"
+
+# Checkpoints of a running simulation
+CHECKPOINT_WAVEFUNCTION = "wavefunction"  # Fourier-space components
+CHECKPOINT_RNG = "rng"  # Random number generator states
+CHECKPOINT_DATA_FILE = "data_file"  # Data file of the checkpointed DataManager
+CHECKPOINT_TIME_INDEX = "time_index"  # Position of the DataManager in its file
@@ -0,0 +1,658 @@
+import functools
+import os
+import time
+from abc import ABC, abstractmethod
+from pathlib import Path
+from functools import partial
+from typing import Any, Callable, Iterator
+
+import numpy as np
+
+import pygpe.shared.data_manager_paths as dmp
+from pygpe.shared.grid import Grid
+from pygpe.shared.pyramid import _choose_level, _pyramid_path
+from pygpe.shared.spectral import _truncation_indices, _zero_pad
+from pygpe.shared.storage import (
+    _StorageBackend,
+    _open_backend,
+    _series_length,
+    _time_axis,
+)
+from pygpe.shared.subgrid import _grid_origin, _grid_points, _subgrid_from_attrs
+from pygpe.shared.wavefunction import _Wavefunction
+
+
+def _read_params(backend: _StorageBackend) -> dict:
+    """Reads the condensate parameters saved in a store, converting scalar
+    values back to their Python types.
+    """
+    params = {}
+    if dmp.PARAMETERS not in backend:  # No parameters were saved
+        return params
+    for key in backend.keys(dmp.PARAMETERS):
+        value = backend.read_value(f"{dmp.PARAMETERS}/{key}")
+        if isinstance(value, bytes):
+            value = value.decode()
+        elif isinstance(value, np.generic):
+            value = value.item()
+        params[key] = value
+    return params
+
+
+class _FrameView:
+    """A lazy, read-only view over the frames of a saved time series.
+    Indexing with an integer returns a single frame, while indexing with a
+    slice returns a block of frames with time as the leading axis. Data is
+    only read from disk when indexed.
+
+    :param array: The array-like object containing the time series, e.g. a
+        HDF5 dataset, a Zarr array or a memory-mapped array.
+    :param attrs: The attributes of the time series.
+    :type attrs: dict
+    :param realisation: The realisation to view, for datasets combining
+        several shards. By default, frames contain all realisations.
+    :type realisation: int, optional
+    :param transform: Function applied to the data read, e.g. a Fourier
+        transform over the spatial axes.
+    :type transform: Callable, optional
+    """
+
+    def __init__(
+        self,
+        array,
+        attrs: dict,
+        realisation: int | None = None,
+        transform: Callable[[np.ndarray], np.ndarray] | None = None,
+    ) -> None:
+        """Constructs the frame view."""
+        self._transform = transform
+        self._prefix = ()
+        if realisation is not None and dmp.REALISATION_AXIS in attrs:
+            self._prefix = (realisation,)  # Realisations are the leading axis
+
+        self.time_axis = _time_axis(attrs, len(array.shape)) - len(self._prefix)
+        self.frame_shape = tuple(
+            n
+            for axis, n in enumerate(array.shape[len(self._prefix) :])
+            if axis != self.time_axis
+        )
+        self.dtype = array.dtype
+        self._array = array
+        self._attrs = attrs
+        self._num_frames = None
+        if self._prefix and dmp.NUM_FRAMES in attrs:
+            # Shorter shards are padded to the longest shard
+            self._num_frames = int(attrs[dmp.NUM_FRAMES][realisation])
+
+    def __len__(self) -> int:
+        if self._num_frames is not None:
+            return self._num_frames
+        return _series_length(self._attrs, self._array.shape)
+
+    def __getitem__(self, index: int | slice | range) -> np.ndarray:
+        data = self._read(index)
+        if self._transform is None:
+            return data
+        return self._transform(data)
+
+    def _read(self, index: int | slice | range) -> np.ndarray:
+        """Reads the specified frame(s) from disk."""
+        key = [*self._prefix] + [slice(None)] * (len(self.frame_shape) + 1)
+        time_axis = self.time_axis + len(self._prefix)
+        if isinstance(index, slice):
+            index = range(*index.indices(len(self)))
+        if isinstance(index, range):
+            if not index:
+                return np.empty((0, *self.frame_shape), dtype=self.dtype)
+            if index.step < 0:  # HDF5 only supports increasing selections
+                return self._read(index[::-1])[::-1]
+            key[time_axis] = slice(index.start, index.stop, index.step)
+            return np.moveaxis(self._array[tuple(key)], self.time_axis, 0)
+        return self._array[tuple(self._frame_key(index))]
+
+    def _frame_key(self, index: int) -> list:
+        """Returns the key of the array selecting a single frame."""
+        if not -len(self) <= index < len(self):
+            raise IndexError(f"Frame {index} is out of range for {len(self)} frames")
+        key = [*self._prefix] + [slice(None)] * (len(self.frame_shape) + 1)
+        key[self.time_axis + len(self._prefix)] = index % len(self)
+        return key
+
+    def plane(self, index: int, position: int | None = None) -> np.ndarray:
+        """Returns a plane of a 3D frame at a position along its last axis,
+        reading only that plane from disk unless the frame is transformed as
+        it is read, e.g. to Fourier space. Frames of lower dimension are
+        returned whole.
+
+        :param index: The index of the frame.
+        :type index: int
+        :param position: The position of the plane along the last axis.
+            Defaults to the middle of the axis.
+        :type position: int, optional
+        :return: The plane of the frame.
+        """
+        if len(self.frame_shape) != 3:
+            return self[index]
+        if position is None:
+            position = self.frame_shape[-1] // 2
+        if self._transform is not None:
+            return self[index][..., position]
+        key = self._frame_key(index)
+        # The last axis of the array that is not the time axis
+        last_axis = len(key) - 1
+        if last_axis == self.time_axis + len(self._prefix):
+            last_axis -= 1
+        key[last_axis] = position
+        return self._array[tuple(key)]
+
+    def __iter__(self) -> Iterator[np.ndarray]:
+        for index in range(len(self)):
+            yield self[index]
+
+    def iter_chunks(self, chunk_size: int) -> Iterator[tuple[int, np.ndarray]]:
+        """Iterates over the time series in blocks of `chunk_size` frames, such
+        that at most one block is held in memory at a time.
+
+        :param chunk_size: The number of frames in each block.
+        :type chunk_size: int
+        :return: Iterator yielding the index of the first frame of each block
+            and the block itself, with time as the leading axis.
+        """
+        for start in range(0, len(self), chunk_size):
+            yield start, self[start : start + chunk_size]
+
+
+def _map_block(
+    reader_class: type["_DataReader"],
+    filename: str,
+    data_path: Path,
+    realisation: int | None,
+    fn: Callable,
+    frames: range,
+    reduce: Callable | None,
+):
+    """Applies `fn` to a contiguous block of frames in a worker, which opens
+    the data file read-only, and reduces the results if `reduce` is given.
+    """
+    with reader_class(filename, data_path, realisation) as reader:
+        results = [fn(reader, index) for index in frames]
+    if reduce is None:
+        return results
+    return functools.reduce(reduce, results)
+
+
+class _DataReader(ABC):
+    """Defines the abstract DataReader base class.
+    Each system's DataReader inherits from this class and provides overrides
+    for the abstract methods, along with the dataset path of each component
+    in `_components` and the functions computing each observable from a
+    wavefunction in `_observables`.
+    """
+
+    _components: dict[str, str] = {}
+    _observables: dict[str, Callable[[_Wavefunction], np.ndarray]] = {}
+
+    def __init__(
+        self,
+        filename: str,
+        data_path: str,
+        realisation: int | None = None,
+        swmr: bool = False,
+    ) -> None:
+        """The default constructor for the abstract `DataReader` class, to be
+        inherited by subclasses of `DataReader`.
+
+        :param filename: Filename.
+        :type filename: str
+        :param data_path: Path to file.
+        :type data_path: str
+        :param realisation: The realisation to read from a file combining
+            several shards, see :func:`~pygpe.shared.sharding.combine_shards`.
+            By default, frames contain all realisations.
+        :type realisation: int, optional
+        :param swmr: If True, a HDF5 file is read in single-writer/multiple-
+            reader mode, so that a file written by a running simulation with
+            `DataManager(..., swmr=True)` can be read, see :meth:`tail`.
+        :type swmr: bool
+        """
+        self.filename = filename
+        self.data_path = Path(f"./{data_path}")
+        self.data_path_and_file = self.data_path / self.filename
+
+        self._swmr = swmr
+        self._backend = _open_backend(self.data_path_and_file, swmr=swmr)
+        self.full_grid = self._load_grid()
+        self.grid, self.origin = self._load_subgrid()
+        self.params = self._load_params()
+        self._realisation = realisation
+        self._load_frames(realisation)
+
+    def _load_frames(self, realisation: int | None) -> None:
+        """Builds the lazy views over the saved time series and loads the
+        frame table.
+        """
+        self._frames = {}
+        self._fourier_frames = {}
+        for name, path in self._components.items():
+            if path in self._backend:  # Components are absent if not saved
+                self._frames[name], self._fourier_frames[name] = self._series_views(
+                    path, realisation
+                )
+        self._observable_frames = {}
+        if dmp.OBSERVABLES in self._backend:
+            for name in self._backend.keys(dmp.OBSERVABLES):
+                path = f"{dmp.OBSERVABLES}/{name}"
+                self._observable_frames[name] = _FrameView(
+                    self._backend.series(path),
+                    self._backend.series_attrs(path),
+                    realisation,
+                )
+        self.observables = list(self._observable_frames)
+        self._pyramid_frames = {}
+        if dmp.PYRAMID in self._backend:
+            for name in self._backend.keys(dmp.PYRAMID):
+                level = int(name.removeprefix("level_"))
+                path = _pyramid_path(level)
+                self._pyramid_frames[level] = _FrameView(
+                    self._backend.series(path),
+                    self._backend.series_attrs(path),
+                    realisation,
+                )
+        self.pyramid_levels = sorted(self._pyramid_frames)
+        self.num_frames = min(
+            len(frames)
+            for frames in (*self._frames.values(), *self._observable_frames.values())
+        )
+        self.frame_table = self._load_frame_table(realisation)
+        if self.frame_table is None:
+            self.times = np.full(self.num_frames, np.nan)
+        else:
+            self.times = self.frame_table["t"]
+
+    def refresh(self) -> None:
+        """Updates the reader with the frames saved since it was opened or
+        last refreshed, e.g. by a simulation writing in SWMR mode.
+        """
+        self._load_frames(self._realisation)
+
+    def tail(
+        self, poll_interval: float = 1.0, timeout: float | None = None, start: int = 0
+    ) -> Iterator[int]:
+        """Follows a file that is still being written, yielding the index of
+        every saved frame as it becomes available. The writer is unaffected,
+        as new frames are found by polling the file.
+
+        :param poll_interval: The time between checks for new frames, in
+            seconds. Defaults to 1.
+        :type poll_interval: float
+        :param timeout: Stops once no new frame has appeared for this long,
+            in seconds. By default, the file is followed indefinitely.
+        :type timeout: float, optional
+        :param start: The index of the first frame to yield. Defaults to 0.
+        :type start: int
+        :return: Iterator yielding the index of each frame.
+        """
+        index = start
+        last_frame = time.monotonic()
+        while True:
+            self.refresh()
+            if index < self.num_frames:
+                yield from range(index, self.num_frames)
+                index = self.num_frames
+                last_frame = time.monotonic()
+            elif timeout is not None and time.monotonic() - last_frame >= timeout:
+                return
+            else:
+                time.sleep(poll_interval)
+
+    def _series_views(
+        self, path: str, realisation: int | None
+    ) -> tuple[_FrameView, _FrameView]:
+        """Returns the real-space and Fourier-space views of the time series
+        at `path`. Frames are transformed on demand when read from the space
+        they were not saved in, and spectrally truncated frames are zero-padded
+        back to full resolution.
+        """
+        array = self._backend.series(path)
+        attrs = self._backend.series_attrs(path)
+        axes = tuple(range(-self.grid.ndim, 0))
+
+        if dmp.K_CUTOFF in attrs:
+            zero_pad = partial(
+                _zero_pad,
+                shape=self.grid.wave_number.shape,
+                indices=_truncation_indices(self.grid, float(attrs[dmp.K_CUTOFF])),
+            )
+            return (
+                _FrameView(
+                    array,
+                    attrs,
+                    realisation,
+                    lambda data: np.fft.ifftn(zero_pad(data), axes=axes),
+                ),
+                _FrameView(array, attrs, realisation, zero_pad),
+            )
+
+        if attrs.get(dmp.SPACE, "real") == "fourier":
+            real_space = partial(np.fft.ifftn, axes=axes)
+            return (
+                _FrameView(array, attrs, realisation, real_space),
+                _FrameView(array, attrs, realisation),
+            )
+
+        fourier_space = partial(np.fft.fftn, axes=axes)
+        return (
+            _FrameView(array, attrs, realisation),
+            _FrameView(array, attrs, realisation, fourier_space),
+        )
+
+    def _load_grid(self) -> Grid:
+        """Rebuilds the grid from the saved grid parameters."""
+        points = tuple(
+            int(self._backend.read_value(key))
+            for key in (dmp.GRID_NX, dmp.GRID_NY, dmp.GRID_NZ)
+            if key in self._backend
+        )
+        grid_spacings = tuple(
+            float(self._backend.read_value(key))
+            for key in (dmp.GRID_DX, dmp.GRID_DY, dmp.GRID_DZ)
+            if key in self._backend
+        )
+        if len(points) == 1:
+            return Grid(points[0], grid_spacings[0])
+        return Grid(points, grid_spacings)
+
+    def _load_subgrid(self) -> tuple[Grid, tuple[float, ...]]:
+        """Returns the grid of the saved frames and the coordinates of their
+        first point, which differ from the full grid if only part of the grid
+        was saved.
+        """
+        paths = [*self._components.values()]
+        if dmp.OBSERVABLES in self._backend:
+            paths += [
+                f"{dmp.OBSERVABLES}/{name}"
+                for name in self._backend.keys(dmp.OBSERVABLES)
+            ]
+        for path in paths:
+            if path in self._backend:
+                subgrid = _subgrid_from_attrs(self._backend.series_attrs(path))
+                if subgrid is not None:
+                    return subgrid
+                break
+        return self.full_grid, _grid_origin(self.full_grid)
+
+    def _load_frame_table(self, realisation: int | None) -> np.ndarray | None:
+        """Loads the table describing each saved frame, if present."""
+        if dmp.FRAMES not in self._backend:
+            return None
+        table = _FrameView(
+            self._backend.series(dmp.FRAMES),
+            self._backend.series_attrs(dmp.FRAMES),
+            realisation,
+        )
+        return np.asarray(table[: self.num_frames])
+
+    def _load_params(self) -> dict:
+        """Loads the saved condensate parameters."""
+        return _read_params(self._backend)
+
+    def close(self) -> None:
+        """Closes the data file."""
+        self._backend.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self.num_frames
+
+    def __getitem__(self, index: int | slice) -> dict[str, np.ndarray]:
+        if isinstance(index, slice):
+            index = range(*index.indices(self.num_frames))
+        elif not -self.num_frames <= index < self.num_frames:
+            raise IndexError(
+                f"Frame {index} is out of range for {self.num_frames} frames"
+            )
+        else:
+            index %= self.num_frames
+        return {
+            name: frames[index]
+            for name, frames in (
+                *self._frames.items(),
+                *self._observable_frames.items(),
+            )
+        }
+
+    def __iter__(self) -> Iterator[dict[str, np.ndarray]]:
+        for index in range(self.num_frames):
+            yield self[index]
+
+    def frame_at(self, t: float) -> int:
+        """Returns the index of the frame saved closest to the simulation
+        time `t`, using only the frame table.
+
+        :param t: The simulation time.
+        :type t: float
+        :return: The index of the frame.
+        :rtype: int
+        """
+        if np.all(np.isnan(self.times)):
+            raise ValueError("No simulation times were saved")
+        return int(np.nanargmin(np.abs(self.times - t)))
+
+    def component(self, name: str) -> _FrameView:
+        """Returns a lazy view over the frames of a single wavefunction
+        component.
+
+        :param name: The name of the component, e.g. "plus_component".
+        :type name: str
+        :return: The lazy frame view of the component.
+        """
+        if name not in self._frames:
+            raise ValueError(f"Component {name} is unsupported")
+        return self._frames[name]
+
+    def fourier_component(self, name: str) -> _FrameView:
+        """Returns a lazy view over the Fourier-space frames of a single
+        wavefunction component. Frames saved in real space are Fourier
+        transformed as they are read.
+
+        :param name: The name of the component, e.g. "plus_component".
+        :type name: str
+        :return: The lazy Fourier-space frame view of the component.
+        """
+        if name not in self._fourier_frames:
+            raise ValueError(f"Component {name} is unsupported")
+        return self._fourier_frames[name]
+
+    def observable(self, name: str) -> _FrameView:
+        """Returns a lazy view over the frames of an observable saved by the
+        DataManager, e.g. "density".
+
+        :param name: The name of the observable.
+        :type name: str
+        :return: The lazy frame view of the observable.
+        """
+        if name not in self._observable_frames:
+            raise ValueError(
+                f"Observable {name} was not saved, choose from {self.observables}"
+            )
+        return self._observable_frames[name]
+
+    def pyramid_level(self, display_shape: int | tuple[int, ...]) -> int:
+        """Returns the coarsest level of the density pyramid that resolves the
+        requested display size, where level 0 is the full resolution.
+
+        :param display_shape: The number of points to display along each
+            axis, or along all axes if an integer.
+        :type display_shape: int or tuple[int, ...]
+        :return: The pyramid level.
+        """
+        shapes = {
+            level: frames.frame_shape for level, frames in self._pyramid_frames.items()
+        }
+        if self._has_full_density():
+            shapes[0] = _grid_points(self.grid)
+        if not shapes:
+            raise ValueError("Neither the density nor a pyramid was saved")
+        return _choose_level(shapes, display_shape)
+
+    def density(
+        self, index: int | slice, display_shape: int | tuple[int, ...] | None = None
+    ) -> np.ndarray:
+        """Returns the total density of the specified frame(s). If a display
+        size is given, the density is read from the coarsest level of the
+        density pyramid resolving it, see :meth:`pyramid_level`, avoiding
+        reading the full-resolution data.
+
+        :param index: The index of the frame(s).
+        :type index: int or slice
+        :param display_shape: The number of points to display along each
+            axis, or along all axes if an integer. Defaults to the full
+            resolution.
+        :type display_shape: int or tuple[int, ...], optional
+        :return: The density of the frame(s).
+        """
+        level = 0 if display_shape is None else self.pyramid_level(display_shape)
+        if level > 0:
+            return self._pyramid_frames[level][index]
+        if "density" in self._observable_frames:
+            return self._observable_frames["density"][index]
+        if not self._has_full_density():
+            raise ValueError("The full-resolution density was not saved")
+        return sum(abs(frames[index]) ** 2 for frames in self._frames.values())
+
+    def _has_full_density(self) -> bool:
+        """Returns whether the full-resolution density can be read."""
+        return "density" in self._observable_frames or len(self._frames) == len(
+            self._components
+        )
+
+    def iter_chunks(
+        self, chunk_size: int
+    ) -> Iterator[tuple[int, dict[str, np.ndarray]]]:
+        """Iterates over the saved frames in blocks of `chunk_size` frames, such
+        that at most one block of each component is held in memory at a time.
+
+        :param chunk_size: The number of frames in each block.
+        :type chunk_size: int
+        :return: Iterator yielding the index of the first frame of each block
+            and a dictionary of the blocks of each component and observable,
+            with time as the leading axis.
+        """
+        for start in range(0, self.num_frames, chunk_size):
+            yield start, self[start : start + chunk_size]
+
+    def map_frames(
+        self,
+        fn: Callable[["_DataReader", int], Any],
+        workers: int | None = None,
+        reduce: Callable[[Any, Any], Any] | None = None,
+        output: str | None = None,
+        initial: Any = None,
+    ) -> list | Any:
+        """Applies `fn` to every saved frame in parallel. The frames are split
+        into one contiguous block per worker process, and each worker opens the
+        data file read-only with its own DataReader.
+
+        :param fn: Function of a DataReader and the index of a frame returning
+            the result for that frame, e.g. `reader.density(index).max()`.
+            Unless `workers` is 1, it must be defined at the top level of a
+            module, so that it can be sent to the worker processes.
+        :type fn: Callable
+        :param workers: The number of worker processes. If 1, frames are
+            processed in the current process. Defaults to the number of
+            processors.
+        :type workers: int, optional
+        :param reduce: Function combining two results into one, e.g.
+            `operator.add`. If given, the results are reduced in frame order,
+            first within each block and then across blocks.
+        :type reduce: Callable, optional
+        :param output: If given, the results, or the reduced result, are also
+            saved as a new dataset at this path of the data file, e.g.
+            "analysis/max_density". Per-frame results are saved with frames
+            along the first axis.
+        :type output: str, optional
+        :param initial: The value the reduction starts from, which is also
+            the result if no frames are saved. If not given, the reduced
+            result of no frames is None, and no output is saved.
+        :type initial: Any, optional
+        :return: The result of each frame, or the reduced result.
+        """
+        if output is not None and output in self._backend:
+            raise ValueError(f"Dataset {output} already exists")
+        workers = workers or os.cpu_count()
+        blocks = [
+            range(block[0], block[-1] + 1)
+            for block in np.array_split(np.arange(self.num_frames), workers)
+            if len(block) > 0
+        ]
+        arguments = (
+            type(self),
+            self.filename,
+            self.data_path,
+            self._realisation,
+            fn,
+        )
+        if workers == 1:
+            block_results = [_map_block(*arguments, block, reduce) for block in blocks]
+        else:
+            # Imported here, as multiprocessing is slow to import
+            from concurrent.futures import ProcessPoolExecutor
+
+            with ProcessPoolExecutor(workers) as executor:
+                futures = [
+                    executor.submit(_map_block, *arguments, block, reduce)
+                    for block in blocks
+                ]
+                block_results = [future.result() for future in futures]
+
+        if reduce is None:
+            result = [item for block in block_results for item in block]
+        elif initial is not None:
+            result = functools.reduce(reduce, block_results, initial)
+        elif block_results:
+            result = functools.reduce(reduce, block_results)
+        else:  # Nothing to reduce
+            return None
+
+        if output is not None:
+            # Reduced results are marked so file tools never treat them as
+            # time series
+            attrs = {dmp.TIME_AXIS: 0} if reduce is None else {dmp.REDUCED: True}
+            self._save_output(output, np.asarray(result), attrs)
+        return result
+
+    def _save_output(self, path: str, data: np.ndarray, attrs: dict) -> None:
+        """Saves `data` to a new dataset of the data file, reopening the file
+        for writing while the reader's own handle is closed.
+        """
+        self.close()
+        backend = _open_backend(self.data_path_and_file, "a")
+        try:
+            backend.write_value(path, data, attrs)
+        finally:
+            backend.close()
+        self._backend = _open_backend(self.data_path_and_file, swmr=self._swmr)
+        self._load_frames(self._realisation)
+
+    def wavefunction(self, index: int) -> _Wavefunction:
+        """Returns a wavefunction object holding the specified frame, with both
+        its real-space and Fourier-space components up-to-date.
+
+        :param index: The index of the frame.
+        :type index: int
+        :return: The wavefunction of the frame.
+        """
+        if len(self._frames) != len(self._components):
+            raise ValueError("The wavefunction components were not saved")
+        frame = self[index]
+        return self._build_wavefunction({name: frame[name] for name in self._frames})
+
+    @abstractmethod
+    def _build_wavefunction(self, frame: dict[str, np.ndarray]) -> _Wavefunction:
+        """Constructs the system's wavefunction object from a single frame."""
+        pass
@@ -1,7 +1,4 @@
-try:
-    import cupy as cp  # type: ignore
-except ImportError:
-    import numpy as cp
+from pygpe.shared.backend import cp
 
 
 def _check_valid_tuple(points: tuple, grid_spacings: tuple) -> None:
@@ -0,0 +1,208 @@
+"""
+Memory footprint of a configured simulation, used to pack jobs onto nodes
+without running out of memory. :func:`memory_report` states the bytes held
+for the whole run, i.e. the meshes of the grid and the real- and
+Fourier-space components of the wavefunction, and measures the peak of the
+temporary arrays allocated while stepping and saving, from a dry run of a
+single step and save under `tracemalloc`. On the GPU, temporaries are
+measured from CuPy's memory pool instead, as device memory is not traced.
+"""
+
+import copy
+import importlib
+import os
+import tempfile
+import tracemalloc
+from typing import Callable
+
+from pygpe.shared.backend import cp, synchronise
+from pygpe.shared.grid import Grid
+from pygpe.shared.wavefunction import _Wavefunction
+
+
+def _array_bytes(obj: object, prefix: str | None = None, exclude: str = "") -> int:
+    """Returns the bytes of the arrays held by the attributes of `obj`,
+    optionally only those whose names start with `prefix`, or do not start
+    with `exclude`.
+    """
+    return sum(
+        value.nbytes
+        for name, value in vars(obj).items()
+        if isinstance(value, cp.ndarray)
+        and (prefix is None or name.startswith(prefix))
+        and not (exclude and name.startswith(exclude))
+    )
+
+
+def _format_bytes(num_bytes: int | None) -> str:
+    if num_bytes is None:
+        return "-"
+    return f"{num_bytes / 2**20:.2f} MiB"
+
+
+def _uniform_wavefunction(grid: Grid, wavefunction_type: type) -> _Wavefunction:
+    """Returns a wavefunction of uniform density, split equally between its
+    components, whose Fourier-space components are up-to-date.
+    """
+    system = importlib.import_module(wavefunction_type.__module__.rsplit(".", 1)[0])
+    wfn = wavefunction_type(grid)
+    num_components = len(system.DataManager._components)
+    wfn.set_wavefunction(
+        *(
+            cp.ones(grid.shape, dtype="complex128") / num_components**0.5
+            for _ in range(num_components)
+        )
+    )
+    wfn.fft()
+    return wfn
+
+
+def _measure_peak(function: Callable[[], None]) -> tuple[int, int]:
+    """Calls `function` and returns the peak bytes of the temporary arrays it
+    allocated in the memory of the array backend and in host memory.
+    """
+    tracing = tracemalloc.is_tracing()
+    if not tracing:
+        tracemalloc.start()
+    try:
+        if cp.__name__ == "cupy":
+            pool = cp.get_default_memory_pool()
+            pool.free_all_blocks()
+            used = pool.used_bytes()
+        host_start, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        function()
+        _, host_peak = tracemalloc.get_traced_memory()
+        host_peak -= host_start
+        if cp.__name__ == "cupy":
+            synchronise()
+            # Blocks freed during the call stay cached by the pool
+            return pool.total_bytes() - used, host_peak
+        return host_peak, host_peak
+    finally:
+        if not tracing:
+            tracemalloc.stop()
+
+
+class MemoryReport:
+    """The memory footprint of a simulation, in bytes.
+
+    :ivar grid_bytes: The meshes and wave numbers of the grid.
+    :ivar component_bytes: The real-space components of the wavefunction.
+    :ivar fourier_bytes: The Fourier-space components of the wavefunction.
+    :ivar step_peak_bytes: The peak of the temporary arrays allocated in a
+        time step.
+    :ivar save_peak_bytes: The peak of the temporary arrays allocated when
+        creating the DataManager and saving a frame, or None if saving was not
+        measured.
+    :ivar host_peak_bytes: On the GPU, the peak of the temporary host memory
+        allocated in a step or save, e.g. to copy frames to the host. None on
+        the CPU, where it is included in the other peaks.
+    """
+
+    def __init__(
+        self,
+        grid_bytes: int,
+        component_bytes: int,
+        fourier_bytes: int,
+        step_peak_bytes: int,
+        save_peak_bytes: int | None = None,
+        host_peak_bytes: int | None = None,
+    ) -> None:
+        self.grid_bytes = grid_bytes
+        self.component_bytes = component_bytes
+        self.fourier_bytes = fourier_bytes
+        self.step_peak_bytes = step_peak_bytes
+        self.save_peak_bytes = save_peak_bytes
+        self.host_peak_bytes = host_peak_bytes
+
+    @property
+    def resident_bytes(self) -> int:
+        """The bytes held for the whole run."""
+        return self.grid_bytes + self.component_bytes + self.fourier_bytes
+
+    @property
+    def peak_bytes(self) -> int:
+        """The bytes held at the peak of a step or save."""
+        return self.resident_bytes + max(
+            self.step_peak_bytes, self.save_peak_bytes or 0
+        )
+
+    def __str__(self) -> str:
+        rows = [
+            ("grid", self.grid_bytes),
+            ("components", self.component_bytes),
+            ("fourier components", self.fourier_bytes),
+            ("resident", self.resident_bytes),
+            ("step temporaries", self.step_peak_bytes),
+            ("save temporaries", self.save_peak_bytes),
+            ("peak", self.peak_bytes),
+        ]
+        if self.host_peak_bytes is not None:
+            rows.append(("host temporaries", self.host_peak_bytes))
+        return "\n".join(
+            f"{name:<20}{_format_bytes(value):>14}" for name, value in rows
+        )
+
+
+def memory_report(
+    grid: Grid,
+    wavefunction_type: type,
+    params: dict,
+    data_options: dict | None = None,
+) -> MemoryReport:
+    """Reports the memory footprint of simulating a wavefunction on a grid,
+    measuring temporary allocations from a dry run of one time step and,
+    optionally, of saving a frame.
+
+    :param grid: The grid of the simulation.
+    :type grid: Grid
+    :param wavefunction_type: The wavefunction class of the system, e.g.
+        :class:`~pygpe.spintwo.SpinTwoWavefunction`.
+    :type wavefunction_type: type
+    :param params: The parameters of the simulation, used for the dry run.
+    :type params: dict
+    :param data_options: If specified, a frame is saved in the dry run by the
+        system's DataManager configured with these options, e.g.
+        `{"observables": ["density"]}`. The data is written to a temporary
+        folder, which is removed afterwards.
+    :type data_options: dict, optional
+    :return: The memory report.
+    :rtype: MemoryReport
+    """
+    system = importlib.import_module(wavefunction_type.__module__.rsplit(".", 1)[0])
+    wfn = _uniform_wavefunction(grid, wavefunction_type)
+
+    step_wfn, step_params = copy.deepcopy(wfn), dict(params)
+    step_peak, host_peak = _measure_peak(
+        lambda: system.step_wavefunction(step_wfn, step_params)
+    )
+    del step_wfn
+
+    save_peak = None
+    if data_options is not None:
+        with tempfile.TemporaryDirectory(dir=".") as folder:
+
+            def save() -> None:
+                # Data paths are relative to the working directory
+                data = system.DataManager(
+                    "memory_report.hdf5",
+                    os.path.relpath(folder),
+                    wfn,
+                    dict(params),
+                    **data_options,
+                )
+                data.save_wavefunction(wfn)
+                data.close()
+
+            save_peak, save_host_peak = _measure_peak(save)
+        host_peak = max(host_peak, save_host_peak)
+
+    return MemoryReport(
+        _array_bytes(grid),
+        _array_bytes(wfn, exclude="fourier_"),
+        _array_bytes(wfn, prefix="fourier_"),
+        step_peak,
+        save_peak,
+        host_peak if cp.__name__ == "cupy" else None,
+    )
@@ -0,0 +1,351 @@
+"""
+Predicting the cost of a simulation before submitting it, and planning its
+configuration. The planner runs short calibration benchmarks of each system
+once per machine and caches the results, by default in
+`~/.cache/pygpe/planner.json` or the folder set by `PYGPE_CACHE_DIR`. From
+the calibration, it predicts the time per step and memory of a grid size::
+
+    from pygpe.shared.planner import plan
+
+    print(plan("spinone", (500, 500)))
+
+The time per step is modelled as `a N log2(N) + b N + c` for `N` grid
+points, with non-negative coefficients fitted to steps of 2D grids of
+several sizes, which captures the Fourier transforms
+and element-wise operations of any dimension. Memory is the measured bytes
+per grid point of the grid, the wavefunction and the temporaries of a step,
+see :func:`~pygpe.shared.memory.memory_report`.
+
+The planner suggests even grid sizes that are products of small primes close
+to the requested size, on which FFTs are fastest, and how many simulations fit
+on the machine at once. Wavefunctions are always double precision, and the
+array backend is CuPy if it is installed and NumPy otherwise, whose FFTs are
+single-threaded, so ensembles are parallelised over processes.
+"""
+
+import importlib
+import itertools
+import json
+import math
+import os
+import platform
+import time
+from pathlib import Path
+
+import numpy as np
+
+from pygpe.shared.backend import cp, synchronise
+from pygpe.shared.grid import Grid
+from pygpe.shared.memory import _uniform_wavefunction, memory_report
+from pygpe.shared.subgrid import _build_grid
+
+SYSTEMS = {
+    "scalar": "ScalarWavefunction",
+    "spinhalf": "SpinHalfWavefunction",
+    "spinone": "SpinOneWavefunction",
+    "spintwo": "SpinTwoWavefunction",
+}
+
+# Parameters of the calibration steps, in imaginary time so that the
+# renormalisation is included
+_CALIBRATION_PARAMS = {
+    "scalar": {"g": 1.0},
+    "spinhalf": {"g_plus": 1.0, "g_minus": 1.0, "g_pm": 0.5},
+    "spinone": {"c0": 10.0, "c2": 0.5, "p": 0.0, "q": 0.5},
+    "spintwo": {"c0": 10.0, "c2": 0.5, "c4": 1.0, "p": 0.0, "q": 0.5},
+}
+
+# More sizes than coefficients of the time model, so timing noise is averaged
+# out by the fit rather than interpolated
+_CALIBRATION_SIZES = [32, 64, 96, 128, 192, 256]
+
+
+def _cache_path() -> Path:
+    folder = os.environ.get("PYGPE_CACHE_DIR", Path.home() / ".cache" / "pygpe")
+    return Path(folder) / "planner.json"
+
+
+def _machine() -> str:
+    """Returns the key identifying the machine and array backend."""
+    device = platform.processor() or platform.machine()
+    if cp.__name__ == "cupy":
+        device = cp.cuda.runtime.getDeviceProperties(0)["name"].decode()
+    return f"{platform.node()}/{device}/{cp.__name__}"
+
+
+def _available_memory() -> int:
+    """Returns the memory of the device holding the arrays, in bytes."""
+    if cp.__name__ == "cupy":
+        return cp.cuda.Device().mem_info[1]
+    return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+
+
+def _features(num_points: int) -> list[float]:
+    return [num_points * math.log2(num_points), num_points, 1.0]
+
+
+def _time_step(system: str, grid: Grid, repeats: int = 5) -> float:
+    """Returns the best time of a step of the system on the grid."""
+    module = importlib.import_module(f"pygpe.{system}")
+    params = {**_CALIBRATION_PARAMS[system], "trap": 0.0, "dt": -1j * 1e-3}
+    wfn = _uniform_wavefunction(grid, getattr(module, SYSTEMS[system]))
+    module.step_wavefunction(wfn, params)  # Warm-up, e.g. FFT plans
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        module.step_wavefunction(wfn, params)
+        synchronise()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _fit_non_negative(features: np.ndarray, times: np.ndarray) -> np.ndarray:
+    """Returns the non-negative coefficients minimising the squared residual
+    of `features @ coefficients` against `times`. With only a few features,
+    the least-squares fit over every subset of them is compared directly.
+    """
+    num_features = features.shape[1]
+    best, best_residual = np.zeros(num_features), float(np.sum(times**2))
+    for size in range(1, num_features + 1):
+        for subset in itertools.combinations(range(num_features), size):
+            columns = list(subset)
+            fitted, *_ = np.linalg.lstsq(features[:, columns], times, rcond=None)
+            if np.any(fitted < 0):
+                continue
+            coefficients = np.zeros(num_features)
+            coefficients[columns] = fitted
+            residual = float(np.sum((features @ coefficients - times) ** 2))
+            if residual < best_residual:
+                best, best_residual = coefficients, residual
+    return best
+
+
+def _calibrate_system(system: str) -> dict:
+    """Fits the time model and measures the memory per grid point of a
+    system.
+    """
+    sizes = [n * n for n in _CALIBRATION_SIZES]
+    times = [_time_step(system, Grid((n, n), (0.5, 0.5))) for n in _CALIBRATION_SIZES]
+    coefficients = _fit_non_negative(
+        np.array([_features(size) for size in sizes]), np.array(times)
+    )
+
+    n = _CALIBRATION_SIZES[-1]
+    module = importlib.import_module(f"pygpe.{system}")
+    report = memory_report(
+        Grid((n, n), (0.5, 0.5)),
+        getattr(module, SYSTEMS[system]),
+        {**_CALIBRATION_PARAMS[system], "trap": 0.0, "dt": -1j * 1e-3},
+    )
+    return {
+        "coefficients": coefficients.tolist(),
+        "bytes_per_point": report.peak_bytes / n**2,
+        "sizes": _CALIBRATION_SIZES,
+    }
+
+
+def calibrate(
+    systems: list[str] | None = None, force: bool = False, cache: str | None = None
+) -> dict[str, dict]:
+    """Returns the calibration of each system on this machine, running the
+    calibration benchmarks of systems that are not cached yet.
+
+    :param systems: The systems to calibrate. Defaults to every system.
+    :type systems: list[str], optional
+    :param force: If True, cached calibrations are measured again.
+    :type force: bool
+    :param cache: The path of the calibration cache. Defaults to
+        `planner.json` in `PYGPE_CACHE_DIR`, or in `~/.cache/pygpe`.
+    :type cache: str, optional
+    :return: The time model coefficients and bytes per grid point of each
+        system.
+    :rtype: dict[str, dict]
+    """
+    systems = systems or list(SYSTEMS)
+    for system in systems:
+        if system not in SYSTEMS:
+            raise ValueError(f"System {system} is unsupported, use one of {SYSTEMS}")
+    cache = Path(cache) if cache is not None else _cache_path()
+    entries = json.loads(cache.read_text()) if cache.exists() else {}
+    machine = entries.setdefault(_machine(), {})
+
+    # Calibrations measured on other sizes, e.g. by older versions, are redone
+    missing = [
+        system
+        for system in systems
+        if force or machine.get(system, {}).get("sizes") != _CALIBRATION_SIZES
+    ]
+    for system in missing:
+        machine[system] = _calibrate_system(system)
+    if missing:
+        cache.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = cache.with_name(f"{cache.name}.tmp")
+        temp_path.write_text(json.dumps(entries, indent=2))
+        os.replace(temp_path, cache)
+    return {system: machine[system] for system in systems}
+
+
+def fft_friendly_size(
+    points: int, primes: tuple[int, ...] = (2, 3, 5), even: bool = True
+) -> int:
+    """Returns the smallest number of points, at least `points`, whose prime
+    factors are all in `primes`, on which FFTs are fast.
+
+    :param points: The requested number of points.
+    :type points: int
+    :param primes: The allowed prime factors. Defaults to 2, 3 and 5.
+    :type primes: tuple[int, ...]
+    :param even: If True, only even numbers of points are considered, as the
+        Fourier meshes of :class:`~pygpe.shared.grid.Grid` are only correct
+        for even numbers of points. Defaults to True.
+    :type even: bool
+    :return: The number of points.
+    :rtype: int
+    """
+    if even and 2 not in primes:
+        raise ValueError(f"Even sizes need 2 in the prime factors {primes}")
+    candidate = max(points, 1)
+    if even:
+        candidate += candidate % 2
+    while True:
+        remainder = candidate
+        for prime in primes:
+            while remainder % prime == 0:
+                remainder //= prime
+        if remainder == 1:
+            return candidate
+        candidate += 2 if even else 1
+
+
+class Plan:
+    """The predicted cost of simulating a system on a grid.
+
+    :ivar system: The system, e.g. "spinone".
+    :ivar points: The number of points along each axis of the grid.
+    :ivar time_per_step: The predicted time of a step, in seconds.
+    :ivar memory_bytes: The predicted peak memory of a simulation, in bytes.
+    :ivar max_processes: The number of simulations fitting on the machine at
+        once, limited by memory and, on the CPU, by the number of processors.
+    :ivar backend: The array backend, "numpy" or "cupy".
+    """
+
+    def __init__(
+        self,
+        system: str,
+        points: tuple[int, ...],
+        time_per_step: float,
+        memory_bytes: int,
+        max_processes: int,
+    ) -> None:
+        self.system = system
+        self.points = points
+        self.time_per_step = time_per_step
+        self.memory_bytes = memory_bytes
+        self.max_processes = max_processes
+        self.backend = cp.__name__
+
+    @property
+    def feasible(self) -> bool:
+        """Whether a single simulation fits in memory."""
+        return self.max_processes > 0
+
+    def time(self, num_steps: int) -> float:
+        """Returns the predicted time of `num_steps` steps, in seconds."""
+        return num_steps * self.time_per_step
+
+    def __str__(self) -> str:
+        return (
+            f"{self.system} on {' x '.join(str(n) for n in self.points)} points "
+            f"({self.backend}): {1e3 * self.time_per_step:.3g} ms per step, "
+            f"{self.memory_bytes / 2**20:.1f} MiB, "
+            f"{self.max_processes} simulations at once"
+        )
+
+
+def predict(
+    system: str,
+    points: int | tuple[int, ...],
+    memory_limit: int | None = None,
+    cache: str | None = None,
+) -> Plan:
+    """Predicts the time per step and memory of simulating a system on a grid
+    of the given number of points.
+
+    :param system: The system, i.e. "scalar", "spinhalf", "spinone" or
+        "spintwo".
+    :type system: str
+    :param points: The number of points along each axis of the grid.
+    :type points: int or tuple of ints
+    :param memory_limit: The memory available to simulations, in bytes.
+        Defaults to the memory of the machine, or of the GPU.
+    :type memory_limit: int, optional
+    :param cache: The path of the calibration cache, see :func:`calibrate`.
+    :type cache: str, optional
+    :return: The predicted cost.
+    :rtype: Plan
+    """
+    points = (points,) if isinstance(points, int) else tuple(points)
+    calibration = calibrate([system], cache=cache)[system]
+    num_points = math.prod(points)
+    time_per_step = float(np.dot(calibration["coefficients"], _features(num_points)))
+    memory_bytes = int(calibration["bytes_per_point"] * num_points)
+
+    max_processes = (memory_limit or _available_memory()) // memory_bytes
+    if cp.__name__ != "cupy":
+        max_processes = min(max_processes, os.cpu_count())
+    return Plan(system, points, time_per_step, memory_bytes, max_processes)
+
+
+def plan(
+    system: str,
+    points: int | tuple[int, ...],
+    memory_limit: int | None = None,
+    cache: str | None = None,
+) -> Plan:
+    """Suggests the fastest feasible grid close to, and at least as fine as,
+    the requested number of points, among sizes whose FFTs are fast.
+
+    :param system: The system, i.e. "scalar", "spinhalf", "spinone" or
+        "spintwo".
+    :type system: str
+    :param points: The requested number of points along each axis of the
+        grid.
+    :type points: int or tuple of ints
+    :param memory_limit: The memory available to simulations, in bytes.
+        Defaults to the memory of the machine, or of the GPU.
+    :type memory_limit: int, optional
+    :param cache: The path of the calibration cache, see :func:`calibrate`.
+    :type cache: str, optional
+    :return: The plan of the suggested grid.
+    :rtype: Plan
+    """
+    points = (points,) if isinstance(points, int) else tuple(points)
+    candidates = {
+        tuple(fft_friendly_size(n) for n in points),
+        tuple(2 ** max(math.ceil(math.log2(n)), 1) for n in points),
+    }
+    plans = [predict(system, size, memory_limit, cache) for size in candidates]
+    feasible = [plan for plan in plans if plan.feasible]
+    if not feasible:
+        smallest = min(plans, key=lambda plan: plan.memory_bytes)
+        raise ValueError(
+            f"A {system} simulation on {points} points needs "
+            f"{smallest.memory_bytes / 2**30:.1f} GiB, more than the memory "
+            "available"
+        )
+    return min(feasible, key=lambda plan: plan.time_per_step)
+
+
+def plan_grid(plan: Plan, lengths: tuple[float, ...]) -> Grid:
+    """Returns the grid of a plan spanning a box of the given lengths.
+
+    :param plan: The plan.
+    :type plan: Plan
+    :param lengths: The length of the box along each axis.
+    :type lengths: tuple[float, ...]
+    :return: The grid.
+    :rtype: Grid
+    """
+    return _build_grid(
+        plan.points, tuple(length / n for length, n in zip(lengths, plan.points))
+    )
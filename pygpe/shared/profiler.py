@@ -0,0 +1,197 @@
+"""
+Profiling of the stages of the time evolution and of saving data. While a
+:class:`Profiler` is active, the kinetic, nonlinear (potential or
+interaction) and renormalisation steps of every system, the Fourier
+transforms of every wavefunction and `DataManager.save_wavefunction` are
+timed on each call::
+
+    with Profiler(trace=True) as profiler:
+        for i in range(params["nt"]):
+            gpe.step_wavefunction(psi, params)
+            ...
+    print(profiler.report())
+    profiler.export_chrome_trace("trace.json")
+
+Stages are instrumented by replacing the functions when the profiler is
+entered and restoring them when it exits, so nothing is timed, and nothing
+costs time, outside of the `with` block. Timings are aggregated per stage as
+calls happen, so the profiler's memory does not grow with the length of the
+run. Optionally, the most recent calls are also kept and can be exported as
+a trace for Perfetto or `chrome://tracing`, in which nested stages, e.g. the
+Fourier transforms of a renormalisation, are shown within their parent
+stage.
+"""
+
+import importlib
+import json
+import os
+import threading
+import time
+from collections import deque
+from functools import wraps
+from typing import Callable
+
+from pygpe.shared.backend import cp, synchronise
+from pygpe.shared.data_manager import _DataManager
+
+SYSTEMS = ["scalar", "spinhalf", "spinone", "spintwo"]
+
+# The functions of each system's evolution module timed as each stage
+_EVOLUTION_STAGES = {
+    "_kinetic_step": "kinetic",
+    "_kinetic_zeeman_step": "kinetic",
+    "_potential_step": "nonlinear",
+    "_interaction_step": "nonlinear",
+    "_renormalise_wavefunction": "renormalise",
+}
+
+_active_profiler = None
+
+
+class Profiler:
+    """Times the stages of the time evolution and of saving data while it is
+    active, i.e. within a `with` block.
+
+    :param synchronize: If True, the GPU is synchronised before and after each
+        stage so that its kernels are timed, rather than only their launch.
+        Has no effect on the CPU.
+    :type synchronize: bool
+    :param trace: If True, the timed calls are kept, so that they can be
+        exported with :meth:`export_chrome_trace`.
+    :type trace: bool
+    :param max_events: The number of most recent calls kept when tracing, or
+        None to keep every call. Defaults to 100000.
+    :type max_events: int, optional
+
+    :ivar events: The stage, system, start time and duration, in nanoseconds,
+        and thread of the most recent timed calls, if tracing.
+    """
+
+    def __init__(
+        self,
+        synchronize: bool = True,
+        trace: bool = False,
+        max_events: int | None = 100000,
+    ) -> None:
+        if max_events is not None and max_events < 1:
+            raise ValueError(f"At least one event must be kept, not {max_events}")
+        self.events: deque[tuple[str, str, int, int, int]] = deque(maxlen=max_events)
+        self._trace = trace
+        # The number of calls and total duration, in nanoseconds, of each stage
+        self._totals: dict[str, list[int]] = {}
+        self._synchronize = synchronize and cp.__name__ == "cupy"
+        self._patched: list[tuple[object, str, Callable]] = []
+
+    def _timed(self, function: Callable, stage: str, system: str) -> Callable:
+        """Returns `function` recording the duration of each call."""
+        events = self.events if self._trace else None
+        totals = self._totals.setdefault(stage, [0, 0])
+        synchronize = self._synchronize
+
+        @wraps(function)
+        def timed(*args, **kwargs):
+            if synchronize:
+                synchronise()
+            start = time.perf_counter_ns()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                if synchronize:
+                    synchronise()
+                duration = time.perf_counter_ns() - start
+                totals[0] += 1
+                totals[1] += duration
+                if events is not None:
+                    events.append(
+                        (stage, system, start, duration, threading.get_ident())
+                    )
+
+        return timed
+
+    def _patch(self, owner: object, name: str, stage: str, system: str) -> None:
+        original = vars(owner)[name]
+        self._patched.append((owner, name, original))
+        setattr(owner, name, self._timed(original, stage, system))
+
+    def __enter__(self) -> "Profiler":
+        global _active_profiler
+        if _active_profiler is not None:
+            raise ValueError("Another Profiler is already active")
+        _active_profiler = self
+
+        for system in SYSTEMS:
+            evolution = importlib.import_module(f"pygpe.{system}.evolution")
+            for name, stage in _EVOLUTION_STAGES.items():
+                if name in vars(evolution):
+                    self._patch(evolution, name, stage, system)
+            wavefunction = importlib.import_module(f"pygpe.{system}.wavefunction")
+            for cls in vars(wavefunction).values():
+                if isinstance(cls, type) and cls.__module__ == wavefunction.__name__:
+                    self._patch(cls, "fft", "fft", system)
+                    self._patch(cls, "ifft", "ifft", system)
+        self._patch(_DataManager, "save_wavefunction", "save", "io")
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        global _active_profiler
+        for owner, name, original in reversed(self._patched):
+            setattr(owner, name, original)
+        self._patched.clear()
+        _active_profiler = None
+
+    def summary(self) -> dict[str, dict[str, float]]:
+        """Returns the number of calls and the total and mean time, in
+        seconds, of each stage. Times of a stage include those of its nested
+        stages, e.g. the renormalisation includes its Fourier transforms.
+
+        :return: The timings of each stage.
+        :rtype: dict[str, dict[str, float]]
+        """
+        return {
+            stage: {"calls": calls, "total": total / 1e9, "mean": total / calls / 1e9}
+            for stage, (calls, total) in self._totals.items()
+            if calls > 0
+        }
+
+    def report(self) -> str:
+        """Returns a table of the timings of each stage, slowest first.
+
+        :return: The table.
+        :rtype: str
+        """
+        lines = [f"{'stage':<14}{'calls':>8}{'total (s)':>12}{'mean (ms)':>12}"]
+        summary = sorted(
+            self.summary().items(), key=lambda item: item[1]["total"], reverse=True
+        )
+        for stage, timings in summary:
+            lines.append(
+                f"{stage:<14}{timings['calls']:>8}{timings['total']:>12.4f}"
+                f"{1e3 * timings['mean']:>12.4f}"
+            )
+        return "\n".join(lines)
+
+    def export_chrome_trace(self, filename: str) -> None:
+        """Writes the most recent timed calls as a trace in the Chrome trace
+        event format, which can be opened with Perfetto or `chrome://tracing`.
+        The profiler must be tracing.
+
+        :param filename: The path of the trace file, e.g. "trace.json".
+        :type filename: str
+        """
+        if not self._trace:
+            raise ValueError("Calls are only kept when tracing, use trace=True")
+        pid = os.getpid()
+        events = [
+            {
+                "name": stage,
+                "cat": system,
+                "ph": "X",
+                "ts": start / 1e3,
+                "dur": duration / 1e3,
+                "pid": pid,
+                "tid": thread,
+            }
+            for stage, system, start, duration, thread in self.events
+        ]
+        with open(filename, "w") as file:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, file)
@@ -0,0 +1,46 @@
+"""
+Multi-resolution pyramid of the saved density, for fast browsing of large
+trajectories. Level `l` of the pyramid holds the density Fourier-downsampled
+by a factor of `2**l` along each axis, while level 0 is the full-resolution
+data. Readers pick the coarsest level that still resolves the requested
+display size.
+"""
+
+import pygpe.shared.data_manager_paths as dmp
+from pygpe.shared.grid import Grid
+from pygpe.shared.subgrid import _CoarseSubGrid, _grid_points
+
+
+def _pyramid_path(level: int) -> str:
+    """Returns the path of the density time series of a pyramid level."""
+    return f"{dmp.PYRAMID}/level_{level}/density"
+
+
+def _pyramid_subgrids(grid: Grid, levels: int) -> dict[int, _CoarseSubGrid]:
+    """Returns the coarse sub-grid of each level of a pyramid with the given
+    number of levels below the full resolution.
+    """
+    if levels < 0 or 2**levels > min(_grid_points(grid)):
+        raise ValueError(
+            f"{levels} pyramid levels are unsupported for a grid of shape "
+            f"{grid.shape}"
+        )
+    return {level: _CoarseSubGrid(grid, 2**level) for level in range(1, levels + 1)}
+
+
+def _choose_level(
+    shapes: dict[int, tuple[int, ...]], display_shape: int | tuple[int, ...]
+) -> int:
+    """Returns the coarsest level whose shape has at least as many points as
+    the display along every axis, or the finest level if none does.
+
+    :param shapes: The frame shape of each available level.
+    :param display_shape: The number of points to display along each axis, or
+        along all axes if an integer.
+    """
+    if isinstance(display_shape, int):
+        display_shape = (display_shape,) * len(next(iter(shapes.values())))
+    for level in sorted(shapes, reverse=True):
+        if all(n >= m for n, m in zip(shapes[level], display_shape)):
+            return level
+    return min(shapes)
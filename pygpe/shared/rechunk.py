@@ -0,0 +1,287 @@
+"""
+Rechunking of existing HDF5 data files into a read-optimised layout.
+Files written by the DataManager store frames along the last axis of each
+time series, so reading a single frame gathers strided data from the whole
+dataset. :func:`rechunk` rewrites every time series of a file time-major,
+i.e. as `(time, *grid)` with one frame per chunk, optionally compressed or
+with complex data stored in single precision. Frames are streamed in blocks
+of at most `max_bytes`, so memory use is bounded whatever the grid size, and
+the rewritten data is compared against the original before the original
+file is replaced. Uncompressed series can instead be stored contiguously, so
+that the DataReader memory-maps them rather than reading through HDF5.
+
+Many files can be rechunked in parallel with :func:`rechunk_files`, or from
+the command line::
+
+    python -m pygpe.shared.rechunk data/*.hdf5 --workers 8 --compression gzip
+
+The DataReader reads rechunked files unchanged, as each time series records
+its time axis.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+import pygpe.shared.data_manager_paths as dmp
+from pygpe.shared.backend import h5py
+from pygpe.shared.sharding import _time_series
+from pygpe.shared.storage import _series_length, _time_axis
+
+
+# The default bytes of the frames held in memory at a time
+MAX_BYTES = 2**28
+
+
+def _blocks(dataset: h5py.Dataset, num_frames: int, max_bytes: int):
+    """Yields the frame ranges of consecutive blocks of a time series, each
+    holding at least one frame and otherwise at most `max_bytes`.
+    """
+    frames_held = dataset.shape[_time_axis(dataset.attrs, dataset.ndim)]
+    frame_bytes = dataset.size // max(frames_held, 1) * dataset.dtype.itemsize
+    block_frames = max(1, max_bytes // max(frame_bytes, 1))
+    for start in range(0, num_frames, block_frames):
+        yield slice(start, min(start + block_frames, num_frames))
+
+
+def _read_block(dataset: h5py.Dataset, frames: slice) -> np.ndarray:
+    """Reads a block of frames of a time series, with time as the leading
+    axis.
+    """
+    time_axis = _time_axis(dataset.attrs, dataset.ndim)
+    key = [slice(None)] * dataset.ndim
+    key[time_axis] = frames
+    return np.moveaxis(dataset[tuple(key)], time_axis, 0)
+
+
+def _rechunked_dtype(dtype: np.dtype, complex64: bool) -> np.dtype:
+    if complex64 and dtype == np.complex128:
+        return np.dtype(np.complex64)
+    return dtype
+
+
+def _copy_series(
+    source: h5py.Dataset,
+    target: h5py.File,
+    compression: str | None,
+    compression_level: int | None,
+    complex64: bool,
+    contiguous: bool,
+    max_bytes: int,
+) -> None:
+    """Writes the saved frames of the time series `source` time-major into
+    `target`, leaving out the placeholder frame of a series without saves.
+    """
+    time_axis = _time_axis(source.attrs, source.ndim)
+    num_frames = _series_length(source.attrs, source.shape)
+    frame_shape = tuple(n for axis, n in enumerate(source.shape) if axis != time_axis)
+
+    # Records, e.g. of the frame table, cannot be memory-mapped reliably
+    if contiguous and source.dtype.fields is None:
+        layout = {}
+    else:
+        layout = {
+            "maxshape": (None, *frame_shape),
+            # Frames of a scalar, e.g. rows of the frame table, are chunked together
+            "chunks": (1, *frame_shape) if frame_shape else True,
+            "compression": compression,
+            "compression_opts": compression_level,
+        }
+    dataset = target.create_dataset(
+        source.name,
+        (num_frames, *frame_shape),
+        dtype=_rechunked_dtype(source.dtype, complex64),
+        **layout,
+    )
+    for frames in _blocks(source, num_frames, max_bytes):
+        dataset[frames] = _read_block(source, frames)
+
+    dataset.attrs.update(source.attrs)  # Including the number of saved frames
+    dataset.attrs[dmp.TIME_AXIS] = 0
+
+
+def _verify(source_path: Path, target_path: Path, max_bytes: int) -> None:
+    """Raises a ValueError if any frame of the rechunked file differs from the
+    original, up to the precision of the rechunked data.
+    """
+    with h5py.File(source_path, "r") as source, h5py.File(target_path, "r") as target:
+        for path in _time_series(source):
+            original, rechunked = source[path], target[path]
+            num_frames = rechunked.shape[0]
+            if _series_length(original.attrs, original.shape) != num_frames:
+                raise ValueError(f"Rechunked {path} of {source_path} lost frames")
+            for frames in _blocks(original, num_frames, max_bytes):
+                expected = _read_block(original, frames).astype(rechunked.dtype)
+                # Compared bitwise, so unrecorded (NaN) times compare equal
+                if expected.tobytes() != rechunked[frames].tobytes():
+                    raise ValueError(
+                        f"Rechunked {path} of {source_path} differs from the "
+                        f"original in frames {frames.start} to {frames.stop}"
+                    )
+
+
+def rechunk(
+    filename: str,
+    data_path: str,
+    output_filename: str | None = None,
+    compression: str | None = None,
+    compression_level: int | None = None,
+    complex64: bool = False,
+    contiguous: bool = False,
+    max_bytes: int = MAX_BYTES,
+    verify: bool = True,
+) -> Path:
+    """Rewrites a data file with every time series stored time-major, with one
+    frame per chunk.
+
+    :param filename: The name of the data file.
+    :type filename: str
+    :param data_path: The relative path to the folder containing the data file.
+    :type data_path: str
+    :param output_filename: The name of the rechunked file, written next to
+        the original. By default, the original file is replaced.
+    :type output_filename: str, optional
+    :param compression: The HDF5 compression filter of the rechunked data,
+        e.g. "gzip" or "lzf". By default, data is not compressed.
+    :type compression: str, optional
+    :param compression_level: The level of "gzip" compression, from 0 to 9.
+    :type compression_level: int, optional
+    :param complex64: If True, complex data is stored in single precision.
+        Defaults to False.
+    :type complex64: bool
+    :param contiguous: If True, the time series are stored contiguously and
+        uncompressed, so the DataReader memory-maps them. Frames can no longer
+        be appended to the file. Defaults to False.
+    :type contiguous: bool
+    :param max_bytes: The bytes of the frames held in memory at a time, of
+        which at least one frame is held. Defaults to 256 MiB.
+    :type max_bytes: int
+    :param verify: If True, the rechunked data is compared against the
+        original before the original is replaced. Defaults to True.
+    :type verify: bool
+    :return: The path of the rechunked file.
+    :rtype: Path
+    """
+    if contiguous and compression is not None:
+        raise ValueError("Contiguous time series cannot be compressed")
+    source_path = Path(f"./{data_path}") / filename
+    if source_path.is_dir():
+        raise ValueError(f"{source_path} is not a HDF5 file")
+    target_path = source_path.with_name(
+        output_filename or f"{source_path.name}.rechunk.tmp"
+    )
+
+    try:
+        with h5py.File(source_path, "r") as source, h5py.File(
+            target_path, "w"
+        ) as target:
+            if dmp.SHARDS in source:
+                raise ValueError(
+                    f"{source_path} combines shards, rechunk the shards instead"
+                )
+            target.attrs.update(source.attrs)
+            series = _time_series(source)
+
+            def copy(name: str, obj) -> None:
+                if isinstance(obj, h5py.Dataset) and name not in series:
+                    group = target.require_group(obj.parent.name)
+                    source.copy(obj, group, name.split("/")[-1])
+
+            source.visititems(copy)
+            for path in series:
+                _copy_series(
+                    source[path],
+                    target,
+                    compression,
+                    compression_level,
+                    complex64,
+                    contiguous,
+                    max_bytes,
+                )
+
+        if verify:
+            _verify(source_path, target_path, max_bytes)
+    except BaseException:
+        target_path.unlink(missing_ok=True)
+        raise
+
+    if output_filename is None:
+        os.replace(target_path, source_path)
+        return source_path
+    return target_path
+
+
+def _rechunk_path(path: Path, options: dict) -> Path:
+    """Rechunks the file at `path` in a worker process."""
+    # Data paths are relative to the working directory
+    return rechunk(path.name, os.path.relpath(path.parent), **options)
+
+
+def rechunk_files(
+    paths: list[str | Path], workers: int | None = None, **options
+) -> list[Path]:
+    """Rechunks many data files in parallel, replacing each file, see
+    :func:`rechunk`.
+
+    :param paths: The paths of the data files.
+    :type paths: list[str | Path]
+    :param workers: The number of worker processes. Defaults to the number of
+        processors.
+    :type workers: int, optional
+    :param options: Options passed on to :func:`rechunk`, e.g. `compression`.
+    :return: The paths of the rechunked files.
+    :rtype: list[Path]
+    """
+    if "output_filename" in options:
+        raise ValueError("Files rechunked in parallel are replaced in place")
+    paths = [Path(path) for path in paths]
+    with ProcessPoolExecutor(workers) as executor:
+        return list(executor.map(_rechunk_path, paths, [options] * len(paths)))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Rewrites pygpe HDF5 data files time-major, with one frame "
+        "per chunk."
+    )
+    parser.add_argument("paths", nargs="+", type=Path, help="the data files")
+    parser.add_argument("--workers", type=int, help="the number of processes")
+    parser.add_argument("--compression", choices=["gzip", "lzf"])
+    parser.add_argument("--compression-level", type=int)
+    parser.add_argument(
+        "--complex64",
+        action="store_true",
+        help="store complex data in single precision",
+    )
+    parser.add_argument(
+        "--contiguous",
+        action="store_true",
+        help="store uncompressed series contiguously, to be memory-mapped",
+    )
+    parser.add_argument(
+        "--max-bytes",
+        type=int,
+        default=MAX_BYTES,
+        help="the bytes of the frames held in memory at a time",
+    )
+    parser.add_argument(
+        "--no-verify", action="store_true", help="skip comparing against the original"
+    )
+    args = parser.parse_args()
+
+    for path in rechunk_files(
+        args.paths,
+        args.workers,
+        compression=args.compression,
+        compression_level=args.compression_level,
+        complex64=args.complex64,
+        contiguous=args.contiguous,
+        max_bytes=args.max_bytes,
+        verify=not args.no_verify,
+    ):
+        print(path)
@@ -0,0 +1,220 @@
+"""
+Rendering of saved trajectories into images and movies.
+:func:`render_frames` renders panels of each saved frame, e.g. the density,
+the phase of a component or the spin, in parallel worker processes, each of
+which opens the data file read-only and reuses a single figure for all of its
+frames. Figures are drawn with matplotlib's Agg renderer, without pyplot, so
+no display is needed and the pyplot state of the caller is untouched.
+Images are numbered by frame and can be encoded into a movie with `ffmpeg`,
+if it is installed.
+"""
+
+import shutil
+import subprocess
+import tempfile
+import warnings
+from pathlib import Path
+
+import numpy as np
+from matplotlib.figure import Figure
+
+from pygpe.shared.data_reader import _DataReader
+from pygpe.shared.subgrid import _grid_spacings
+from pygpe.shared.utils import handle_array
+
+
+def _panel_data(reader: _DataReader, name: str, index: int) -> np.ndarray:
+    """Returns the data shown by the panel `name` for the specified frame,
+    i.e. the middle plane of the last axis of 3D data. Saved observables,
+    densities and phases are read plane by plane, while other observables are
+    computed from the whole saved wavefunction.
+    """
+    if name in reader.observables:
+        return reader.observable(name).plane(index)
+    if name == "density":
+        if not reader._has_full_density():
+            raise ValueError("The full-resolution density was not saved")
+        return sum(abs(frames.plane(index)) ** 2 for frames in reader._frames.values())
+    if name == "phase":  # Phase of the first component
+        return np.angle(reader.component(next(iter(reader._frames))).plane(index))
+    if name.startswith("phase_"):
+        return np.angle(reader.component(name.removeprefix("phase_")).plane(index))
+    if name in reader._observables:
+        data = handle_array(reader._observables[name](reader.wavefunction(index)))
+        return data[..., data.shape[-1] // 2] if data.ndim == 3 else data
+    raise ValueError(f"Panel {name} is unsupported")
+
+
+class _FrameRenderer:
+    """Renders frames into numbered images, creating its figure on the first
+    frame and reusing it for every further frame. Used as the function mapped
+    over the frames, see :meth:`_DataReader.map_frames`, so that each worker
+    renders its block of frames with its own figure.
+    """
+
+    def __init__(
+        self,
+        panels: list[str],
+        output_dir: Path,
+        limits: dict[str, tuple[float, float]],
+        dpi: int,
+    ) -> None:
+        self.panels = panels
+        self.output_dir = output_dir
+        self.limits = limits
+        self.dpi = dpi
+        self._figure = None
+        self._axes = []
+        self._artists = []
+
+    def _limits(self, name: str) -> tuple[float, float] | tuple[None, None]:
+        if name in self.limits:
+            return self.limits[name]
+        if name.startswith("phase"):
+            return -np.pi, np.pi
+        return None, None
+
+    def _create_figure(self, reader: _DataReader, data: list[np.ndarray]) -> None:
+        # Panels show the x- and y-axes of the saved grid
+        x, y = reader.origin[:2] if reader.grid.ndim > 1 else (reader.origin[0], 0)
+        dx, dy = (*_grid_spacings(reader.grid), 0)[:2]
+        self._figure = Figure(figsize=(4 * len(self.panels), 4), layout="constrained")
+        self._axes = self._figure.subplots(1, len(self.panels), squeeze=False)[0]
+        for ax, name, panel in zip(self._axes, self.panels, data):
+            vmin, vmax = self._limits(name)
+            if panel.ndim == 1:
+                (artist,) = ax.plot(x + dx * np.arange(len(panel)), panel)
+                if (vmin, vmax) != (None, None):  # Otherwise, autoscaled
+                    ax.set_ylim(vmin, vmax)
+            else:
+                artist = ax.imshow(
+                    panel.T,
+                    origin="lower",
+                    extent=(
+                        x - dx / 2,
+                        x + dx * (panel.shape[0] - 0.5),
+                        y - dy / 2,
+                        y + dy * (panel.shape[1] - 0.5),
+                    ),
+                    vmin=vmin,
+                    vmax=vmax,
+                    cmap="twilight" if name.startswith("phase") else "viridis",
+                )
+                self._figure.colorbar(artist, ax=ax)
+            self._artists.append(artist)
+
+    def __call__(self, reader: _DataReader, index: int) -> str:
+        data = [_panel_data(reader, name, index) for name in self.panels]
+        if self._figure is None:
+            self._create_figure(reader, data)
+        else:
+            for ax, name, artist, panel in zip(
+                self._axes, self.panels, self._artists, data
+            ):
+                autoscale = self._limits(name) == (None, None)
+                if panel.ndim == 1:
+                    artist.set_ydata(panel)
+                    if autoscale:
+                        ax.relim()
+                        ax.autoscale_view()
+                else:
+                    artist.set_data(panel.T)
+                    if autoscale:
+                        artist.autoscale()
+
+        t = reader.times[index]
+        for ax, name in zip(self._axes, self.panels):
+            ax.set_title(name if np.isnan(t) else f"{name}, t = {t:.4g}")
+        path = self.output_dir / f"frame_{index:06d}.png"
+        self._figure.savefig(path, dpi=self.dpi)
+        return str(path)
+
+
+def _encode_movie(images: list[str], movie: Path, fps: int) -> None:
+    """Encodes the images, in order, into a movie with ffmpeg. The images are
+    linked into a temporary folder under consecutive names, so that images
+    left in the output folder by earlier calls are not encoded.
+    """
+    with tempfile.TemporaryDirectory() as folder:
+        for number, image in enumerate(images):
+            link = Path(folder) / f"{number:06d}.png"
+            try:
+                link.symlink_to(Path(image).resolve())
+            except OSError:  # Symbolic links may be unsupported, e.g. on Windows
+                shutil.copyfile(image, link)
+        subprocess.run(
+            [
+                shutil.which("ffmpeg"),
+                "-y",
+                "-loglevel",
+                "error",
+                "-framerate",
+                str(fps),
+                "-i",
+                str(Path(folder) / "%06d.png"),
+                # H.264 needs even image dimensions
+                "-vf",
+                "pad=ceil(iw/2)*2:ceil(ih/2)*2",
+                "-c:v",
+                "libx264",
+                "-pix_fmt",
+                "yuv420p",
+                str(movie),
+            ],
+            check=True,
+        )
+
+
+def render_frames(
+    reader: _DataReader,
+    output_dir: str,
+    panels: list[str] | None = None,
+    workers: int | None = None,
+    limits: dict[str, tuple[float, float]] | None = None,
+    dpi: int = 100,
+    movie: str | None = None,
+    fps: int = 25,
+) -> list[str]:
+    """Renders every saved frame into a numbered image, e.g.
+    `frame_000042.png`, in parallel worker processes.
+
+    :param reader: The DataReader of the saved trajectory.
+    :type reader: DataReader
+    :param output_dir: The folder the images are written to, created if
+        necessary.
+    :type output_dir: str
+    :param panels: The panels shown side by side. A panel is the name of an
+        observable, e.g. "density" or "spin_z", which is computed from the
+        wavefunction if it was not saved, "phase" for the phase of the first
+        component or "phase_<component>", e.g. "phase_zero_component".
+        Defaults to the density. 3D data is shown on the middle plane of the
+        z-axis.
+    :type panels: list[str], optional
+    :param workers: The number of worker processes. Defaults to the number of
+        processors.
+    :type workers: int, optional
+    :param limits: The fixed colour limits of each panel, e.g.
+        `{"density": (0, 2)}`. Limits otherwise follow the data of each frame,
+        except for phases.
+    :type limits: dict[str, tuple[float, float]], optional
+    :param dpi: The resolution of the images. Defaults to 100.
+    :type dpi: int
+    :param movie: If given, the images are also encoded into a movie at this
+        path, e.g. "movie.mp4", if `ffmpeg` is installed.
+    :type movie: str, optional
+    :param fps: The frame rate of the movie. Defaults to 25.
+    :type fps: int
+    :return: The paths of the images.
+    :rtype: list[str]
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    renderer = _FrameRenderer(panels or ["density"], output_dir, limits or {}, dpi)
+    images = reader.map_frames(renderer, workers)
+
+    if movie is not None:
+        if shutil.which("ffmpeg") is None:
+            warnings.warn("ffmpeg was not found, so only the images were rendered")
+        else:
+            _encode_movie(images, Path(movie), fps)
+    return images
@@ -0,0 +1,199 @@
+"""
+Diagnostics of whether a grid resolves the wavefunction, from its Fourier
+spectrum. A resolved wavefunction holds a negligible fraction of its norm and
+kinetic energy in the outermost shells of Fourier space, i.e. the modes with
+wave numbers close to the largest the grid represents. Significant weight in
+these shells means structure is unresolved and, as the nonlinear terms
+transfer it to yet higher modes, aliased back onto the grid.
+
+:func:`resolution_report` measures the weight of the outermost shells,
+warns if it exceeds a tolerance and suggests the smallest grid spanning the
+same box whose outermost shells would still be below the tolerance. It only
+needs the Fourier-space components, so it can be called during a run or on
+saved frames::
+
+    report = resolution_report(psi)
+    report = resolution_report(reader.wavefunction(-1))
+
+Only periodic grids are meaningful, not regions of a saved grid.
+"""
+
+from __future__ import annotations
+
+import math
+import warnings
+
+import numpy as np
+
+from pygpe.shared.backend import cp
+from pygpe.shared.grid import Grid
+from pygpe.shared.planner import fft_friendly_size
+from pygpe.shared.spectral import _axis_wave_numbers
+from pygpe.shared.subgrid import _build_grid, _grid_points, _grid_spacings
+from pygpe.shared.utils import handle_array
+from pygpe.shared.wavefunction import _Wavefunction
+
+
+def _axis_meshes(grid: Grid) -> list[cp.ndarray]:
+    return [getattr(grid, f"fourier_{axis}_mesh") for axis in "xyz"[: grid.ndim]]
+
+
+def _tail_fractions(
+    weights: np.ndarray, relative_wave_numbers: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    """Returns the sorted relative wave numbers along an axis and, for each,
+    the fraction of the weight held by larger wave numbers.
+    """
+    order = np.argsort(relative_wave_numbers)
+    sorted_weights = weights[order]
+    # Weight strictly above each wave number, summing modes of equal |k|
+    above = sorted_weights.sum() - np.cumsum(sorted_weights)
+    relative = relative_wave_numbers[order]
+    last_of_value = np.r_[relative[1:] != relative[:-1], True]
+    return relative[last_of_value], above[last_of_value] / sorted_weights.sum()
+
+
+class ResolutionReport:
+    """The weight of the outermost Fourier shells of a wavefunction, and the
+    smallest grid resolving it.
+
+    :ivar points: The number of points along each axis of the grid.
+    :ivar norm_fraction: The fraction of the norm in the outermost shells.
+    :ivar kinetic_fraction: The fraction of the kinetic energy in the
+        outermost shells.
+    :ivar tolerance: The largest acceptable fraction.
+    :ivar suggested_points: The smallest number of points along each axis,
+        spanning the same box, keeping both fractions below the tolerance, or
+        None if the grid is under-resolved.
+    :ivar suggested_grid_spacings: The grid spacings of the suggested grid.
+    """
+
+    def __init__(
+        self,
+        points: tuple[int, ...],
+        norm_fraction: float,
+        kinetic_fraction: float,
+        tolerance: float,
+        suggested_points: tuple[int, ...] | None,
+        suggested_grid_spacings: tuple[float, ...] | None,
+    ) -> None:
+        self.points = points
+        self.norm_fraction = norm_fraction
+        self.kinetic_fraction = kinetic_fraction
+        self.tolerance = tolerance
+        self.suggested_points = suggested_points
+        self.suggested_grid_spacings = suggested_grid_spacings
+
+    @property
+    def resolved(self) -> bool:
+        """Whether the outermost shells hold less weight than the tolerance."""
+        return max(self.norm_fraction, self.kinetic_fraction) <= self.tolerance
+
+    def suggested_grid(self) -> Grid | None:
+        """Returns the suggested grid, or None if the grid is under-resolved."""
+        if self.suggested_points is None:
+            return None
+        return _build_grid(self.suggested_points, self.suggested_grid_spacings)
+
+    def __str__(self) -> str:
+        lines = [
+            f"norm in outermost shells:           {self.norm_fraction:.2e}",
+            f"kinetic energy in outermost shells: {self.kinetic_fraction:.2e}",
+        ]
+        if self.resolved:
+            lines.append(f"resolved; smallest grid: {self.suggested_points}")
+        else:
+            lines.append(f"under-resolved at tolerance {self.tolerance:g}")
+        return "\n".join(lines)
+
+
+def resolution_report(
+    wfn: _Wavefunction,
+    tolerance: float = 1e-6,
+    shell_fraction: float = 0.1,
+    warn: bool = True,
+) -> ResolutionReport:
+    """Measures the fraction of the norm and kinetic energy of a wavefunction
+    held by the outermost Fourier shells, i.e. the modes whose wave number
+    along any axis exceeds `1 - shell_fraction` of the largest on the grid.
+
+    :param wfn: The wavefunction, whose Fourier-space components must be
+        up-to-date.
+    :type wfn: :class:`Wavefunction`
+    :param tolerance: The largest acceptable fraction of the norm or kinetic
+        energy in the outermost shells. Defaults to 1e-6.
+    :type tolerance: float
+    :param shell_fraction: The width of the outermost shells, as a fraction of
+        the largest wave number along each axis. Defaults to 0.1.
+    :type shell_fraction: float
+    :param warn: If True, a warning is issued when the wavefunction is
+        under-resolved.
+    :type warn: bool
+    :return: The report.
+    :rtype: ResolutionReport
+    """
+    if not 0 < shell_fraction < 1:
+        raise ValueError(f"Shell fraction {shell_fraction} is not between 0 and 1")
+    grid = wfn.grid
+    points = _grid_points(grid)
+    spectrum = sum(
+        cp.abs(value) ** 2
+        for name, value in vars(wfn).items()
+        if name.startswith("fourier_") and hasattr(value, "shape")
+    )
+    kinetic = grid.wave_number * spectrum
+
+    # Largest wave number along any axis, relative to that axis' largest
+    relative = cp.stack(
+        [cp.abs(mesh) / cp.abs(mesh).max() for mesh in _axis_meshes(grid)]
+    ).max(axis=0)
+    outer = relative > 1 - shell_fraction
+    totals = handle_array(
+        cp.stack(
+            [
+                cp.sum(spectrum[outer]),
+                cp.sum(spectrum),
+                cp.sum(kinetic[outer]),
+                cp.sum(kinetic),
+            ]
+        )
+    )
+    norm_fraction = float(totals[0] / totals[1])
+    kinetic_fraction = float(totals[2] / totals[3]) if totals[3] > 0 else 0.0
+
+    suggested_points = suggested_spacings = None
+    if max(norm_fraction, kinetic_fraction) <= tolerance:
+        suggested_points, suggested_spacings = [], []
+        for axis, wave_numbers in enumerate(_axis_wave_numbers(grid)):
+            others = tuple(i for i in range(grid.ndim) if i != axis)
+            norm_weights = handle_array(spectrum.sum(axis=others))
+            kinetic_weights = handle_array(kinetic.sum(axis=others))
+            relative_wave_numbers = np.abs(wave_numbers) / np.abs(wave_numbers).max()
+            values, norm_tail = _tail_fractions(norm_weights, relative_wave_numbers)
+            _, kinetic_tail = _tail_fractions(kinetic_weights, relative_wave_numbers)
+            if kinetic_weights.sum() == 0:
+                kinetic_tail = np.zeros_like(norm_tail)
+            # The smallest wave number beyond which the tail is negligible
+            cutoff = values[np.argmax(np.maximum(norm_tail, kinetic_tail) <= tolerance)]
+            # Points placing the cutoff just inside the outermost shells
+            needed = math.ceil(points[axis] * cutoff / (1 - shell_fraction))
+            size = min(fft_friendly_size(needed), points[axis])
+            suggested_points.append(size)
+            suggested_spacings.append(points[axis] * _grid_spacings(grid)[axis] / size)
+        suggested_points = tuple(suggested_points)
+        suggested_spacings = tuple(suggested_spacings)
+    elif warn:
+        warnings.warn(
+            f"{100 * max(norm_fraction, kinetic_fraction):.2g}% of the norm or "
+            f"kinetic energy is in the outermost Fourier shells, so the grid of "
+            f"{points} points is likely under-resolved and aliased"
+        )
+
+    return ResolutionReport(
+        points,
+        norm_fraction,
+        kinetic_fraction,
+        tolerance,
+        suggested_points,
+        suggested_spacings,
+    )
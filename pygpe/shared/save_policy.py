@@ -0,0 +1,169 @@
+"""
+Save policies deciding when the DataManager saves a frame. Policies are
+passed to a DataManager through its `policies` argument and are consulted on
+every call to `DataManager.maybe_save()`, which saves a frame whenever any of
+the policies asks for one.
+"""
+
+from __future__ import annotations
+
+import time
+from abc import ABC, abstractmethod
+from typing import Callable
+
+import numpy as np
+
+from pygpe.shared.backend import cp
+from pygpe.shared.wavefunction import _Wavefunction
+
+
+class SavePolicy(ABC):
+    """Defines the abstract base class of save policies."""
+
+    def _bind(self, data_manager) -> None:
+        """Called when the policy is attached to a DataManager."""
+        pass
+
+    def _resume(self, t: float) -> None:
+        """Called when the DataManager resumes an existing file, with the
+        simulation time of the last frame kept in the file.
+        """
+        pass
+
+    @abstractmethod
+    def should_save(self, wfn: _Wavefunction, t: float) -> bool:
+        """Returns whether a frame should be saved at the current time.
+
+        :param wfn: The wavefunction of the system.
+        :type wfn: :class:`Wavefunction`
+        :param t: The current simulation time.
+        :type t: float
+        """
+        pass
+
+    def record_save(self, wfn: _Wavefunction, t: float) -> None:
+        """Called after every saved frame, whichever policy asked for it.
+
+        :param wfn: The wavefunction of the system.
+        :type wfn: :class:`Wavefunction`
+        :param t: The simulation time of the saved frame.
+        :type t: float
+        """
+        pass
+
+
+class LogSpacedTimes(SavePolicy):
+    """Saves frames at logarithmically spaced simulation times, as used in
+    coarsening studies. A frame is saved at the first call at or after each
+    target time. When the DataManager resumes a file, the target times up to
+    that of the last frame in the file are skipped.
+
+    :param t_start: The first save time, must be positive.
+    :type t_start: float
+    :param t_end: The last save time.
+    :type t_end: float
+    :param num_times: The number of save times.
+    :type num_times: int
+    """
+
+    def __init__(self, t_start: float, t_end: float, num_times: int) -> None:
+        """Constructs the policy."""
+        if not 0 < t_start <= t_end:
+            raise ValueError(f"Save times {t_start} to {t_end} must be increasing")
+        self.times = np.geomspace(t_start, t_end, num_times)
+        self._next = 0
+
+    def should_save(self, wfn: _Wavefunction, t: float) -> bool:
+        return self._next < len(self.times) and t >= self.times[self._next]
+
+    def record_save(self, wfn: _Wavefunction, t: float) -> None:
+        # Skip every target time already passed, e.g. with a large time step.
+        # Frames saved without a time, recorded as NaN, pass no target time
+        if not np.isnan(t):
+            self._next = int(np.searchsorted(self.times, t, side="right"))
+
+    def _resume(self, t: float) -> None:
+        if not np.isnan(t):
+            self._next = int(np.searchsorted(self.times, t, side="right"))
+
+
+class WallClockInterval(SavePolicy):
+    """Saves a frame whenever at least `interval` seconds of wall-clock time
+    have passed since the last save.
+
+    :param interval: The minimum wall-clock time between saves, in seconds.
+    :type interval: float
+    """
+
+    def __init__(self, interval: float) -> None:
+        """Constructs the policy."""
+        self.interval = interval
+        self._last_save = time.monotonic()
+
+    def should_save(self, wfn: _Wavefunction, t: float) -> bool:
+        return time.monotonic() - self._last_save >= self.interval
+
+    def record_save(self, wfn: _Wavefunction, t: float) -> None:
+        self._last_save = time.monotonic()
+
+
+class ChangeTriggered(SavePolicy):
+    """Saves a frame whenever a metric of the wavefunction has changed by more
+    than a relative threshold since the last save, measured as
+    `||m - m_saved|| / ||m_saved||` in the L2 norm.
+
+    :param threshold: The relative change triggering a save.
+    :type threshold: float
+    :param metric: Function returning the metric, e.g. the energy, as an array
+        or scalar. Defaults to the total density of the system, which needs
+        the real-space wavefunction to be updated on every check.
+    :type metric: Callable, optional
+    :param check_every: The metric is only evaluated on every `check_every`-th
+        call, to bound its cost. Defaults to 1.
+    :type check_every: int
+    """
+
+    def __init__(
+        self,
+        threshold: float,
+        metric: Callable[[_Wavefunction], cp.ndarray | float] | None = None,
+        check_every: int = 1,
+    ) -> None:
+        """Constructs the policy."""
+        self.threshold = threshold
+        self.metric = metric
+        self.check_every = check_every
+        self._calls = 0
+        self._saved_metric = None
+        self._current_metric = None  # Metric evaluated by the latest check
+
+    def _bind(self, data_manager) -> None:
+        if self.metric is None:
+            density = data_manager._observables["density"]
+
+            def metric(wfn: _Wavefunction) -> cp.ndarray:
+                wfn.ifft()
+                return density(wfn)
+
+            self.metric = metric
+
+    def should_save(self, wfn: _Wavefunction, t: float) -> bool:
+        self._calls += 1
+        self._current_metric = None
+        if self._saved_metric is None:
+            return True
+        if self._calls % self.check_every != 0:
+            return False
+
+        self._current_metric = self.metric(wfn)
+        change = cp.linalg.norm(cp.ravel(self._current_metric - self._saved_metric))
+        reference = cp.linalg.norm(cp.ravel(self._saved_metric))
+        if reference == 0:
+            return bool(change > 0)
+        return bool(change / reference > self.threshold)
+
+    def record_save(self, wfn: _Wavefunction, t: float) -> None:
+        if self._current_metric is None:
+            self._current_metric = self.metric(wfn)
+        self._saved_metric = self._current_metric
+        self._current_metric = None
@@ -0,0 +1,156 @@
+"""
+Sharded output for ensemble and parameter-sweep runs.
+Each worker writes its own shard file through a DataManager constructed with
+the `shard` argument, so no file is ever shared between processes. Once the
+shards are written, :func:`combine_shards` creates a master file whose
+datasets are HDF5 virtual datasets presenting every shard as a single array
+with a leading realisation axis, without copying any data.
+"""
+
+from __future__ import annotations
+
+from pathlib import Path
+
+import numpy as np
+
+import pygpe.shared.data_manager_paths as dmp
+from pygpe.shared.backend import h5py
+from pygpe.shared.storage import _series_length, _time_axis
+
+
+def shard_filename(filename: str, shard: int) -> str:
+    """Returns the name of the file written by the specified shard, e.g.
+    "data.hdf5" becomes "data_shard0003.hdf5" for shard 3.
+
+    :param filename: The name of the combined data file.
+    :type filename: str
+    :param shard: The index of the shard.
+    :type shard: int
+    :return: The filename of the shard.
+    :rtype: str
+    """
+    if shard < 0:
+        raise ValueError(f"Shard index {shard} must be non-negative")
+    path = Path(filename)
+    return f"{path.stem}_shard{shard:04d}{path.suffix}"
+
+
+def _find_shards(filename: str, data_path: Path) -> list[str]:
+    """Returns the filenames of all shards of `filename` in `data_path`,
+    ordered by shard index.
+    """
+    path = Path(filename)
+    shards = sorted(data_path.glob(f"{path.stem}_shard[0-9]*{path.suffix}"))
+    return [shard.name for shard in shards]
+
+
+def _time_series(file: h5py.File) -> list[str]:
+    """Returns the paths of all saved time series in `file`, i.e. every
+    dataset outside the grid and parameter groups, other than results reduced
+    over all frames.
+    """
+    paths = []
+
+    def visit(name: str, obj) -> None:
+        if (
+            isinstance(obj, h5py.Dataset)
+            and name.split("/")[0] not in ("grid", dmp.PARAMETERS)
+            and not obj.attrs.get(dmp.REDUCED, False)
+        ):
+            paths.append(name)
+
+    file.visititems(visit)
+    return paths
+
+
+def _check_same_grid(reference: h5py.File, shard: h5py.File, name: str) -> None:
+    """Raises a ValueError if the grid of `shard` differs from the reference
+    shard.
+    """
+    for key in reference["grid"]:
+        if reference["grid"][key][()] != shard["grid"][key][()]:
+            raise ValueError(f"Grid of shard {name} does not match the first shard")
+
+
+def combine_shards(
+    filename: str, data_path: str, shard_filenames: list[str] | None = None
+) -> None:
+    """Creates a master file presenting all shards as one logical dataset.
+    Each time series of the shards, e.g. every wavefunction component, becomes
+    a virtual dataset in the master file with a leading realisation axis
+    followed by the axes of the shards, e.g. `(realisation, *grid, time)` for
+    the default time-last layout, with realisations ordered as the shards.
+    Shards holding fewer frames than the longest shard are padded with zeros.
+    The grid and parameters of the first shard are copied into the master
+    file.
+
+    The master file only references the shards, so it is cheap to create and
+    can be re-created at any point, e.g. while the shards are still growing.
+    The shards must stay in the same folder as the master file.
+
+    :param filename: The name of the master file to create.
+    :type filename: str
+    :param data_path: The relative path to the folder containing the shards.
+    :type data_path: str
+    :param shard_filenames: The filenames of the shards to combine. Defaults
+        to all shards of `filename` found in `data_path`.
+    :type shard_filenames: list[str], optional
+    """
+    data_path = Path(f"./{data_path}")
+    if shard_filenames is None:
+        shard_filenames = _find_shards(filename, data_path)
+    if not shard_filenames:
+        raise ValueError(f"No shards of {filename} found in {data_path}")
+
+    shards = [h5py.File(data_path / name, "r") for name in shard_filenames]
+    try:
+        for shard, name in zip(shards[1:], shard_filenames[1:]):
+            _check_same_grid(shards[0], shard, name)
+
+        with h5py.File(data_path / filename, "w") as master:
+            shards[0].copy("grid", master)
+            shards[0].copy(dmp.PARAMETERS, master)
+            master.create_dataset(dmp.SHARDS, data=np.array(shard_filenames, "S"))
+
+            for path in _time_series(shards[0]):
+                _create_virtual_dataset(master, path, shards, shard_filenames)
+    finally:
+        for shard in shards:
+            shard.close()
+
+
+def _create_virtual_dataset(
+    master: h5py.File, path: str, shards: list[h5py.File], names: list[str]
+) -> None:
+    """Creates the virtual dataset at `path` mapping the time series of every
+    shard onto its own realisation.
+    """
+    num_frames = [
+        _series_length(shard[path].attrs, shard[path].shape) for shard in shards
+    ]
+
+    reference = shards[0][path]
+    time_axis = _time_axis(reference.attrs, reference.ndim)
+    series_shape = list(reference.shape)
+    series_shape[time_axis] = max(num_frames)
+    layout = h5py.VirtualLayout(
+        shape=(len(shards), *series_shape), dtype=reference.dtype
+    )
+
+    # Each shard keeps its own axis order, so its saved frames are one mapping
+    for realisation, (shard, name) in enumerate(zip(shards, names)):
+        if num_frames[realisation] == 0:  # Left as fill value
+            continue
+        frames = [slice(None)] * reference.ndim
+        frames[time_axis] = slice(0, num_frames[realisation])
+        source = h5py.VirtualSource(name, path, shape=shard[path].shape)
+        layout[(realisation, *frames)] = source[tuple(frames)]
+
+    dataset = master.create_virtual_dataset(
+        path, layout, fillvalue=np.zeros((), dtype=reference.dtype)
+    )
+    dataset.attrs.update(reference.attrs)  # e.g. the space or sub-grid of frames
+    dataset.attrs.pop(dmp.NUM_SAVED, None)  # Superseded by the count of each shard
+    dataset.attrs[dmp.REALISATION_AXIS] = 0
+    dataset.attrs[dmp.TIME_AXIS] = time_axis + 1
+    dataset.attrs[dmp.NUM_FRAMES] = num_frames
@@ -0,0 +1,146 @@
+"""
+Helper functions for spectrally truncating wavefunction components, i.e.
+keeping only the Fourier modes within a momentum cutoff, and for
+reconstructing full-resolution components from the truncated modes.
+Fourier-space arrays are in the (unshifted) ordering of `fftn`.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+
+from pygpe.shared.backend import cp
+from pygpe.shared.grid import Grid
+from pygpe.shared.utils import handle_array
+
+
+def _axis_wave_numbers(grid: Grid) -> list[np.ndarray]:
+    """Returns the wave numbers along each axis of the grid, in the ordering
+    of `fftn`.
+    """
+    if grid.ndim == 1:
+        return [handle_array(grid.fourier_x_mesh)]
+
+    meshes = [grid.fourier_x_mesh, grid.fourier_y_mesh]
+    if grid.ndim == 3:
+        meshes.append(grid.fourier_z_mesh)
+    wave_numbers = []
+    for axis, mesh in enumerate(meshes):
+        key = [0] * grid.ndim
+        key[axis] = slice(None)
+        wave_numbers.append(handle_array(mesh[tuple(key)]))
+    return wave_numbers
+
+
+def _truncation_indices(grid: Grid, k_cutoff: float) -> tuple[np.ndarray, ...]:
+    """Returns the indices along each axis of the modes with wave number at
+    most `k_cutoff`. Together, the indices select the smallest box of modes
+    containing the sphere `|k| <= k_cutoff`, which is itself in the ordering
+    of `fftn`.
+    """
+    return tuple(
+        np.flatnonzero(np.abs(wave_numbers) <= k_cutoff)
+        for wave_numbers in _axis_wave_numbers(grid)
+    )
+
+
+def _truncation_mask(
+    grid: Grid, indices: tuple[np.ndarray, ...], k_cutoff: float
+) -> cp.ndarray:
+    """Returns the mask of the modes within the box selected by `indices`
+    that lie inside the sphere `|k| <= k_cutoff`.
+    """
+    box = tuple(cp.asarray(index) for index in indices)
+    return grid.wave_number[cp.ix_(*box)] <= k_cutoff**2
+
+
+def _truncate(
+    fourier_component: cp.ndarray,
+    indices: tuple[np.ndarray, ...],
+    mask: cp.ndarray,
+) -> cp.ndarray:
+    """Returns the modes of a Fourier-space component inside the momentum
+    cutoff, as a box of modes with those outside the cutoff set to zero.
+    """
+    box = tuple(cp.asarray(index) for index in indices)
+    return fourier_component[cp.ix_(*box)] * mask
+
+
+def _zero_pad(
+    truncated: np.ndarray, shape: tuple[int, ...], indices: tuple[np.ndarray, ...]
+) -> np.ndarray:
+    """Reconstructs full-resolution Fourier-space frames from truncated
+    frames by zero-padding the modes outside the cutoff. Any leading axes of
+    `truncated`, e.g. time, are preserved.
+    """
+    leading_shape = truncated.shape[: truncated.ndim - len(shape)]
+    padded = np.zeros((*leading_shape, *shape), dtype=truncated.dtype)
+    padded[(Ellipsis, *np.ix_(*indices))] = truncated
+    return padded
+
+
+def _energy_cutoff(
+    grid: Grid, fourier_components: list[cp.ndarray], tolerance: float
+) -> float:
+    """Returns the smallest momentum cutoff such that the fraction of kinetic
+    energy held by the modes outside the cutoff is at most `tolerance`.
+
+    :param grid: The grid of the system.
+    :param fourier_components: The Fourier-space wavefunction components.
+    :param tolerance: The maximum fraction of kinetic energy discarded.
+    :return: The momentum cutoff.
+    """
+    spectrum = sum(cp.abs(component) ** 2 for component in fourier_components)
+    energy = handle_array((grid.wave_number * spectrum).ravel())
+    wave_number = handle_array(cp.asarray(grid.wave_number).ravel())
+
+    order = np.argsort(wave_number, kind="stable")
+    retained = np.cumsum(energy[order])
+    total = retained[-1]
+    if total == 0:
+        return 0.0
+
+    discarded = (total - retained) / total
+    # Modes sharing a wave number must be kept or discarded together
+    last_of_shell = np.append(np.diff(wave_number[order]) > 0, True)
+    first_allowed = np.flatnonzero((discarded <= tolerance) & last_of_shell)[0]
+    return float(np.sqrt(wave_number[order][first_allowed]))
+
+
+def _resample_indices(
+    shape: tuple[int, ...], new_shape: tuple[int, ...]
+) -> tuple[np.ndarray, ...]:
+    """Returns the indices along each axis of the modes of an array of shape
+    `shape` that are retained when Fourier resampling it to `new_shape`, in
+    the ordering of `fftn` on the new grid.
+    """
+    return tuple(
+        (np.fft.fftfreq(m, 1 / m).astype(int) % n) for n, m in zip(shape, new_shape)
+    )
+
+
+def _fourier_downsample(
+    fourier_component: cp.ndarray,
+    new_shape: tuple[int, ...],
+    indices: tuple[np.ndarray, ...],
+) -> cp.ndarray:
+    """Returns the real-space array on a coarser grid of shape `new_shape`
+    holding the lowest Fourier modes of a Fourier-space component, where
+    `indices` are given by :func:`_resample_indices`. The sample values are
+    preserved, i.e. a constant array stays constant.
+    """
+    box = tuple(cp.asarray(index) for index in indices)
+    scale = np.prod(new_shape) / np.prod(fourier_component.shape)
+    return cp.fft.ifftn(fourier_component[cp.ix_(*box)]) * scale
+
+
+def _kinetic_energy(grid: Grid, fourier_components: list[cp.ndarray]) -> float:
+    """Returns the kinetic energy of the given Fourier-space components,
+    computed in Fourier space using Parseval's theorem.
+    """
+    spectrum = sum(cp.abs(component) ** 2 for component in fourier_components)
+    return float(
+        grid.grid_spacing_product
+        / grid.total_num_points
+        * cp.sum(0.5 * grid.wave_number * spectrum)
+    )
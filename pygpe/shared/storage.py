@@ -0,0 +1,639 @@
+"""
+Storage backends used by the DataManager and DataReader classes.
+Each backend stores the grid and parameter metadata, along with the time
+series of saved frames (e.g. wavefunction components), under the path
+constants defined in :mod:`pygpe.shared.data_manager_paths`:
+
+- "hdf5": a single HDF5 file, with frames stored along the last axis of each
+  dataset (the default). The file can optionally be written in HDF5's
+  single-writer/multiple-reader (SWMR) mode, so it can be read while the
+  simulation is running.
+- "zarr": a directory of Zarr arrays, one per time series, with frames along
+  the first axis. Requires the optional `zarr` package.
+- "memmap": a directory of `.npy` files, one per time series, with frames
+  along the first axis. The files can be memory-mapped directly with
+  `numpy.load(..., mmap_mode="r")`.
+
+The directory backends store the grid and parameters as JSON in a
+`metadata.json` file alongside the arrays.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import shutil
+from abc import ABC, abstractmethod
+from collections.abc import Mapping
+from pathlib import Path
+
+import numpy as np
+
+import pygpe.shared.data_manager_paths as dmp
+from pygpe.shared.backend import h5py
+
+METADATA_FILE = "metadata.json"
+
+
+def _time_axis(attrs: Mapping, ndim: int) -> int:
+    """Returns the (non-negative) axis indexing the saved frames of a time
+    series with the given attributes and dimensionality. Series written
+    without the time axis attribute store frames along the last axis.
+    """
+    return int(attrs.get(dmp.TIME_AXIS, -1)) % ndim
+
+
+def _series_length(attrs: Mapping, shape: tuple[int, ...]) -> int:
+    """Returns the number of saved frames of a time series with the given
+    attributes and shape, excluding the placeholder frame of a HDF5 series
+    that records its number of saved frames.
+    """
+    if dmp.NUM_SAVED in attrs:
+        return int(attrs[dmp.NUM_SAVED])
+    return shape[_time_axis(attrs, len(shape))]
+
+
+def _memory_map(dataset: h5py.Dataset) -> np.memmap | h5py.Dataset:
+    """Returns a read-only memory map of `dataset` if its layout allows it,
+    i.e. the data is stored contiguously and unfiltered, as in files rechunked
+    with `contiguous=True`. Otherwise, e.g. for the chunked, resizable series
+    written by the DataManager, the dataset itself is returned and reads go
+    through HDF5.
+    """
+    if dataset.is_virtual or dataset.chunks is not None:
+        return dataset
+    offset = dataset.id.get_offset()
+    if offset is None:  # Storage not yet allocated
+        return dataset
+    return np.memmap(
+        dataset.file.filename,
+        dtype=dataset.dtype,
+        mode="r",
+        offset=offset,
+        shape=dataset.shape,
+    )
+
+
+class _StorageBackend(ABC):
+    """Defines the abstract storage backend base class.
+    Each backend inherits from this class and provides overrides for the
+    abstract methods.
+
+    :param path: Path of the file or directory holding the data.
+    :type path: Path
+    :param mode: "w" to create a new store, truncating any existing one,
+        "r" to read an existing store, or "a" to append to an existing store.
+    :type mode: str
+    """
+
+    name = ""
+
+    def __init__(self, path: Path, mode: str = "r") -> None:
+        """Constructs the storage backend."""
+        if mode not in ("w", "r", "a"):
+            raise ValueError(f"Mode {mode} is unsupported")
+        self.path = Path(path)
+        self.mode = mode
+
+    @abstractmethod
+    def write_values(self, values: dict) -> None:
+        """Stores metadata values, e.g. the grid or condensate parameters.
+
+        :param values: Dictionary of the value stored at each key.
+        """
+        pass
+
+    def write_value(self, key: str, value, attrs: dict = None) -> None:
+        """Stores a single metadata value.
+
+        :param attrs: Attributes describing the value, e.g. its time axis if
+            it holds one result per frame. Only kept by the HDF5 backend, as
+            the directory backends never treat values as time series.
+        """
+        self.write_values({key: value})
+
+    @abstractmethod
+    def read_value(self, key: str):
+        """Returns a single metadata value."""
+        pass
+
+    @abstractmethod
+    def keys(self, group: str) -> list[str]:
+        """Returns the keys stored within the specified group."""
+        pass
+
+    @abstractmethod
+    def __contains__(self, key: str) -> bool:
+        pass
+
+    @abstractmethod
+    def create_series(
+        self, key: str, frame_shape: tuple[int, ...], dtype: str, attrs: dict = None
+    ) -> None:
+        """Creates a new time series holding frames of the specified shape
+        and data type.
+
+        :param key: Path of the time series.
+        :param frame_shape: Shape of each frame.
+        :param dtype: Data type of the frames.
+        :param attrs: Attributes describing the layout of the series.
+        """
+        pass
+
+    @abstractmethod
+    def write_frame(self, key: str, index: int, frame: np.ndarray) -> None:
+        """Writes a frame to the time series at the specified index. The time
+        series is resized to hold exactly `index + 1` frames.
+        """
+        pass
+
+    def write_frames(self, index: int, frames: dict[str, np.ndarray]) -> None:
+        """Writes one frame to each of the specified time series.
+
+        :param index: The index of the frames.
+        :param frames: Dictionary of the frame of each time series.
+        """
+        for key, frame in frames.items():
+            self.write_frame(key, index, frame)
+
+    @abstractmethod
+    def series(self, key: str):
+        """Returns a lazily-read, array-like object of the time series."""
+        pass
+
+    @abstractmethod
+    def series_attrs(self, key: str) -> dict:
+        """Returns the attributes of the time series."""
+        pass
+
+    @abstractmethod
+    def series_length(self, key: str) -> int:
+        """Returns the number of frames held by the time series."""
+        pass
+
+    def flush(self) -> None:
+        """Makes the frames written so far visible to concurrent readers."""
+        pass
+
+    def close(self) -> None:
+        """Closes any open handles of the store."""
+        pass
+
+
+class HDF5Backend(_StorageBackend):
+    """Stores the data in a single HDF5 file.
+    When writing, the file is only opened for the duration of each operation,
+    so the file can be inspected between saves.
+    """
+
+    name = "hdf5"
+
+    def __init__(self, path: Path, mode: str = "r", swmr: bool = False) -> None:
+        """Constructs the HDF5 backend.
+
+        :param swmr: If True, the file is written or read in SWMR mode. A
+            writer creates all time series before the first frame is written,
+            after which it holds the file open until closed, and frames are
+            visible to readers once flushed.
+        :type swmr: bool
+        """
+        super().__init__(path, mode)
+        self.swmr = swmr
+        if mode == "w":
+            # SWMR needs the latest file format, which is set at creation
+            h5py.File(self.path, "w", libver="latest" if swmr else None).close()
+        self._file = None
+        if mode == "r":
+            self._file = (
+                h5py.File(self.path, "r", libver="latest", swmr=True)
+                if swmr
+                else h5py.File(self.path, "r")
+            )
+
+    def write_values(self, values: dict) -> None:
+        with h5py.File(self.path, "r+") as file:
+            for key, value in values.items():
+                file.create_dataset(key, data=value)
+
+    def write_value(self, key: str, value, attrs: dict = None) -> None:
+        with h5py.File(self.path, "r+") as file:
+            dataset = file.create_dataset(key, data=value)
+            dataset.attrs.update(attrs or {})
+
+    def read_value(self, key: str):
+        with _Borrowed(self) as file:
+            return file[key][()]
+
+    def keys(self, group: str) -> list[str]:
+        with _Borrowed(self) as file:
+            return list(file[group])
+
+    def __contains__(self, key: str) -> bool:
+        with _Borrowed(self) as file:
+            return key in file
+
+    def create_series(
+        self, key: str, frame_shape: tuple[int, ...], dtype: str, attrs: dict = None
+    ) -> None:
+        with h5py.File(self.path, "r+") as file:
+            if self.swmr:  # Empty until the first frame, one frame per chunk
+                dataset = file.create_dataset(
+                    key,
+                    (*frame_shape, 0),
+                    maxshape=(*frame_shape, None),
+                    chunks=(*frame_shape, 1),
+                    dtype=dtype,
+                )
+            else:  # Holds a placeholder frame until the first frame is saved
+                dataset = file.create_dataset(
+                    key,
+                    (*frame_shape, 1),
+                    maxshape=(*frame_shape, None),
+                    dtype=dtype,
+                )
+                dataset.attrs[dmp.NUM_SAVED] = 0
+            dataset.attrs[dmp.TIME_AXIS] = len(frame_shape)
+            for name, value in (attrs or {}).items():
+                dataset.attrs[name] = value
+
+    def write_frame(self, key: str, index: int, frame: np.ndarray) -> None:
+        self.write_frames(index, {key: frame})
+
+    def write_frames(self, index: int, frames: dict[str, np.ndarray]) -> None:
+        if self.swmr:
+            self._write_frames(self._swmr_file(), index, frames)
+            return
+        with h5py.File(self.path, "r+") as file:
+            self._write_frames(file, index, frames)
+
+    @staticmethod
+    def _write_frames(
+        file: h5py.File, index: int, frames: dict[str, np.ndarray]
+    ) -> None:
+        for key, frame in frames.items():
+            dataset = file[key]
+            time_axis = _time_axis(dataset.attrs, dataset.ndim)
+            dataset.resize(index + 1, axis=time_axis)
+            selection = [slice(None)] * dataset.ndim
+            selection[time_axis] = index
+            dataset[tuple(selection)] = frame
+            if dmp.NUM_SAVED in dataset.attrs:
+                dataset.attrs[dmp.NUM_SAVED] = index + 1
+
+    def _swmr_file(self) -> h5py.File:
+        """Returns the file held open by a SWMR writer, opening it and
+        switching to SWMR mode on the first call. No datasets or attributes
+        can be created afterwards.
+        """
+        if self._file is None:
+            self._file = h5py.File(self.path, "r+", libver="latest")
+            self._file.swmr_mode = True
+        return self._file
+
+    def series(self, key: str):
+        if self.swmr:
+            dataset = self._file[key]
+            dataset.refresh()  # Pick up the frames flushed by the writer
+            return dataset
+        return _memory_map(self._file[key])
+
+    def series_attrs(self, key: str) -> dict:
+        return dict(self._file[key].attrs)
+
+    def series_length(self, key: str) -> int:
+        with _Borrowed(self) as file:
+            dataset = file[key]
+            return _series_length(dataset.attrs, dataset.shape)
+
+    def flush(self) -> None:
+        # The first flush of a SWMR writer switches the file to SWMR mode
+        if self.swmr and self.mode != "r":
+            self._swmr_file().flush()
+
+    def close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class _Borrowed:
+    """Context manager yielding the open file of a HDF5 backend, or opening
+    the file for the duration of the context if it is not held open.
+    """
+
+    def __init__(self, backend: HDF5Backend) -> None:
+        self._backend = backend
+        self._file = None
+
+    def __enter__(self) -> h5py.File:
+        if self._backend._file is not None:
+            return self._backend._file
+        self._file = h5py.File(self._backend.path, "r")
+        return self._file
+
+    def __exit__(self, *exc) -> None:
+        if self._file is not None:
+            self._file.close()
+
+
+def _to_json(value):
+    """Converts a metadata value into a JSON-serialisable object."""
+    if isinstance(value, np.ndarray | np.generic):
+        value = value.tolist()
+    if isinstance(value, complex):
+        return {"__complex__": [value.real, value.imag]}
+    if isinstance(value, list | tuple):
+        return [_to_json(item) for item in value]
+    return value
+
+
+def _from_json(value, root: Path):
+    """Converts an object loaded from JSON back into its metadata value."""
+    if isinstance(value, dict) and "__complex__" in value:
+        return complex(*value["__complex__"])
+    if isinstance(value, dict) and "__npy__" in value:
+        return np.load(root / value["__npy__"])
+    if isinstance(value, list):
+        return [_from_json(item, root) for item in value]
+    return value
+
+
+def _dtype_to_json(dtype: np.dtype):
+    """Converts a data type, including structured ones, into a JSON-
+    serialisable description.
+    """
+    return np.lib.format.dtype_to_descr(dtype)
+
+
+def _dtype_from_json(descr) -> np.dtype:
+    """Converts a description created by :func:`_dtype_to_json` back into the
+    data type.
+    """
+    if isinstance(descr, str):
+        return np.dtype(descr)
+    return np.dtype([tuple(field) for field in descr])
+
+
+class _DirectoryBackend(_StorageBackend):
+    """Defines the base class of backends storing each time series as a
+    separate array within a directory. Metadata is stored as JSON in
+    `metadata.json` within the directory, with frames along the first axis
+    of each array.
+    """
+
+    def __init__(self, path: Path, mode: str = "r") -> None:
+        """Constructs the directory backend."""
+        super().__init__(path, mode)
+        self._metadata_path = self.path / METADATA_FILE
+
+        if mode == "w":
+            if self._metadata_path.exists():  # Truncate an existing store
+                shutil.rmtree(self.path)
+            elif self.path.exists() and any(self.path.iterdir()):
+                raise FileExistsError(f"{self.path} is not an empty directory")
+            self.path.mkdir(parents=True, exist_ok=True)
+            self._metadata = {"backend": self.name, "series": {}}
+            self._write_metadata()
+        else:
+            with open(self._metadata_path) as file:
+                self._metadata = json.load(file)
+
+    def _write_metadata(self) -> None:
+        """Atomically replaces the metadata file with the current metadata."""
+        temp_path = self._metadata_path.with_suffix(".tmp")
+        with open(temp_path, "w") as file:
+            json.dump(self._metadata, file, indent=2)
+        os.replace(temp_path, self._metadata_path)
+
+    def _lookup(self, key: str):
+        """Returns the entry of the metadata stored at `key`."""
+        entry = self._metadata
+        for part in key.split("/"):
+            entry = entry[part]
+        return entry
+
+    def write_values(self, values: dict) -> None:
+        for key, value in values.items():
+            *groups, name = key.split("/")
+            entry = self._metadata
+            for group in groups:
+                entry = entry.setdefault(group, {})
+
+            if np.ndim(value) > 0:  # Arrays are stored alongside the metadata
+                self.path.joinpath(*groups).mkdir(parents=True, exist_ok=True)
+                np.save(self.path / f"{key}.npy", np.asarray(value))
+                entry[name] = {"__npy__": f"{key}.npy"}
+            else:
+                entry[name] = _to_json(value)
+        self._write_metadata()
+
+    def read_value(self, key: str):
+        return _from_json(self._lookup(key), self.path)
+
+    def _series_in_group(self, group: str) -> list[str]:
+        """Returns the names of the time series and subgroups of time series
+        directly within the specified group.
+        """
+        prefix = f"{group}/"
+        return [
+            key[len(prefix) :].split("/")[0]
+            for key in self._metadata["series"]
+            if key.startswith(prefix)
+        ]
+
+    def keys(self, group: str) -> list[str]:
+        series = self._series_in_group(group)
+        if not series:
+            return list(self._lookup(group))
+        try:
+            values = list(self._lookup(group))
+        except KeyError:
+            values = []
+        return list(dict.fromkeys(values + series))
+
+    def __contains__(self, key: str) -> bool:
+        if key in self._metadata["series"] or self._series_in_group(key):
+            return True
+        try:
+            self._lookup(key)
+        except (KeyError, TypeError):
+            return False
+        return True
+
+    def create_series(
+        self, key: str, frame_shape: tuple[int, ...], dtype: str, attrs: dict = None
+    ) -> None:
+        attrs = {dmp.TIME_AXIS: 0, **(attrs or {})}
+        self._metadata["series"][key] = {
+            "frame_shape": list(frame_shape),
+            "dtype": _dtype_to_json(np.dtype(dtype)),
+            "attrs": {name: _to_json(value) for name, value in attrs.items()},
+        }
+        self.path.joinpath(*key.split("/")[:-1]).mkdir(parents=True, exist_ok=True)
+        self._create_array(key, tuple(frame_shape), np.dtype(dtype))
+        self._write_metadata()
+
+    @abstractmethod
+    def _create_array(
+        self, key: str, frame_shape: tuple[int, ...], dtype: np.dtype
+    ) -> None:
+        """Creates the empty array holding the time series."""
+        pass
+
+    def series_attrs(self, key: str) -> dict:
+        attrs = self._metadata["series"][key]["attrs"]
+        return {name: _from_json(value, self.path) for name, value in attrs.items()}
+
+    def series_length(self, key: str) -> int:
+        return self.series(key).shape[0]
+
+
+class ZarrBackend(_DirectoryBackend):
+    """Stores each time series as a Zarr array within a directory, chunked
+    by frame. Requires the optional `zarr` package.
+    """
+
+    name = "zarr"
+
+    def __init__(self, path: Path, mode: str = "r") -> None:
+        """Constructs the Zarr backend."""
+        try:
+            import zarr  # type: ignore
+        except ImportError:
+            raise ImportError(
+                "The zarr storage backend requires zarr, install it with "
+                "`pip install zarr`"
+            ) from None
+        self._zarr = zarr
+        super().__init__(path, mode)
+
+    def _create_array(
+        self, key: str, frame_shape: tuple[int, ...], dtype: np.dtype
+    ) -> None:
+        self._zarr.open_array(
+            store=str(self.path / key),
+            mode="w",
+            shape=(0, *frame_shape),
+            chunks=(1, *frame_shape),
+            dtype=dtype,
+        )
+
+    def write_frame(self, key: str, index: int, frame: np.ndarray) -> None:
+        array = self._zarr.open_array(store=str(self.path / key), mode="r+")
+        array.resize((index + 1, *array.shape[1:]))
+        array[index] = frame
+
+    def series(self, key: str):
+        return self._zarr.open_array(store=str(self.path / key), mode="r")
+
+
+class MemmapBackend(_DirectoryBackend):
+    """Stores each time series as a `.npy` file within a directory, which
+    grows by one frame per save. The files can be memory-mapped by any number
+    of readers while they are written.
+    """
+
+    name = "memmap"
+    _header_alignment = 64
+    _header_headroom = 64  # Spare bytes beyond the largest possible header
+    _max_frames = np.iinfo(np.int64).max
+
+    def _array_path(self, key: str) -> Path:
+        return self.path / f"{key}.npy"
+
+    @staticmethod
+    def _header(shape: tuple[int, ...], dtype: np.dtype) -> str:
+        """Returns the unpadded `.npy` header dictionary of an array."""
+        return "{'descr': %r, 'fortran_order': False, 'shape': %r, }" % (
+            np.lib.format.dtype_to_descr(dtype),
+            shape,
+        )
+
+    def _header_length(self, frame_shape: tuple[int, ...], dtype: np.dtype) -> int:
+        """Returns the fixed length of the header of a series, which fits the
+        header of the series at any number of frames, so it can always be
+        rewritten in place.
+        """
+        largest = self._header((self._max_frames, *frame_shape), dtype)
+        length = 11 + len(largest) + self._header_headroom
+        return -(-length // self._header_alignment) * self._header_alignment
+
+    def _write_header(
+        self, file, shape: tuple[int, ...], dtype: np.dtype, header_length: int
+    ) -> None:
+        """Writes a version 1.0 `.npy` header, padded to `header_length`
+        bytes, to the start of `file`.
+        """
+        header = self._header(shape, dtype)
+        if len(header) + 11 > header_length or header_length - 10 > 0xFFFF:
+            raise ValueError(
+                f"Header of shape {shape} does not fit in {header_length} bytes"
+            )
+        header = header.ljust(header_length - 11) + "\n"
+        file.seek(0)
+        file.write(np.lib.format.MAGIC_PREFIX + bytes([1, 0]))
+        file.write(len(header).to_bytes(2, "little") + header.encode("latin1"))
+
+    def _create_array(
+        self, key: str, frame_shape: tuple[int, ...], dtype: np.dtype
+    ) -> None:
+        header_length = self._header_length(frame_shape, dtype)
+        self._metadata["series"][key]["header_length"] = header_length
+        with open(self._array_path(key), "wb") as file:
+            self._write_header(file, (0, *frame_shape), dtype, header_length)
+
+    def write_frame(self, key: str, index: int, frame: np.ndarray) -> None:
+        info = self._metadata["series"][key]
+        frame_shape = tuple(info["frame_shape"])
+        dtype = _dtype_from_json(info["dtype"])
+        header_length = info["header_length"]
+        data = np.asarray(frame, dtype=dtype, order="C")
+        if data.shape != frame_shape:
+            raise ValueError(f"Frame of shape {data.shape} does not match series")
+
+        with open(self._array_path(key), "r+b") as file:
+            # Data is written before the header, so readers never see a shape
+            # larger than the data on disk
+            file.seek(header_length + index * data.nbytes)
+            file.write(data.tobytes())
+            file.truncate(header_length + (index + 1) * data.nbytes)
+            self._write_header(file, (index + 1, *frame_shape), dtype, header_length)
+
+    def series(self, key: str):
+        try:
+            return np.load(self._array_path(key), mmap_mode="r")
+        except ValueError:  # Empty arrays cannot be memory-mapped
+            return np.load(self._array_path(key))
+
+
+_BACKENDS = {
+    backend.name: backend for backend in (HDF5Backend, ZarrBackend, MemmapBackend)
+}
+
+
+def _create_backend(
+    name: str, path: Path, mode: str = "w", swmr: bool = False
+) -> _StorageBackend:
+    """Returns the storage backend of the specified name, using SWMR mode if
+    `swmr` is True, which is only supported by the HDF5 backend.
+    """
+    if name not in _BACKENDS:
+        raise ValueError(f"Storage backend {name} is unsupported")
+    if swmr:
+        if name != HDF5Backend.name:
+            raise ValueError(f"SWMR mode is unsupported by the {name} backend")
+        return HDF5Backend(path, mode, swmr=True)
+    return _BACKENDS[name](path, mode)
+
+
+def _open_backend(path: Path, mode: str = "r", swmr: bool = False) -> _StorageBackend:
+    """Returns the storage backend holding the data at `path`, detected from
+    the type of the store. `swmr` only applies to HDF5 files, as the directory
+    backends can always be read while they are written.
+    """
+    path = Path(path)
+    if path.is_dir():
+        with open(path / METADATA_FILE) as file:
+            name = json.load(file)["backend"]
+        return _create_backend(name, path, mode)
+    return HDF5Backend(path, mode, swmr)
@@ -0,0 +1,195 @@
+"""
+Saving part of the grid: a region of interest such as a plane or subvolume,
+a strided decimation, or a coarse, Fourier-downsampled version of the full
+grid. Each saved time series records the shape, grid spacings and the
+coordinates of the first point of its sub-grid, from which readers rebuild
+the matching `Grid`.
+"""
+
+from __future__ import annotations
+
+from abc import ABC, abstractmethod
+
+import numpy as np
+
+import pygpe.shared.data_manager_paths as dmp
+from pygpe.shared.backend import cp
+from pygpe.shared.grid import Grid
+from pygpe.shared.spectral import _fourier_downsample, _resample_indices
+
+
+def _grid_points(grid: Grid) -> tuple[int, ...]:
+    """Returns the number of points along each axis of the grid."""
+    if grid.ndim == 1:
+        return (grid.shape,)
+    return grid.shape
+
+
+def _grid_spacings(grid: Grid) -> tuple[float, ...]:
+    """Returns the grid spacing along each axis of the grid."""
+    return tuple(getattr(grid, f"grid_spacing_{axis}") for axis in "xyz"[: grid.ndim])
+
+
+def _grid_origin(grid: Grid) -> tuple[float, ...]:
+    """Returns the coordinates of the first point of the grid."""
+    return tuple(
+        (-points // 2) * spacing
+        for points, spacing in zip(_grid_points(grid), _grid_spacings(grid))
+    )
+
+
+def _build_grid(points: tuple[int, ...], grid_spacings: tuple[float, ...]) -> Grid:
+    """Constructs a grid of the given points and spacings along each axis."""
+    if len(points) == 1:
+        return Grid(points[0], grid_spacings[0])
+    return Grid(tuple(points), tuple(grid_spacings))
+
+
+def _per_axis(value: int | tuple[int, ...] | None, ndim: int) -> tuple[int, ...]:
+    """Broadcasts an integer option to one value per axis."""
+    if value is None:
+        return (1,) * ndim
+    if isinstance(value, int):
+        return (value,) * ndim
+    if len(value) != ndim:
+        raise ValueError(f"{value} does not have a value for each of {ndim} axes")
+    return tuple(value)
+
+
+class _SubGrid(ABC):
+    """Defines the part of the grid that is saved.
+
+    :ivar shape: The shape of the saved frames.
+    :ivar grid_spacings: The grid spacing along each saved axis.
+    :ivar origin: The coordinates of the first saved point along each axis.
+    """
+
+    shape: tuple[int, ...]
+    grid_spacings: tuple[float, ...]
+    origin: tuple[float, ...]
+
+    def attrs(self) -> dict:
+        """Returns the attributes recording the sub-grid."""
+        return {
+            dmp.SUBGRID_SHAPE: list(self.shape),
+            dmp.SUBGRID_SPACING: list(self.grid_spacings),
+            dmp.SUBGRID_ORIGIN: list(self.origin),
+        }
+
+    @abstractmethod
+    def reduce(self, array: cp.ndarray) -> cp.ndarray:
+        """Returns the part of a real-space array on the sub-grid."""
+        pass
+
+    def reduce_fourier(self, fourier_array: cp.ndarray) -> cp.ndarray:
+        """Returns the real-space part of an array on the sub-grid, given the
+        Fourier transform of the array.
+        """
+        return self.reduce(cp.fft.ifftn(fourier_array))
+
+
+class _RegionSubGrid(_SubGrid):
+    """A region of interest of the grid, optionally decimated by keeping every
+    `stride`-th point along each axis.
+
+    :param grid: The full grid.
+    :param region: For each axis, a slice selecting a range of points or an
+        integer selecting a single point, which removes the axis, e.g.
+        `(slice(None), slice(None), 64)` for the `z = 64` plane of a 3D grid.
+        Defaults to the full grid.
+    :param stride: The step between saved points along each axis, or along
+        all axes if an integer.
+    """
+
+    def __init__(
+        self,
+        grid: Grid,
+        region: tuple[slice | int, ...] | None = None,
+        stride: int | tuple[int, ...] | None = None,
+    ) -> None:
+        """Constructs the region sub-grid."""
+        if region is None:
+            region = (slice(None),) * grid.ndim
+        if len(region) != grid.ndim:
+            raise ValueError(f"Region {region} does not match a {grid.ndim}D grid")
+        strides = _per_axis(stride, grid.ndim)
+
+        key, shape, grid_spacings, origin = [], [], [], []
+        for entry, step, points, spacing, start_coord in zip(
+            region,
+            strides,
+            _grid_points(grid),
+            _grid_spacings(grid),
+            _grid_origin(grid),
+        ):
+            if isinstance(entry, slice):
+                if step < 1:
+                    raise ValueError(f"Stride {step} must be positive")
+                start, stop, entry_step = entry.indices(points)
+                indices = range(start, stop, entry_step * step)
+                if not indices or indices.step < 0:
+                    raise ValueError(f"Region {entry} selects no increasing points")
+                key.append(slice(indices.start, indices.stop, indices.step))
+                shape.append(len(indices))
+                grid_spacings.append(spacing * indices.step)
+                origin.append(start_coord + indices.start * spacing)
+            elif not -points <= entry < points:
+                raise ValueError(f"Region index {entry} is out of range")
+            else:
+                key.append(entry % points)
+        if not shape:
+            raise ValueError("Region must keep at least one axis")
+
+        self._key = tuple(key)
+        self.shape = tuple(shape)
+        self.grid_spacings = tuple(grid_spacings)
+        self.origin = tuple(origin)
+
+    def reduce(self, array: cp.ndarray) -> cp.ndarray:
+        return array[self._key]
+
+
+class _CoarseSubGrid(_SubGrid):
+    """A coarser version of the full grid, holding the Fourier-downsampled
+    data, i.e. the lowest Fourier modes of the full data.
+
+    :param grid: The full grid.
+    :param coarsen: The factor by which the number of points is reduced along
+        each axis, or along all axes if an integer.
+    """
+
+    def __init__(self, grid: Grid, coarsen: int | tuple[int, ...]) -> None:
+        """Constructs the coarse sub-grid."""
+        factors = _per_axis(coarsen, grid.ndim)
+        points = _grid_points(grid)
+        if any(factor < 1 or factor > n for factor, n in zip(factors, points)):
+            raise ValueError(f"Coarsening factors {coarsen} are out of range")
+
+        self.shape = tuple(n // factor for n, factor in zip(points, factors))
+        self.grid_spacings = tuple(
+            spacing * n / m
+            for spacing, n, m in zip(_grid_spacings(grid), points, self.shape)
+        )
+        self.origin = _grid_origin(_build_grid(self.shape, self.grid_spacings))
+        self._indices = _resample_indices(points, self.shape)
+
+    def reduce(self, array: cp.ndarray) -> cp.ndarray:
+        coarse = self.reduce_fourier(cp.fft.fftn(array))
+        if not cp.iscomplexobj(array):
+            return coarse.real
+        return coarse
+
+    def reduce_fourier(self, fourier_array: cp.ndarray) -> cp.ndarray:
+        return _fourier_downsample(fourier_array, self.shape, self._indices)
+
+
+def _subgrid_from_attrs(attrs: dict) -> tuple[Grid, tuple[float, ...]] | None:
+    """Rebuilds the grid and origin of a sub-grid from the attributes of a
+    time series, or returns None if the full grid was saved.
+    """
+    if dmp.SUBGRID_SHAPE not in attrs:
+        return None
+    points = tuple(int(n) for n in np.asarray(attrs[dmp.SUBGRID_SHAPE]))
+    grid_spacings = tuple(float(dx) for dx in np.asarray(attrs[dmp.SUBGRID_SPACING]))
+    origin = tuple(float(x) for x in np.asarray(attrs[dmp.SUBGRID_ORIGIN]))
+    return _build_grid(points, grid_spacings), origin
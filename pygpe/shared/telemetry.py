@@ -0,0 +1,215 @@
+"""
+Telemetry of running simulations, so that stalled or diverging runs are
+caught early. A :class:`Telemetry` hook is updated once per time step and,
+every `every` steps, emits a record of the progress and health of the run::
+
+    with Telemetry("telemetry.jsonl", psi, params, every=100,
+                   total_steps=params["nt"], data_manager=data) as telemetry:
+        for i in range(params["nt"]):
+            gpe.step_wavefunction(psi, params)
+            ...
+            telemetry.update(psi)
+
+Records are written as JSON lines to a file, or passed to any callable sink,
+e.g. a function forwarding them to a monitoring service. Each record holds
+the step and simulation time, the steps per second since the previous
+record, the estimated time remaining, the share of wall time spent saving
+data, and the relative drift of the total atom number and that of each
+component from the wavefunction's `atom_num` attributes. Optionally, the
+relative drift of the total energy and the magnetisation of spinor systems
+are recorded.
+Reductions are computed on the device from the Fourier-space components, so
+a single small array is copied to the host per record.
+"""
+
+import importlib
+import json
+import time
+from typing import Callable
+
+from pygpe.shared.backend import cp
+from pygpe.shared.data_manager import _atom_num_field, _DataManager, _time_value
+from pygpe.shared.utils import handle_array
+from pygpe.shared.wavefunction import _Wavefunction
+
+# The magnetic quantum number of each spinor component
+_SPIN_PROJECTIONS = {
+    "plus2": 2,
+    "plus1": 1,
+    "plus": 1,
+    "zero": 0,
+    "minus": -1,
+    "minus1": -1,
+    "minus2": -2,
+}
+
+
+class Telemetry:
+    """Emits records of the progress and conservation laws of a simulation
+    every `every` time steps.
+
+    :param sink: The path of the JSON-lines file records are appended to, or
+        a callable receiving each record as a dict.
+    :type sink: str or Callable[[dict], None]
+    :param wfn: The wavefunction of the system, whose atom numbers and, if
+        recorded, energy are the reference of the drifts.
+    :type wfn: :class:`Wavefunction`
+    :param params: The parameters of the system, whose time `t` is recorded.
+    :type params: dict
+    :param every: The number of time steps between records. Defaults to 100.
+    :type every: int
+    :param total_steps: The total number of time steps of the run, from which
+        the remaining time is estimated.
+    :type total_steps: int, optional
+    :param data_manager: The DataManager saving the run, whose share of the
+        wall time is recorded.
+    :type data_manager: DataManager, optional
+    :param energy: If True, the relative drift of the total energy is
+        recorded. This requires an inverse Fourier transform per record.
+    :type energy: bool
+    :param magnetisation: If True, the longitudinal magnetisation per atom of
+        a spinor system is recorded.
+    :type magnetisation: bool
+
+    :ivar step: The number of time steps taken.
+    """
+
+    def __init__(
+        self,
+        sink: str | Callable[[dict], None],
+        wfn: _Wavefunction,
+        params: dict,
+        every: int = 100,
+        total_steps: int | None = None,
+        data_manager: _DataManager | None = None,
+        energy: bool = False,
+        magnetisation: bool = False,
+    ) -> None:
+        if every < 1:
+            raise ValueError(f"Records must be emitted every step or more, not {every}")
+        system = importlib.import_module(type(wfn).__module__.rsplit(".", 1)[0])
+        self._components = list(system.DataManager._components)
+        if magnetisation and len(self._components) == 1:
+            raise ValueError("Magnetisation is only defined for spinor systems")
+
+        self._file = None
+        if callable(sink):
+            self._sink = sink
+        else:
+            self._file = open(sink, "a")
+            self._sink = self._write
+        self._params = params
+        self._every = every
+        self._total_steps = total_steps
+        self._data_manager = data_manager
+        self._energy = system.DataManager._energy if energy else None
+        self._magnetisation = magnetisation
+
+        self.step = 0
+        self._atom_nums = {
+            _atom_num_field(name): float(getattr(wfn, _atom_num_field(name)))
+            for name in self._components
+        }
+        if self._energy is not None:
+            wfn.ifft()
+            self._initial_energy = float(self._energy(wfn, params))
+        self._start = self._last_time = time.perf_counter()
+        self._last_step = 0
+        self._last_save_time = self._save_time()
+
+    def _write(self, record: dict) -> None:
+        self._file.write(json.dumps(record) + "\n")
+        self._file.flush()
+
+    def _save_time(self) -> float:
+        return 0.0 if self._data_manager is None else self._data_manager.save_time
+
+    def update(self, wfn: _Wavefunction, step: int | None = None) -> dict | None:
+        """Counts a time step, emitting a record every `every` steps.
+
+        :param wfn: The wavefunction of the system.
+        :type wfn: :class:`Wavefunction`
+        :param step: The current time step. By default, the steps are counted.
+        :type step: int, optional
+        :return: The emitted record, if any.
+        :rtype: dict or None
+        """
+        self.step = self.step + 1 if step is None else step
+        if self.step % self._every != 0:
+            return None
+        record = self.record(wfn)
+        self._sink(record)
+        return record
+
+    def record(self, wfn: _Wavefunction) -> dict:
+        """Returns the record of the current state of the run.
+
+        :param wfn: The wavefunction of the system.
+        :type wfn: :class:`Wavefunction`
+        :return: The record.
+        :rtype: dict
+        """
+        grid = wfn.grid
+        # Atom numbers of each component, reduced on the device
+        atom_nums = handle_array(
+            grid.grid_spacing_product
+            / grid.total_num_points
+            * cp.stack(
+                [
+                    cp.sum(cp.abs(getattr(wfn, f"fourier_{name}")) ** 2)
+                    for name in self._components
+                ]
+            )
+        )
+
+        now = time.perf_counter()
+        save_time = self._save_time()
+        interval = now - self._last_time
+        steps_per_second = (self.step - self._last_step) / interval
+        record = {
+            "step": self.step,
+            "t": _time_value(self._params.get("t", float("nan"))),
+            "wall_time": now - self._start,
+            "steps_per_second": steps_per_second,
+        }
+        if self._total_steps is not None:
+            record["eta"] = (self._total_steps - self.step) / steps_per_second
+        if self._data_manager is not None:
+            record["io_fraction"] = (save_time - self._last_save_time) / interval
+        record["atom_num_drift"] = {
+            field: float(value) / reference - 1 if reference else float("nan")
+            for (field, reference), value in zip(self._atom_nums.items(), atom_nums)
+        }
+        reference = sum(self._atom_nums.values())
+        record["total_atom_num_drift"] = (
+            float(sum(atom_nums)) / reference - 1 if reference else float("nan")
+        )
+        if self._energy is not None:
+            wfn.ifft()  # Energies need up-to-date real-space components
+            record["energy_drift"] = (
+                float(self._energy(wfn, self._params)) / self._initial_energy - 1
+            )
+        if self._magnetisation:
+            projections = [
+                _SPIN_PROJECTIONS[name.removesuffix("_component")]
+                for name in self._components
+            ]
+            record["magnetisation"] = float(
+                sum(m * n for m, n in zip(projections, atom_nums)) / sum(atom_nums)
+            )
+
+        self._last_time, self._last_step = now, self.step
+        self._last_save_time = save_time
+        return record
+
+    def close(self) -> None:
+        """Closes the telemetry file, if records are written to a file."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self) -> "Telemetry":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
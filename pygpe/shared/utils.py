@@ -1,9 +1,7 @@
-try:
-    import cupy as cp  # type: ignore
-except ImportError:
-    pass
 import numpy as np
 
+from pygpe.shared.backend import cp
+
 
 def handle_array(arr):
     """
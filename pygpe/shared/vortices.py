@@ -1,7 +1,6 @@
-try:
-    import cupy as cp  # type: ignore
-except ImportError:
-    import numpy as cp
+from __future__ import annotations
+
+from pygpe.shared.backend import cp
 from pygpe.shared.grid import Grid
 
 
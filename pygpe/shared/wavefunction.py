@@ -1,12 +1,10 @@
+from __future__ import annotations
+
 from abc import ABC, abstractmethod
 
+from pygpe.shared.backend import cp
 from pygpe.shared.grid import Grid
 
-try:
-    import cupy as cp  # type: ignore
-except ImportError:
-    import numpy as cp
-
 
 class _Wavefunction(ABC):
     """Defines the abstract Wavefunction base class.
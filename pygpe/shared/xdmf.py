@@ -0,0 +1,317 @@
+"""
+XDMF descriptors of saved HDF5 data, so that visualisation tools such as
+ParaView and VisIt read the data in place, without converting it.
+The descriptor is a small XML sidecar file, e.g. `data.xmf` next to
+`data.hdf5`, describing the grid and a temporal collection with one entry per
+saved frame. Each entry references its frame within the time series of the
+HDF5 file through a hyperslab, using the simulation times of the frame table.
+
+Only real-valued time series can be referenced, i.e. the saved observables
+such as the density, since XDMF does not support complex data. Frames are
+described in the axis order of the saved arrays, so a tool's first axis
+corresponds to the last axis of the grid, e.g. ParaView's x-axis shows the
+z-axis of a 3D grid. Descriptors can be written by a DataManager when it is
+closed, with `DataManager(..., xdmf=True)`, optionally also every few saves
+with `xdmf_every`, or for existing files with :func:`write_xdmf`.
+"""
+
+from __future__ import annotations
+
+import os
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+import numpy as np
+
+import pygpe.shared.data_manager_paths as dmp
+from pygpe.shared.backend import h5py
+from pygpe.shared.storage import _series_length, _time_axis
+from pygpe.shared.subgrid import (
+    _build_grid,
+    _grid_origin,
+    _grid_points,
+    _grid_spacings,
+    _subgrid_from_attrs,
+)
+
+
+class _XdmfSeries:
+    """Describes the layout of a real-valued time series referenced by the
+    descriptor.
+
+    :param name: The name of the attribute shown by visualisation tools.
+    :param path: The path of the dataset in the HDF5 file.
+    :param shape: The shape of the whole dataset.
+    :param dtype: The data type of the dataset.
+    :param time_axis: The axis indexing the saved frames.
+    :param num_frames: The number of saved frames, which may be fewer than
+        the length of the time axis, e.g. for shorter shards.
+    :param realisation: The realisation to reference and its axis, for
+        datasets combining several shards.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        path: str,
+        shape: tuple[int, ...],
+        dtype: np.dtype,
+        time_axis: int,
+        num_frames: int,
+        realisation: tuple[int, int] | None = None,
+    ) -> None:
+        self.name = name
+        self.path = path
+        self.shape = tuple(shape)
+        self.dtype = np.dtype(dtype)
+        self.time_axis = time_axis
+        self.num_frames = num_frames
+        self.realisation = realisation
+
+    def hyperslab(self, index: int) -> tuple[list[int], list[int]]:
+        """Returns the start and count of the hyperslab selecting a frame."""
+        start, count = [], []
+        for axis, n in enumerate(self.shape):
+            if axis == self.time_axis:
+                start.append(index)
+                count.append(1)
+            elif self.realisation is not None and axis == self.realisation[1]:
+                start.append(self.realisation[0])
+                count.append(1)
+            else:
+                start.append(0)
+                count.append(n)
+        return start, count
+
+
+def _dimensions(shape) -> str:
+    return " ".join(str(n) for n in shape)
+
+
+def _number_type(dtype: np.dtype) -> dict[str, str]:
+    """Returns the XDMF number type of a real-valued data type."""
+    kinds = {"f": "Float", "i": "Int", "u": "UInt"}
+    if dtype.kind not in kinds:
+        raise ValueError(f"Data type {dtype} cannot be described by XDMF")
+    return {"NumberType": kinds[dtype.kind], "Precision": str(dtype.itemsize)}
+
+
+def _xml_values(parent: ET.Element, values, dtype: str = "Float") -> ET.Element:
+    """Adds a data item holding `values` inline."""
+    values = np.asarray(values)
+    item = ET.SubElement(
+        parent,
+        "DataItem",
+        Dimensions=_dimensions(values.shape),
+        NumberType=dtype,
+        Precision="8" if dtype == "Float" else "4",
+        Format="XML",
+    )
+    item.text = " ".join(repr(value) for value in values.ravel().tolist())
+    return item
+
+
+def _xdmf_document(
+    data_filename: str,
+    shape: tuple[int, ...],
+    grid_spacings: tuple[float, ...],
+    origin: tuple[float, ...],
+    series: list[_XdmfSeries],
+    times: np.ndarray,
+) -> ET.ElementTree:
+    """Builds the descriptor of the frames saved at `times`, on a uniform
+    grid of the given shape, spacings and origin.
+    """
+    if len(shape) not in (2, 3):
+        raise ValueError(f"XDMF only describes 2D and 3D grids, not {len(shape)}D")
+    mesh = "3D" if len(shape) == 3 else "2D"
+    geometry = "ORIGIN_DXDYDZ" if len(shape) == 3 else "ORIGIN_DXDY"
+
+    root = ET.Element("Xdmf", Version="3.0")
+    domain = ET.SubElement(root, "Domain")
+    collection = ET.SubElement(
+        domain,
+        "Grid",
+        Name="frames",
+        GridType="Collection",
+        CollectionType="Temporal",
+    )
+    for index, t in enumerate(times):
+        frame = ET.SubElement(
+            collection, "Grid", Name=f"frame_{index}", GridType="Uniform"
+        )
+        ET.SubElement(frame, "Time", Value=repr(float(t)))
+        ET.SubElement(
+            frame,
+            "Topology",
+            TopologyType=f"{mesh}CoRectMesh",
+            Dimensions=_dimensions(shape),
+        )
+        geometry_element = ET.SubElement(frame, "Geometry", GeometryType=geometry)
+        _xml_values(geometry_element, origin)
+        _xml_values(geometry_element, grid_spacings)
+
+        for item in series:
+            attribute = ET.SubElement(
+                frame,
+                "Attribute",
+                Name=item.name,
+                AttributeType="Scalar",
+                Center="Node",
+            )
+            hyperslab = ET.SubElement(
+                attribute,
+                "DataItem",
+                ItemType="HyperSlab",
+                Dimensions=_dimensions(shape),
+            )
+            start, count = item.hyperslab(index)
+            _xml_values(hyperslab, [start, [1] * len(start), count], "Int")
+            source = ET.SubElement(
+                hyperslab,
+                "DataItem",
+                Dimensions=_dimensions(item.shape),
+                Format="HDF",
+                **_number_type(item.dtype),
+            )
+            source.text = f"{data_filename}:/{item.path}"
+
+    tree = ET.ElementTree(root)
+    ET.indent(tree)
+    return tree
+
+
+def _save_document(tree: ET.ElementTree, path: Path) -> None:
+    """Atomically replaces the descriptor at `path`, so tools never read a
+    partially written file.
+    """
+    temp_path = path.with_name(f"{path.name}.tmp")
+    tree.write(temp_path, encoding="utf-8", xml_declaration=True)
+    os.replace(temp_path, path)
+
+
+def _saved_frames(dataset: h5py.Dataset, realisation: int | None = None) -> int:
+    """Returns the number of frames saved to `dataset`, or to the specified
+    realisation of a dataset combining several shards.
+    """
+    if dmp.REALISATION_AXIS in dataset.attrs and dmp.NUM_FRAMES in dataset.attrs:
+        return int(dataset.attrs[dmp.NUM_FRAMES][realisation or 0])
+    return _series_length(dataset.attrs, dataset.shape)
+
+
+def _frame_times(file: h5py.File, realisation: int | None = None) -> np.ndarray:
+    """Returns the simulation time of each frame saved in `file`, from the
+    frame table. Frames without a recorded time are given their index.
+    """
+    if dmp.FRAMES not in file:
+        return np.array([])
+    table = file[dmp.FRAMES]
+    num_frames = _saved_frames(table, realisation)
+    if dmp.REALISATION_AXIS in table.attrs:
+        table = table[realisation or 0]
+    times = np.asarray(table[:num_frames]["t"], dtype=float)
+    return np.where(np.isnan(times), np.arange(len(times)), times)
+
+
+def _saved_frame_times(path: Path) -> np.ndarray:
+    """Returns the simulation time of each frame saved in the file at
+    `path`, see :func:`_frame_times`.
+    """
+    with h5py.File(path, "r") as file:
+        return _frame_times(file)
+
+
+def _observable_series(
+    file: h5py.File, realisation: int | None = None
+) -> list[_XdmfSeries]:
+    """Returns the layout of every saved observable in `file`."""
+    series = []
+    if dmp.OBSERVABLES not in file:
+        return series
+    for name in file[dmp.OBSERVABLES]:
+        dataset = file[f"{dmp.OBSERVABLES}/{name}"]
+        realisation_axis = None
+        if dmp.REALISATION_AXIS in dataset.attrs:
+            realisation_axis = (
+                realisation or 0,
+                int(dataset.attrs[dmp.REALISATION_AXIS]),
+            )
+        series.append(
+            _XdmfSeries(
+                name,
+                dataset.name.lstrip("/"),
+                dataset.shape,
+                dataset.dtype,
+                _time_axis(dataset.attrs, dataset.ndim),
+                _saved_frames(dataset, realisation),
+                realisation_axis,
+            )
+        )
+    return series
+
+
+def write_xdmf(
+    filename: str,
+    data_path: str,
+    xdmf_filename: str | None = None,
+    realisation: int | None = None,
+) -> Path:
+    """Writes the XDMF descriptor of an existing HDF5 data file, referencing
+    its saved observables in place.
+
+    :param filename: The name of the data file.
+    :type filename: str
+    :param data_path: The relative path to the folder containing the data file.
+    :type data_path: str
+    :param xdmf_filename: The name of the descriptor, written next to the data
+        file. Defaults to the name of the data file with the `.xmf` suffix.
+    :type xdmf_filename: str, optional
+    :param realisation: The realisation to describe, for files combining
+        several shards. Defaults to the first realisation.
+    :type realisation: int, optional
+    :return: The path of the descriptor.
+    :rtype: Path
+    """
+    data_path_and_file = Path(f"./{data_path}") / filename
+    if data_path_and_file.is_dir():
+        raise ValueError("XDMF descriptors are only supported for HDF5 files")
+    xdmf_path = data_path_and_file.with_name(
+        xdmf_filename or f"{data_path_and_file.stem}.xmf"
+    )
+
+    with h5py.File(data_path_and_file, "r") as file:
+        series = _observable_series(file, realisation)
+        if not series:
+            raise ValueError(
+                f"{filename} holds no real-valued observables, save e.g. the "
+                "density with observables=['density']"
+            )
+        grid = _build_grid(
+            tuple(
+                int(file[key][()])
+                for key in (dmp.GRID_NX, dmp.GRID_NY, dmp.GRID_NZ)
+                if key in file
+            ),
+            tuple(
+                float(file[key][()])
+                for key in (dmp.GRID_DX, dmp.GRID_DY, dmp.GRID_DZ)
+                if key in file
+            ),
+        )
+        origin = _grid_origin(grid)
+        subgrid = _subgrid_from_attrs(dict(file[series[0].path].attrs))
+        if subgrid is not None:  # Only part of the grid was saved
+            grid, origin = subgrid
+        times = _frame_times(file, realisation)
+
+    num_frames = min(len(times), *(item.num_frames for item in series))
+    tree = _xdmf_document(
+        filename,
+        _grid_points(grid),
+        _grid_spacings(grid),
+        origin,
+        series,
+        times[:num_frames],
+    )
+    _save_document(tree, xdmf_path)
+    return xdmf_path
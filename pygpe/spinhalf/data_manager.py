@@ -1,9 +1,20 @@
-import h5py
+from __future__ import annotations
 
+from pygpe.shared.backend import cp
 from pygpe.shared import data_manager_paths as dmp
-from pygpe.shared.utils import handle_array
 from pygpe.shared.data_manager import _DataManager
 from pygpe.spinhalf.wavefunction import SpinHalfWavefunction
+from pygpe.spinhalf.evolution import _calculate_energy
+
+
+def _density(wfn: SpinHalfWavefunction) -> cp.ndarray:
+    """Returns the total condensate density."""
+    return cp.abs(wfn.plus_component) ** 2 + cp.abs(wfn.minus_component) ** 2
+
+
+def _spin_z(wfn: SpinHalfWavefunction) -> cp.ndarray:
+    """Returns the longitudinal spin density."""
+    return cp.abs(wfn.plus_component) ** 2 - cp.abs(wfn.minus_component) ** 2
 
 
 class DataManager(_DataManager):
@@ -14,77 +25,33 @@ class DataManager(_DataManager):
     :type filename: str
     :param data_path: The relative path to the folder containing the data file.
     :type data_path: str
+    :param kwargs: Optional output settings passed on to the shared
+        DataManager, e.g. `shard` to write to a per-worker shard file,
+        `backend` to choose the storage backend or `observables` to save
+        derived observables such as "spin_z".
 
     :ivar filename: The name of the data file.
     :ivar data_path: The relative path to the folder containing the data file.
+    :ivar save_time: The total wall time spent saving frames, in seconds.
     """
 
+    _components = {
+        "plus_component": dmp.SPINHALF_WAVEFUNCTION_PLUS,
+        "minus_component": dmp.SPINHALF_WAVEFUNCTION_MINUS,
+    }
+
+    _observables = {"density": _density, "spin_z": _spin_z}
+
+    _energy = staticmethod(_calculate_energy)
+
     def __init__(
         self,
         filename: str,
         data_path: str,
         wfn: SpinHalfWavefunction,
         params: dict,
+        **kwargs,
     ):
         """Constructs the DataManager object."""
-        super().__init__(filename, data_path, wfn, params)
+        super().__init__(filename, data_path, wfn, params, **kwargs)
         self._save_initial_wfn(wfn)
-
-    def _save_initial_wfn(self, wfn: SpinHalfWavefunction) -> None:
-        """Creates new datasets in file for the wavefunction and saves
-        initial values.
-        """
-        with h5py.File(self.data_path_and_file, "r+") as file:
-            if wfn.grid.ndim == 1:
-                file.create_dataset(
-                    dmp.SPINHALF_WAVEFUNCTION_PLUS,
-                    (wfn.grid.shape, 1),
-                    maxshape=(wfn.grid.shape, None),
-                    dtype="complex128",
-                )
-                file.create_dataset(
-                    dmp.SPINHALF_WAVEFUNCTION_MINUS,
-                    (wfn.grid.shape, 1),
-                    maxshape=(wfn.grid.shape, None),
-                    dtype="complex128",
-                )
-            else:
-                file.create_dataset(
-                    dmp.SPINHALF_WAVEFUNCTION_PLUS,
-                    (*wfn.grid.shape, 1),
-                    maxshape=(*wfn.grid.shape, None),
-                    dtype="complex128",
-                )
-                file.create_dataset(
-                    dmp.SPINHALF_WAVEFUNCTION_MINUS,
-                    (*wfn.grid.shape, 1),
-                    maxshape=(*wfn.grid.shape, None),
-                    dtype="complex128",
-                )
-
-    def save_wavefunction(self, wfn: SpinHalfWavefunction) -> None:
-        """Saves the current wavefunction data to the dataset.
-
-        :param wfn: The wavefunction of the system.
-        :type wfn: :class:`Wavefunction`
-        """
-        wfn.ifft()  # Update real-space wavefunction before saving
-        with h5py.File(self.data_path_and_file, "r+") as data:
-            if wfn.grid.ndim == 1:
-                new_psi_plus = data[dmp.SPINHALF_WAVEFUNCTION_PLUS]
-                new_psi_plus.resize((wfn.grid.num_points_x, self._time_index + 1))
-                new_psi_plus[:, self._time_index] = handle_array(wfn.plus_component)
-
-                new_psi_minus = data[dmp.SPINHALF_WAVEFUNCTION_MINUS]
-                new_psi_minus.resize((wfn.grid.num_points_x, self._time_index + 1))
-                new_psi_minus[:, self._time_index] = handle_array(wfn.minus_component)
-            else:
-                new_psi_plus = data[dmp.SPINHALF_WAVEFUNCTION_PLUS]
-                new_psi_plus.resize((*wfn.grid.shape, self._time_index + 1))
-                new_psi_plus[..., self._time_index] = handle_array(wfn.plus_component)
-
-                new_psi_minus = data[dmp.SPINHALF_WAVEFUNCTION_MINUS]
-                new_psi_minus.resize((*wfn.grid.shape, self._time_index + 1))
-                new_psi_minus[..., self._time_index] = handle_array(wfn.minus_component)
-
-        self._time_index += 1
@@ -1,8 +1,6 @@
-try:
-    import cupy as cp  # type: ignore
-except ImportError:
-    import numpy as cp
+from pygpe.shared.backend import cp
 from pygpe.spinhalf.wavefunction import SpinHalfWavefunction
+from pygpe.shared.spectral import _kinetic_energy
 
 
 def step_wavefunction(wfn: SpinHalfWavefunction, params: dict) -> None:
@@ -92,3 +90,26 @@ def _calculate_atom_num(wfn: SpinHalfWavefunction) -> tuple[int, int]:
     )
 
     return atom_num_plus, atom_num_minus
+
+
+def _calculate_energy(wfn: SpinHalfWavefunction, pm: dict) -> float:
+    """Calculates the total energy of the system. Both the real-space and
+    Fourier-space components must be up-to-date.
+
+    :param wfn: The wavefunction of the system.
+    :param pm: The parameters' dictionary.
+    :return: The total energy.
+    """
+    kinetic = _kinetic_energy(
+        wfn.grid, [wfn.fourier_plus_component, wfn.fourier_minus_component]
+    )
+    dens_plus = cp.abs(wfn.plus_component) ** 2
+    dens_minus = cp.abs(wfn.minus_component) ** 2
+    potential = wfn.grid.grid_spacing_product * cp.sum(
+        pm["trap"] * (dens_plus + dens_minus)
+        + pm["g_plus"] / 2 * dens_plus**2
+        + pm["g_minus"] / 2 * dens_minus**2
+        + pm["g_pm"] * dens_plus * dens_minus
+    )
+
+    return kinetic + float(potential)
@@ -1,11 +1,9 @@
+from __future__ import annotations
+
+from pygpe.shared.backend import cp
 from pygpe.shared.grid import Grid
 from pygpe.shared.wavefunction import _Wavefunction
 
-try:
-    import cupy as cp  # type: ignore
-except ImportError:
-    import numpy as cp
-
 
 class SpinHalfWavefunction(_Wavefunction):
     def __init__(self, grid: Grid):
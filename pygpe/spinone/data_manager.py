@@ -1,9 +1,24 @@
-import h5py
+from __future__ import annotations
 
+from pygpe.shared.backend import cp
 from pygpe.shared.data_manager import _DataManager
-from pygpe.shared.utils import handle_array
 from pygpe.shared import data_manager_paths as dmp
 from pygpe.spinone.wavefunction import SpinOneWavefunction
+from pygpe.spinone.evolution import (
+    _calculate_density,
+    _calculate_energy,
+    _calculate_spins,
+)
+
+
+def _spin_z(wfn: SpinOneWavefunction) -> cp.ndarray:
+    """Returns the longitudinal spin density."""
+    return _calculate_spins(wfn)[1]
+
+
+def _spin_perp(wfn: SpinOneWavefunction) -> cp.ndarray:
+    """Returns the magnitude of the perpendicular spin density."""
+    return cp.abs(_calculate_spins(wfn)[0])
 
 
 class DataManager(_DataManager):
@@ -14,97 +29,38 @@ class DataManager(_DataManager):
     :type filename: str
     :param data_path: The relative path to the folder containing the data file.
     :type data_path: str
+    :param kwargs: Optional output settings passed on to the shared
+        DataManager, e.g. `shard` to write to a per-worker shard file,
+        `backend` to choose the storage backend or `observables` to save
+        derived observables such as "spin_perp".
 
     :ivar filename: The name of the data file.
     :ivar data_path: The relative path to the folder containing the data file.
+    :ivar save_time: The total wall time spent saving frames, in seconds.
     """
 
+    _components = {
+        "plus_component": dmp.SPIN1_WAVEFUNCTION_PLUS,
+        "zero_component": dmp.SPIN1_WAVEFUNCTION_ZERO,
+        "minus_component": dmp.SPIN1_WAVEFUNCTION_MINUS,
+    }
+
+    _observables = {
+        "density": _calculate_density,
+        "spin_z": _spin_z,
+        "spin_perp": _spin_perp,
+    }
+
+    _energy = staticmethod(_calculate_energy)
+
     def __init__(
         self,
         filename: str,
         data_path: str,
         wfn: SpinOneWavefunction,
         params: dict,
+        **kwargs,
     ):
         """Constructs the DataManager object."""
-        super().__init__(filename, data_path, wfn, params)
+        super().__init__(filename, data_path, wfn, params, **kwargs)
         self._save_initial_wfn(wfn)
-
-    def _save_initial_wfn(self, wfn: SpinOneWavefunction) -> None:
-        """Creates new datasets in file for the wavefunction and saves
-        initial values.
-        """
-        with h5py.File(self.data_path_and_file, "r+") as file:
-            if wfn.grid.ndim == 1:
-                file.create_dataset(
-                    dmp.SPIN1_WAVEFUNCTION_PLUS,
-                    (wfn.grid.shape, 1),
-                    maxshape=(wfn.grid.shape, None),
-                    dtype="complex128",
-                )
-                file.create_dataset(
-                    dmp.SPIN1_WAVEFUNCTION_ZERO,
-                    (wfn.grid.shape, 1),
-                    maxshape=(wfn.grid.shape, None),
-                    dtype="complex128",
-                )
-                file.create_dataset(
-                    dmp.SPIN1_WAVEFUNCTION_MINUS,
-                    (wfn.grid.shape, 1),
-                    maxshape=(wfn.grid.shape, None),
-                    dtype="complex128",
-                )
-            else:
-                file.create_dataset(
-                    dmp.SPIN1_WAVEFUNCTION_PLUS,
-                    (*wfn.grid.shape, 1),
-                    maxshape=(*wfn.grid.shape, None),
-                    dtype="complex128",
-                )
-                file.create_dataset(
-                    dmp.SPIN1_WAVEFUNCTION_ZERO,
-                    (*wfn.grid.shape, 1),
-                    maxshape=(*wfn.grid.shape, None),
-                    dtype="complex128",
-                )
-                file.create_dataset(
-                    dmp.SPIN1_WAVEFUNCTION_MINUS,
-                    (*wfn.grid.shape, 1),
-                    maxshape=(*wfn.grid.shape, None),
-                    dtype="complex128",
-                )
-
-    def save_wavefunction(self, wfn: SpinOneWavefunction) -> None:
-        """Saves the current wavefunction data to the dataset.
-
-        :param wfn: The wavefunction of the system.
-        :type wfn: :class:`Wavefunction`
-        """
-        wfn.ifft()  # Update real-space wavefunction before saving
-        with h5py.File(self.data_path_and_file, "r+") as data:
-            if wfn.grid.ndim == 1:
-                new_psi_plus = data[dmp.SPIN1_WAVEFUNCTION_PLUS]
-                new_psi_plus.resize((wfn.grid.num_points_x, self._time_index + 1))
-                new_psi_plus[:, self._time_index] = handle_array(wfn.plus_component)
-
-                new_psi_zero = data[dmp.SPIN1_WAVEFUNCTION_ZERO]
-                new_psi_zero.resize((wfn.grid.num_points_x, self._time_index + 1))
-                new_psi_zero[:, self._time_index] = handle_array(wfn.zero_component)
-
-                new_psi_minus = data[dmp.SPIN1_WAVEFUNCTION_MINUS]
-                new_psi_minus.resize((wfn.grid.num_points_x, self._time_index + 1))
-                new_psi_minus[:, self._time_index] = handle_array(wfn.minus_component)
-            else:
-                new_psi_plus = data[dmp.SPIN1_WAVEFUNCTION_PLUS]
-                new_psi_plus.resize((*wfn.grid.shape, self._time_index + 1))
-                new_psi_plus[..., self._time_index] = handle_array(wfn.plus_component)
-
-                new_psi_zero = data[dmp.SPIN1_WAVEFUNCTION_ZERO]
-                new_psi_zero.resize((*wfn.grid.shape, self._time_index + 1))
-                new_psi_zero[..., self._time_index] = handle_array(wfn.zero_component)
-
-                new_psi_minus = data[dmp.SPIN1_WAVEFUNCTION_MINUS]
-                new_psi_minus.resize((*wfn.grid.shape, self._time_index + 1))
-                new_psi_minus[..., self._time_index] = handle_array(wfn.minus_component)
-
-        self._time_index += 1
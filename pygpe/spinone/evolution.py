@@ -1,8 +1,8 @@
-try:
-    import cupy as cp  # type: ignore
-except ImportError:
-    import numpy as cp
+from __future__ import annotations
+
+from pygpe.shared.backend import cp
 from pygpe.spinone.wavefunction import SpinOneWavefunction
+from pygpe.shared.spectral import _kinetic_energy
 
 
 def step_wavefunction(wfn: SpinOneWavefunction, params: dict) -> None:
@@ -134,3 +134,34 @@ def _calculate_atom_num(wfn: SpinOneWavefunction) -> float:
     )
 
     return atom_num_plus + atom_num_zero + atom_num_minus
+
+
+def _calculate_energy(wfn: SpinOneWavefunction, pm: dict) -> float:
+    """Calculates the total energy of the system. Both the real-space and
+    Fourier-space components must be up-to-date.
+
+    :param wfn: The wavefunction of the system.
+    :param pm: The parameters' dictionary.
+    :return: The total energy.
+    """
+    kinetic = _kinetic_energy(
+        wfn.grid,
+        [
+            wfn.fourier_plus_component,
+            wfn.fourier_zero_component,
+            wfn.fourier_minus_component,
+        ],
+    )
+    spin_perp, spin_z = _calculate_spins(wfn)
+    dens = _calculate_density(wfn)
+    dens_plus = cp.abs(wfn.plus_component) ** 2
+    dens_minus = cp.abs(wfn.minus_component) ** 2
+    potential = wfn.grid.grid_spacing_product * cp.sum(
+        pm["trap"] * dens
+        - pm["p"] * spin_z
+        + pm["q"] * (dens_plus + dens_minus)
+        + pm["c0"] / 2 * dens**2
+        + pm["c2"] / 2 * (cp.abs(spin_perp) ** 2 + spin_z**2)
+    )
+
+    return kinetic + float(potential)
@@ -1,9 +1,43 @@
-import h5py
+from __future__ import annotations
 
+from pygpe.shared.backend import cp
 from pygpe.shared.data_manager import _DataManager
-from pygpe.shared.utils import handle_array
 from pygpe.shared import data_manager_paths as dmp
 from pygpe.spintwo.wavefunction import SpinTwoWavefunction
+from pygpe.spintwo.evolution import (
+    _calculate_energy,
+    _calculate_spin_vectors,
+    _density,
+    _singlet_duo,
+)
+
+
+def _spin_vectors(wfn: SpinTwoWavefunction) -> tuple[cp.ndarray, cp.ndarray]:
+    """Returns the perpendicular and longitudinal spin densities."""
+    return _calculate_spin_vectors(
+        [
+            wfn.plus2_component,
+            wfn.plus1_component,
+            wfn.zero_component,
+            wfn.minus1_component,
+            wfn.minus2_component,
+        ]
+    )
+
+
+def _spin_z(wfn: SpinTwoWavefunction) -> cp.ndarray:
+    """Returns the longitudinal spin density."""
+    return _spin_vectors(wfn)[1]
+
+
+def _spin_perp(wfn: SpinTwoWavefunction) -> cp.ndarray:
+    """Returns the magnitude of the perpendicular spin density."""
+    return cp.abs(_spin_vectors(wfn)[0])
+
+
+def _singlet_amplitude(wfn: SpinTwoWavefunction) -> cp.ndarray:
+    """Returns the magnitude of the spin-singlet pair amplitude."""
+    return cp.abs(_singlet_duo(wfn))
 
 
 class DataManager(_DataManager):
@@ -14,139 +48,41 @@ class DataManager(_DataManager):
     :type filename: str
     :param data_path: The relative path to the folder containing the data file.
     :type data_path: str
+    :param kwargs: Optional output settings passed on to the shared
+        DataManager, e.g. `shard` to write to a per-worker shard file,
+        `backend` to choose the storage backend or `observables` to save
+        derived observables such as "singlet_amplitude".
 
     :ivar filename: The name of the data file.
     :ivar data_path: The relative path to the folder containing the data file.
+    :ivar save_time: The total wall time spent saving frames, in seconds.
     """
 
+    _components = {
+        "plus2_component": dmp.SPIN2_WAVEFUNCTION_PLUS_TWO,
+        "plus1_component": dmp.SPIN2_WAVEFUNCTION_PLUS_ONE,
+        "zero_component": dmp.SPIN2_WAVEFUNCTION_ZERO,
+        "minus1_component": dmp.SPIN2_WAVEFUNCTION_MINUS_ONE,
+        "minus2_component": dmp.SPIN2_WAVEFUNCTION_MINUS_TWO,
+    }
+
+    _observables = {
+        "density": _density,
+        "spin_z": _spin_z,
+        "spin_perp": _spin_perp,
+        "singlet_amplitude": _singlet_amplitude,
+    }
+
+    _energy = staticmethod(_calculate_energy)
+
     def __init__(
         self,
         filename: str,
         data_path: str,
         wfn: SpinTwoWavefunction,
         params: dict,
+        **kwargs,
     ):
         """Constructs the DataManager object."""
-        super().__init__(filename, data_path, wfn, params)
+        super().__init__(filename, data_path, wfn, params, **kwargs)
         self._save_initial_wfn(wfn)
-
-    def _save_initial_wfn(self, wfn: SpinTwoWavefunction) -> None:
-        """Creates new datasets in file for the wavefunction."""
-        with h5py.File(self.data_path_and_file, "r+") as file:
-            if wfn.grid.ndim == 1:
-                file.create_dataset(
-                    dmp.SPIN2_WAVEFUNCTION_PLUS_TWO,
-                    (wfn.grid.shape, 1),
-                    maxshape=(wfn.grid.shape, None),
-                    dtype="complex128",
-                )
-                file.create_dataset(
-                    dmp.SPIN2_WAVEFUNCTION_PLUS_ONE,
-                    (wfn.grid.shape, 1),
-                    maxshape=(wfn.grid.shape, None),
-                    dtype="complex128",
-                )
-                file.create_dataset(
-                    dmp.SPIN2_WAVEFUNCTION_ZERO,
-                    (wfn.grid.shape, 1),
-                    maxshape=(wfn.grid.shape, None),
-                    dtype="complex128",
-                )
-                file.create_dataset(
-                    dmp.SPIN2_WAVEFUNCTION_MINUS_ONE,
-                    (wfn.grid.shape, 1),
-                    maxshape=(wfn.grid.shape, None),
-                    dtype="complex128",
-                )
-                file.create_dataset(
-                    dmp.SPIN2_WAVEFUNCTION_MINUS_TWO,
-                    (wfn.grid.shape, 1),
-                    maxshape=(wfn.grid.shape, None),
-                    dtype="complex128",
-                )
-            else:
-                file.create_dataset(
-                    dmp.SPIN2_WAVEFUNCTION_PLUS_TWO,
-                    (*wfn.grid.shape, 1),
-                    maxshape=(*wfn.grid.shape, None),
-                    dtype="complex128",
-                )
-                file.create_dataset(
-                    dmp.SPIN2_WAVEFUNCTION_PLUS_ONE,
-                    (*wfn.grid.shape, 1),
-                    maxshape=(*wfn.grid.shape, None),
-                    dtype="complex128",
-                )
-                file.create_dataset(
-                    dmp.SPIN2_WAVEFUNCTION_ZERO,
-                    (*wfn.grid.shape, 1),
-                    maxshape=(*wfn.grid.shape, None),
-                    dtype="complex128",
-                )
-                file.create_dataset(
-                    dmp.SPIN2_WAVEFUNCTION_MINUS_ONE,
-                    (*wfn.grid.shape, 1),
-                    maxshape=(*wfn.grid.shape, None),
-                    dtype="complex128",
-                )
-                file.create_dataset(
-                    dmp.SPIN2_WAVEFUNCTION_MINUS_TWO,
-                    (*wfn.grid.shape, 1),
-                    maxshape=(*wfn.grid.shape, None),
-                    dtype="complex128",
-                )
-
-    def save_wavefunction(self, wfn: SpinTwoWavefunction) -> None:
-        """Saves the current wavefunction data to the dataset.
-
-        :param wfn: The wavefunction of the system.
-        :type wfn: :class:`Wavefunction`
-        """
-        wfn.ifft()  # Update real-space wavefunction before saving
-        with h5py.File(self.data_path_and_file, "r+") as data:
-            if wfn.grid.ndim == 1:
-                new_psi_plus2 = data[dmp.SPIN2_WAVEFUNCTION_PLUS_TWO]
-                new_psi_plus2.resize((wfn.grid.num_points_x, self._time_index + 1))
-                new_psi_plus2[:, self._time_index] = handle_array(wfn.plus2_component)
-
-                new_psi_plus1 = data[dmp.SPIN2_WAVEFUNCTION_PLUS_ONE]
-                new_psi_plus1.resize((wfn.grid.num_points_x, self._time_index + 1))
-                new_psi_plus1[:, self._time_index] = handle_array(wfn.plus1_component)
-
-                new_psi_zero = data[dmp.SPIN2_WAVEFUNCTION_ZERO]
-                new_psi_zero.resize((wfn.grid.num_points_x, self._time_index + 1))
-                new_psi_zero[:, self._time_index] = handle_array(wfn.zero_component)
-
-                new_psi_minus1 = data[dmp.SPIN2_WAVEFUNCTION_MINUS_ONE]
-                new_psi_minus1.resize((wfn.grid.num_points_x, self._time_index + 1))
-                new_psi_minus1[:, self._time_index] = handle_array(wfn.minus1_component)
-
-                new_psi_minus2 = data[dmp.SPIN2_WAVEFUNCTION_MINUS_TWO]
-                new_psi_minus2.resize((wfn.grid.num_points_x, self._time_index + 1))
-                new_psi_minus2[:, self._time_index] = handle_array(wfn.minus2_component)
-            else:
-                new_psi_plus2 = data[dmp.SPIN2_WAVEFUNCTION_PLUS_TWO]
-                new_psi_plus2.resize((*wfn.grid.shape, self._time_index + 1))
-                new_psi_plus2[..., self._time_index] = handle_array(wfn.plus2_component)
-
-                new_psi_plus1 = data[dmp.SPIN2_WAVEFUNCTION_PLUS_ONE]
-                new_psi_plus1.resize((*wfn.grid.shape, self._time_index + 1))
-                new_psi_plus1[..., self._time_index] = handle_array(wfn.plus1_component)
-
-                new_psi_zero = data[dmp.SPIN2_WAVEFUNCTION_ZERO]
-                new_psi_zero.resize((*wfn.grid.shape, self._time_index + 1))
-                new_psi_zero[..., self._time_index] = handle_array(wfn.zero_component)
-
-                new_psi_minus1 = data[dmp.SPIN2_WAVEFUNCTION_MINUS_ONE]
-                new_psi_minus1.resize((*wfn.grid.shape, self._time_index + 1))
-                new_psi_minus1[..., self._time_index] = handle_array(
-                    wfn.minus1_component
-                )
-
-                new_psi_minus2 = data[dmp.SPIN2_WAVEFUNCTION_MINUS_TWO]
-                new_psi_minus2.resize((*wfn.grid.shape, self._time_index + 1))
-                new_psi_minus2[..., self._time_index] = handle_array(
-                    wfn.minus2_component
-                )
-
-        self._time_index += 1
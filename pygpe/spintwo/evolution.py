@@ -1,8 +1,8 @@
-try:
-    import cupy as cp  # type: ignore
-except ImportError:
-    import numpy as cp
+from __future__ import annotations
+
+from pygpe.shared.backend import cp
 from pygpe.spintwo.wavefunction import SpinTwoWavefunction
+from pygpe.shared.spectral import _kinetic_energy
 
 
 def step_wavefunction(wfn: SpinTwoWavefunction, params: dict) -> None:
@@ -242,3 +242,45 @@ def _calculate_atom_num(
         + atom_num_minus1
         + atom_num_minus2
     )
+
+
+def _calculate_energy(wfn: SpinTwoWavefunction, pm: dict) -> float:
+    """Calculates the total energy of the system. Both the real-space and
+    Fourier-space components must be up-to-date.
+
+    :param wfn: The wavefunction of the system.
+    :param pm: The parameters' dictionary.
+    :return: The total energy.
+    """
+    kinetic = _kinetic_energy(
+        wfn.grid,
+        [
+            wfn.fourier_plus2_component,
+            wfn.fourier_plus1_component,
+            wfn.fourier_zero_component,
+            wfn.fourier_minus1_component,
+            wfn.fourier_minus2_component,
+        ],
+    )
+    components = [
+        wfn.plus2_component,
+        wfn.plus1_component,
+        wfn.zero_component,
+        wfn.minus1_component,
+        wfn.minus2_component,
+    ]
+    fp, fz = _calculate_spin_vectors(components)
+    n = _density(wfn)
+    quadratic_zeeman = sum(
+        (2 - ii) ** 2 * abs(component) ** 2 for ii, component in enumerate(components)
+    )
+    potential = wfn.grid.grid_spacing_product * cp.sum(
+        pm["trap"] * n
+        - pm["p"] * fz
+        + pm["q"] * quadratic_zeeman
+        + pm["c0"] / 2 * n**2
+        + pm["c2"] / 2 * (abs(fp) ** 2 + fz**2)
+        + pm["c4"] / 2 * abs(_singlet_duo(wfn)) ** 2
+    )
+
+    return kinetic + float(potential)
@@ -0,0 +1,154 @@
+import h5py
+import numpy as np
+import pytest
+from pathlib import Path
+
+import pygpe.shared.data_manager_paths as dmp
+from pygpe.scalar.data_manager import DataManager
+from pygpe.scalar.data_reader import DataReader
+from pygpe.scalar.wavefunction import ScalarWavefunction
+from pygpe.shared.data_reader import _FrameView
+from pygpe.shared.storage import _memory_map
+from pygpe.shared.grid import Grid
+
+FILENAME = "scalar_reader_test.hdf5"
+FILE_PATH = "."
+NUM_FRAMES = 5
+
+
+def generate_data_file() -> list[np.ndarray]:
+    """Saves a short 2D scalar trajectory to file for use in testing.
+
+    :return: The list of saved wavefunction arrays.
+    :rtype: list[np.ndarray]
+    """
+    wavefunction = ScalarWavefunction(Grid((32, 16), (0.5, 0.25)))
+    params = {"g": 1, "trap": 0, "nt": 10, "dt": -1j * 1e-2, "t": 0}
+    data = DataManager(FILENAME, FILE_PATH, wavefunction, params)
+
+    saved = []
+    for _ in range(NUM_FRAMES):
+        wavefunction.set_wavefunction(
+            np.ones(wavefunction.grid.shape, dtype="complex128")
+        )
+        wavefunction.add_noise(0.0, 1e-2)
+        wavefunction.fft()
+        data.save_wavefunction(wavefunction)
+        saved.append(wavefunction.component.copy())
+
+    return saved
+
+
+def test_grid_and_params():
+    """Tests whether the grid and parameters are rebuilt from file."""
+    generate_data_file()
+
+    with DataReader(FILENAME, FILE_PATH) as reader:
+        assert reader.grid.shape == (32, 16)
+        assert reader.grid.grid_spacing_y == 0.25
+        assert reader.params["dt"] == -1j * 1e-2
+        assert isinstance(reader.params["dt"], complex)
+        assert len(reader) == NUM_FRAMES
+
+    Path.unlink(Path(f"{FILE_PATH}/{FILENAME}"))
+
+
+
+def test_no_saves():
+    """Tests whether a file without any saved frames holds no frames, rather
+    than the placeholder frame of its datasets.
+    """
+    wavefunction = ScalarWavefunction(Grid((32, 16), (0.5, 0.25)))
+    DataManager(FILENAME, FILE_PATH, wavefunction, {"g": 1, "dt": 1e-2})
+
+    with DataReader(FILENAME, FILE_PATH) as reader:
+        assert reader.num_frames == 0
+        assert len(reader.times) == 0
+        assert list(reader) == []
+        with pytest.raises(IndexError):
+            reader[0]
+
+    Path.unlink(Path(f"{FILE_PATH}/{FILENAME}"))
+
+
+def test_frames():
+    """Tests whether single frames, slices and chunks match the saved data."""
+    saved = generate_data_file()
+
+    with DataReader(FILENAME, FILE_PATH) as reader:
+        np.testing.assert_array_equal(reader[2]["component"], saved[2])
+        np.testing.assert_array_equal(reader[-1]["component"], saved[-1])
+        np.testing.assert_array_equal(reader[1:4]["component"], np.stack(saved[1:4]))
+        np.testing.assert_array_equal(reader[::-2]["component"], np.stack(saved[::-2]))
+        for index, frame in enumerate(reader):
+            np.testing.assert_array_equal(frame["component"], saved[index])
+        for start, block in reader.iter_chunks(2):
+            np.testing.assert_array_equal(
+                block["component"], np.stack(saved[start : start + 2])
+            )
+        with pytest.raises(IndexError):
+            reader[NUM_FRAMES]
+
+    Path.unlink(Path(f"{FILE_PATH}/{FILENAME}"))
+
+
+def test_wavefunction():
+    """Tests whether a ready-to-use wavefunction is built from a frame."""
+    saved = generate_data_file()
+
+    with DataReader(FILENAME, FILE_PATH) as reader:
+        wavefunction = reader.wavefunction(3)
+        np.testing.assert_array_equal(wavefunction.component, saved[3])
+        np.testing.assert_array_almost_equal(
+            wavefunction.fourier_component, np.fft.fftn(saved[3])
+        )
+        assert wavefunction.atom_num > 0
+
+    Path.unlink(Path(f"{FILE_PATH}/{FILENAME}"))
+
+
+def test_contiguous_dataset_is_memory_mapped():
+    """Tests whether contiguous datasets are read through a memory map."""
+    data = np.random.uniform(size=(8, 8, 3))
+    with h5py.File(f"{FILE_PATH}/{FILENAME}", "w") as file:
+        file.create_dataset(dmp.SCALAR_WAVEFUNCTION, data=data)
+
+    with h5py.File(f"{FILE_PATH}/{FILENAME}", "r") as file:
+        dataset = file[dmp.SCALAR_WAVEFUNCTION]
+        frames = _FrameView(_memory_map(dataset), dict(dataset.attrs))
+        assert isinstance(frames._array, np.memmap)
+        np.testing.assert_array_equal(frames[1], data[..., 1])
+        del frames
+
+    Path.unlink(Path(f"{FILE_PATH}/{FILENAME}"))
+
+
+def test_fourier_space_saving():
+    """Tests whether Fourier-space frames are saved without an inverse
+    transform and read back in either space.
+    """
+    wavefunction = ScalarWavefunction(Grid((32, 16), (0.5, 0.25)))
+    wavefunction.set_wavefunction(np.ones((32, 16), dtype="complex128"))
+    wavefunction.add_noise(0.0, 1e-2)
+    wavefunction.fft()
+    real_space = wavefunction.component.copy()
+    wavefunction.component = None  # Saving must not need the real-space array
+
+    data = DataManager(FILENAME, FILE_PATH, wavefunction, {"g": 1}, fourier=True)
+    data.save_wavefunction(wavefunction)
+
+    with h5py.File(f"{FILE_PATH}/{FILENAME}", "r") as file:
+        dataset = file[dmp.SCALAR_WAVEFUNCTION]
+        assert dataset.attrs[dmp.SPACE] == "fourier"
+        np.testing.assert_array_equal(dataset[..., 0], wavefunction.fourier_component)
+
+    with DataReader(FILENAME, FILE_PATH) as reader:
+        np.testing.assert_array_almost_equal(reader[0]["component"], real_space)
+        np.testing.assert_array_equal(
+            reader.fourier_component("component")[0], wavefunction.fourier_component
+        )
+        np.testing.assert_array_almost_equal(
+            reader.component("component")[0:1], real_space[np.newaxis]
+        )
+
+    Path.unlink(Path(f"{FILE_PATH}/{FILENAME}"))
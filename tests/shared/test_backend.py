@@ -0,0 +1,62 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+CHECK_IMPORTS = """
+import sys
+import pygpe.scalar, pygpe.spinhalf, pygpe.spinone, pygpe.spintwo
+from pygpe.shared import backend
+
+print(backend.cp.resolved, backend.h5py.resolved, "h5py" in sys.modules)
+print(backend.cp.__name__, "cupy" in sys.modules)
+"""
+
+
+def _run(code: str, backend: str | None = None) -> subprocess.CompletedProcess:
+    env = dict(os.environ)
+    env.pop("PYGPE_BACKEND", None)
+    if backend is not None:
+        env["PYGPE_BACKEND"] = backend
+    return subprocess.run(
+        [sys.executable, "-c", code], env=env, capture_output=True, text=True
+    )
+
+
+def test_imports_are_lazy():
+    """Tests whether importing the systems neither resolves the array backend
+    nor imports h5py, and whether the backend can be forced to NumPy.
+    """
+    result = _run(CHECK_IMPORTS, backend="numpy")
+    assert result.returncode == 0, result.stderr
+    imports, resolved = result.stdout.splitlines()
+    assert imports == "False False False"
+    assert resolved == "numpy False"
+
+
+def test_unsupported_backend():
+    """Tests whether an unsupported backend raises an error on first use."""
+    result = _run("from pygpe.shared.backend import cp; cp.zeros(1)", "jax")
+    assert result.returncode != 0
+    assert "PYGPE_BACKEND=jax is unsupported" in result.stderr
+
+
+def test_lazy_module_caches_attributes():
+    """Tests whether resolved attributes are cached on the proxy."""
+    from pygpe.shared.backend import _LazyModule
+
+    loads = []
+
+    def load():
+        loads.append(None)
+        return os
+
+    module = _LazyModule(load)
+    assert not module.resolved
+    assert module.sep is os.sep
+    assert module.getcwd is os.getcwd
+    assert module.resolved and len(loads) == 1
+    assert "sep" in vars(module)
+    with pytest.raises(AttributeError):
+        module.not_an_attribute
@@ -0,0 +1,147 @@
+import os
+import signal
+import subprocess
+import sys
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+import pygpe.scalar.evolution as evo
+from pygpe.scalar.data_manager import DataManager
+from pygpe.scalar.data_reader import DataReader
+from pygpe.scalar.wavefunction import ScalarWavefunction
+from pygpe.shared.checkpoint import Checkpointer, load_checkpoint, save_checkpoint
+from pygpe.shared.grid import Grid
+
+CHECKPOINT = "checkpoint_test.hdf5"
+FILENAME = "checkpoint_data_test.hdf5"
+FILE_PATH = "."
+
+
+def generate_wavefunction() -> ScalarWavefunction:
+    """Generates a noisy 1D scalar wavefunction for use in testing."""
+    wavefunction = ScalarWavefunction(Grid(32, 0.5))
+    wavefunction.set_wavefunction(np.ones(32, dtype="complex128"))
+    wavefunction.add_noise(0.0, 1e-2)
+    wavefunction.fft()
+    return wavefunction
+
+
+def test_round_trip():
+    """Tests whether the wavefunction, parameters and random states are
+    restored from a checkpoint, which is written atomically.
+    """
+    wavefunction = generate_wavefunction()
+    rng = np.random.default_rng(1)
+    params = {"g": 1.0, "dt": 0.1, "t": 2.5}
+    save_checkpoint(CHECKPOINT, FILE_PATH, wavefunction, params, rng=rng)
+    expected_numpy = np.random.uniform(size=4)
+    expected_generator = rng.uniform(size=4)
+
+    restored = ScalarWavefunction(Grid(32, 0.5))
+    restored_rng = np.random.default_rng(2)
+    restored_params, time_index = load_checkpoint(
+        CHECKPOINT, FILE_PATH, restored, rng=restored_rng
+    )
+
+    assert restored_params == params
+    assert time_index is None
+    np.testing.assert_array_equal(
+        restored.fourier_component, wavefunction.fourier_component
+    )
+    np.testing.assert_array_almost_equal(restored.component, wavefunction.component)
+    np.testing.assert_array_equal(np.random.uniform(size=4), expected_numpy)
+    np.testing.assert_array_equal(restored_rng.uniform(size=4), expected_generator)
+    assert not Path(f"{FILE_PATH}/{CHECKPOINT}.tmp").exists()
+
+    with pytest.raises(ValueError):
+        load_checkpoint(CHECKPOINT, FILE_PATH, ScalarWavefunction(Grid(16, 0.5)))
+
+    Path.unlink(Path(f"{FILE_PATH}/{CHECKPOINT}"))
+
+
+def test_resume():
+    """Tests whether resuming from a checkpoint reopens the data file in
+    append mode, overwriting the frames saved after the checkpoint.
+    """
+    params = {"g": 1.0, "trap": 0.0, "dt": 0.1, "t": 0.0}
+    wavefunction = generate_wavefunction()
+    data = DataManager(FILENAME, FILE_PATH, wavefunction, params)
+    for i in range(4):
+        if i == 2:
+            save_checkpoint(CHECKPOINT, FILE_PATH, wavefunction, params, data)
+        data.save_wavefunction(wavefunction, params["t"], i)
+        evo.step_wavefunction(wavefunction, params)
+        params["t"] += params["dt"]
+
+    restored = ScalarWavefunction(Grid(32, 0.5))
+    restored_params, time_index = load_checkpoint(CHECKPOINT, FILE_PATH, restored)
+    assert restored_params["t"] == pytest.approx(0.2)
+    data = DataManager(
+        FILENAME,
+        FILE_PATH,
+        restored,
+        restored_params,
+        append=True,
+        time_index=time_index,
+    )
+    data.save_wavefunction(restored, restored_params["t"], 2)
+
+    with DataReader(FILENAME, FILE_PATH) as reader:
+        assert reader.num_frames == 3
+        np.testing.assert_array_almost_equal(reader.times, [0.0, 0.1, 0.2])
+
+    Path.unlink(Path(f"{FILE_PATH}/{CHECKPOINT}"))
+    Path.unlink(Path(f"{FILE_PATH}/{FILENAME}"))
+
+
+
+def test_checkpoint_flushes_data():
+    """Tests whether checkpointing flushes the frames saved before it, when
+    a SWMR DataManager would otherwise flush them later.
+    """
+    params = {"g": 1.0, "trap": 0.0, "dt": 0.1, "t": 0.0}
+    wavefunction = generate_wavefunction()
+    with DataManager(
+        FILENAME, FILE_PATH, wavefunction, params, swmr=True, flush_every=10
+    ) as data:
+        for i in range(2):
+            data.save_wavefunction(wavefunction, 0.1 * i, i)
+        save_checkpoint(CHECKPOINT, FILE_PATH, wavefunction, params, data)
+
+        # Read in a separate process, which only sees flushed frames
+        code = (
+            "from pygpe.scalar.data_reader import DataReader\n"
+            f"with DataReader({FILENAME!r}, {FILE_PATH!r}, swmr=True) as reader:\n"
+            "    print(reader.num_frames)"
+        )
+        result = subprocess.run(
+            [sys.executable, "-c", code], capture_output=True, text=True
+        )
+        assert result.returncode == 0, result.stderr
+        assert result.stdout.strip() == "2"
+
+    Path.unlink(Path(f"{FILE_PATH}/{CHECKPOINT}"))
+    Path.unlink(Path(f"{FILE_PATH}/{FILENAME}"))
+
+
+def test_sigterm():
+    """Tests whether SIGTERM is deferred to the next call of
+    `maybe_checkpoint`, which checkpoints and exits.
+    """
+    wavefunction = generate_wavefunction()
+    checkpointer = Checkpointer(
+        CHECKPOINT, FILE_PATH, wavefunction, {"t": 0.0}, handle_sigterm=True
+    )
+    assert not checkpointer.maybe_checkpoint()
+
+    os.kill(os.getpid(), signal.SIGTERM)
+    with pytest.raises(SystemExit) as exit_info:
+        checkpointer.maybe_checkpoint()
+
+    assert exit_info.value.code == 128 + signal.SIGTERM
+    assert checkpointer.num_checkpoints == 1
+    assert signal.getsignal(signal.SIGTERM) is not checkpointer._on_signal
+
+    Path.unlink(Path(f"{FILE_PATH}/{CHECKPOINT}"))
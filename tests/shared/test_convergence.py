@@ -0,0 +1,79 @@
+import pytest
+
+from pygpe.scalar import DataManager, ScalarWavefunction, step_wavefunction
+from pygpe.shared.backend import cp
+from pygpe.shared.convergence import convergence_study, recommend
+from pygpe.shared.grid import Grid
+
+
+def gaussian_packet(grid: Grid) -> tuple[ScalarWavefunction, dict]:
+    """A moving Gaussian wave packet in a harmonic trap."""
+    wfn = ScalarWavefunction(grid)
+    wfn.set_wavefunction(
+        (cp.exp(-(grid.x_mesh**2) / 4 + 1j * grid.x_mesh)).astype("complex128")
+    )
+    params = {"g": 1, "trap": 0.1 * grid.x_mesh**2, "dt": 1e-2, "t": 0}
+    return wfn, params
+
+
+def study(**kwargs) -> list[dict]:
+    return convergence_study(
+        gaussian_packet,
+        step_wavefunction,
+        DataManager._energy,
+        0.4,
+        [Grid(32, 0.75), Grid(64, 0.375)],
+        [0.04, 0.02],
+        **kwargs,
+    )
+
+
+def test_convergence_study():
+    """Tests whether errors shrink with the time step and integrator order,
+    and whether the cheapest setting within tolerance is recommended.
+    """
+    records = study(integrators=["split-step", "yoshida"])
+    assert len(records) == 8
+    fine = {
+        (record["integrator"], record["dt"]): record
+        for record in records
+        if record["points"] == (64,)
+    }
+    split_coarse = fine[("split-step", 0.04)]["wavefunction_error"]
+    split_fine = fine[("split-step", 0.02)]["wavefunction_error"]
+    assert split_fine < split_coarse / 3  # Second order
+    assert fine[("yoshida", 0.04)]["wavefunction_error"] < split_fine
+
+    tolerance = fine[("yoshida", 0.04)]["wavefunction_error"] * 1.01
+    best = recommend(records, tolerance)
+    assert best["wavefunction_error"] <= tolerance
+    assert best["wall_time"] == min(
+        record["wall_time"]
+        for record in records
+        if record["wavefunction_error"] <= tolerance
+    )
+    with pytest.raises(ValueError):
+        recommend(records, 0.0)
+
+
+def test_convergence_study_invalid():
+    """Tests whether grids of different boxes, and the yoshida integrator in
+    imaginary time, raise errors.
+    """
+    with pytest.raises(ValueError):
+        study(reference=(Grid(64, 0.5), 0.01, "split-step"))
+
+    def imaginary_time(grid: Grid) -> tuple[ScalarWavefunction, dict]:
+        wfn, params = gaussian_packet(grid)
+        return wfn, {**params, "dt": -1j * 1e-2}
+
+    with pytest.raises(ValueError):
+        convergence_study(
+            imaginary_time,
+            step_wavefunction,
+            DataManager._energy,
+            0.4,
+            [Grid(32, 0.75)],
+            [0.04],
+            ["yoshida"],
+        )
@@ -0,0 +1,38 @@
+from pathlib import Path
+
+import pygpe.scalar as scalar
+import pygpe.spinone as spinone
+from pygpe.shared.memory import memory_report
+
+GRID_SHAPE = (32, 32)
+ARRAY_BYTES = 32 * 32 * 16  # A complex128 array on the grid
+
+
+def test_memory_report():
+    """Tests whether the resident bytes of the wavefunction are counted, and
+    whether the temporaries of a step and save are measured.
+    """
+    grid = spinone.Grid(GRID_SHAPE, (0.5, 0.5))
+    params = {"c0": 10, "c2": 0.5, "p": 0, "q": 0, "trap": 0, "n0": 1}
+    params["dt"] = -1j * 1e-2
+    report = memory_report(
+        grid, spinone.SpinOneWavefunction, params, {"observables": ["density"]}
+    )
+
+    assert report.component_bytes == 3 * ARRAY_BYTES
+    assert report.fourier_bytes == 3 * ARRAY_BYTES
+    assert report.grid_bytes > 0
+    assert report.step_peak_bytes >= ARRAY_BYTES
+    assert report.save_peak_bytes > 0
+    assert report.peak_bytes >= report.resident_bytes + report.step_peak_bytes
+    assert "step temporaries" in str(report)
+    assert not list(Path(".").glob("tmp*"))  # The dry-run data is removed
+
+    scalar_report = memory_report(
+        scalar.Grid(GRID_SHAPE, (0.5, 0.5)),
+        scalar.ScalarWavefunction,
+        {"g": 1, "trap": 0, "dt": 1e-2},
+    )
+    assert scalar_report.component_bytes == ARRAY_BYTES
+    assert scalar_report.save_peak_bytes is None
+    assert scalar_report.step_peak_bytes < report.step_peak_bytes
@@ -0,0 +1,82 @@
+import json
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from pygpe.shared.planner import (
+    _features,
+    _fit_non_negative,
+    calibrate,
+    fft_friendly_size,
+    plan,
+    plan_grid,
+    predict,
+)
+
+CACHE_FILENAME = "planner_test.json"
+
+
+def test_fft_friendly_size():
+    """Tests whether sizes are rounded up to even products of 2, 3 and 5."""
+    assert fft_friendly_size(128) == 128
+    assert fft_friendly_size(97) == 100
+    assert fft_friendly_size(127) == 128
+    assert fft_friendly_size(131) == 144
+    assert fft_friendly_size(131, even=False) == 135
+    assert fft_friendly_size(241) == 250
+    assert fft_friendly_size(7, primes=(2,)) == 8
+    with pytest.raises(ValueError):
+        fft_friendly_size(7, primes=(3, 5))
+
+
+
+def test_fit_non_negative():
+    """Tests whether noisy timings are fitted with non-negative coefficients,
+    where an unconstrained fit gives a negative one.
+    """
+    sizes = [n * n for n in (32, 64, 96, 128, 192, 256)]
+    features = np.array([_features(size) for size in sizes])
+    times = 1e-8 * np.array(sizes, dtype=float) + 1e-3
+    times[-1] *= 0.8  # A fast outlier at the largest size
+
+    unconstrained, *_ = np.linalg.lstsq(features, times, rcond=None)
+    assert np.any(unconstrained < 0)
+    coefficients = _fit_non_negative(features, times)
+    assert np.all(coefficients >= 0)
+    assert np.all(features @ coefficients > 0)
+
+    exact = np.array([1e-9, 2e-8, 1e-4])
+    np.testing.assert_allclose(_fit_non_negative(features, features @ exact), exact)
+
+
+def test_plan():
+    """Tests whether calibrations are cached, and whether the plan suggests a
+    feasible FFT-friendly grid with costs growing with its size.
+    """
+    calibration = calibrate(["scalar"], cache=CACHE_FILENAME)["scalar"]
+    assert calibration["bytes_per_point"] > 0
+    cached = json.loads(Path(CACHE_FILENAME).read_text())
+    assert [list(machine) for machine in cached.values()] == [["scalar"]]
+    assert calibrate(["scalar"], cache=CACHE_FILENAME)["scalar"] == calibration
+
+    suggestion = plan("scalar", (97, 97), cache=CACHE_FILENAME)
+    assert suggestion.points == (100, 100)
+    odd_request = plan("scalar", (131, 241), cache=CACHE_FILENAME)
+    assert all(n % 2 == 0 for n in odd_request.points)
+    assert suggestion.feasible
+    larger = predict("scalar", (400, 400), cache=CACHE_FILENAME)
+    assert larger.time_per_step > suggestion.time_per_step
+    assert larger.memory_bytes == pytest.approx(16 * suggestion.memory_bytes, 1e-3)
+    assert larger.time(10) == pytest.approx(10 * larger.time_per_step)
+
+    grid = plan_grid(suggestion, (50.0, 25.0))
+    assert grid.shape == (100, 100)
+    assert grid.grid_spacing_y == 0.25
+
+    with pytest.raises(ValueError):
+        plan("scalar", (97, 97), memory_limit=1024, cache=CACHE_FILENAME)
+    with pytest.raises(ValueError):
+        calibrate(["spin3"], cache=CACHE_FILENAME)
+
+    Path.unlink(Path(CACHE_FILENAME))
@@ -0,0 +1,86 @@
+import json
+from pathlib import Path
+
+import pytest
+
+import pygpe.spinone as gpe
+import pygpe.spinone.evolution as evolution
+from pygpe.shared.profiler import Profiler
+
+FILENAME = "profiler_test.hdf5"
+TRACE_FILENAME = "profiler_test.json"
+FILE_PATH = "."
+
+
+def test_profiler():
+    """Tests whether each stage of a step and of saving is timed, and whether
+    the instrumented functions are restored when the profiler exits.
+    """
+    kinetic_step = evolution._kinetic_zeeman_step
+    fft = gpe.SpinOneWavefunction.fft
+    params = {"c0": 10, "c2": 0.5, "p": 0, "q": 0, "trap": 0, "n0": 1}
+    params["dt"] = -1j * 1e-2
+    wavefunction = gpe.SpinOneWavefunction(gpe.Grid((16, 16), (0.5, 0.5)))
+    wavefunction.set_ground_state("polar", params)
+    wavefunction.fft()
+    data = gpe.DataManager(FILENAME, FILE_PATH, wavefunction, params)
+
+    with Profiler(trace=True) as profiler:
+        for _ in range(3):
+            gpe.step_wavefunction(wavefunction, params)
+        data.save_wavefunction(wavefunction)
+
+    summary = profiler.summary()
+    assert summary["kinetic"]["calls"] == 6
+    assert summary["nonlinear"]["calls"] == 3
+    assert summary["renormalise"]["calls"] == 3
+    assert summary["fft"]["calls"] == 6  # Including those of renormalisations
+    assert summary["ifft"]["calls"] == 7  # Including that of the save
+    assert summary["save"]["calls"] == 1
+    assert summary["renormalise"]["total"] > 0
+    assert "renormalise" in profiler.report()
+
+    assert evolution._kinetic_zeeman_step is kinetic_step
+    assert gpe.SpinOneWavefunction.fft is fft
+    gpe.step_wavefunction(wavefunction, params)
+    assert profiler.summary()["kinetic"]["calls"] == 6
+
+    profiler.export_chrome_trace(TRACE_FILENAME)
+    trace = json.loads(Path(TRACE_FILENAME).read_text())
+    assert len(trace["traceEvents"]) == len(profiler.events)
+    assert {event["cat"] for event in trace["traceEvents"]} == {"spinone", "io"}
+
+    Path.unlink(Path(f"{FILE_PATH}/{FILENAME}"))
+    Path.unlink(Path(TRACE_FILENAME))
+
+
+def test_profiler_memory_is_bounded():
+    """Tests whether calls are only kept when tracing, and only the most
+    recent `max_events` of them, while every call is counted.
+    """
+    params = {"c0": 10, "c2": 0.5, "p": 0, "q": 0, "trap": 0, "n0": 1, "dt": 1e-2}
+    wavefunction = gpe.SpinOneWavefunction(gpe.Grid((16, 16), (0.5, 0.5)))
+    wavefunction.set_ground_state("polar", params)
+    wavefunction.fft()
+
+    with Profiler() as profiler:
+        for _ in range(5):
+            gpe.step_wavefunction(wavefunction, params)
+    assert len(profiler.events) == 0
+    assert profiler.summary()["kinetic"]["calls"] == 10
+    with pytest.raises(ValueError):
+        profiler.export_chrome_trace(TRACE_FILENAME)
+
+    with Profiler(trace=True, max_events=4) as profiler:
+        for _ in range(5):
+            gpe.step_wavefunction(wavefunction, params)
+    assert len(profiler.events) == 4
+    assert profiler.summary()["kinetic"]["calls"] == 10
+
+
+def test_nested_profilers():
+    """Tests whether activating two profilers at once raises an error."""
+    with Profiler():
+        with pytest.raises(ValueError):
+            with Profiler():
+                pass
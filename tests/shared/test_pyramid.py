@@ -0,0 +1,56 @@
+import numpy as np
+import pytest
+from pathlib import Path
+
+from pygpe.shared.grid import Grid
+from pygpe.shared.pyramid import _choose_level
+from pygpe.spinone.data_manager import DataManager
+from pygpe.spinone.data_reader import DataReader
+from pygpe.spinone.wavefunction import SpinOneWavefunction
+
+FILENAME = "pyramid_test.hdf5"
+FILE_PATH = "."
+
+
+def test_pyramid_levels():
+    """Tests whether each pyramid level holds the downsampled density and is
+    picked according to the display size.
+    """
+    wavefunction = SpinOneWavefunction(Grid((32, 16), (0.5, 0.5)))
+    wavefunction.add_noise("all", 0.0, 1.0)
+    wavefunction.fft()
+    data = DataManager(FILENAME, FILE_PATH, wavefunction, {}, pyramid_levels=2)
+    data.save_wavefunction(wavefunction)
+    density = sum(
+        abs(getattr(wavefunction, name)) ** 2 for name in DataManager._components
+    )
+
+    with DataReader(FILENAME, FILE_PATH) as reader:
+        assert reader.pyramid_levels == [1, 2]
+        assert reader.pyramid_level((8, 4)) == 2
+        assert reader.pyramid_level(5) == 1
+        assert reader.pyramid_level(64) == 0
+        np.testing.assert_array_almost_equal(reader.density(0), density)
+
+        coarse = reader.density(0, display_shape=(8, 4))
+        assert coarse.shape == (8, 4)
+        # Downsampling preserves the mean density
+        assert coarse.mean() == pytest.approx(density.mean())
+
+    Path.unlink(Path(f"{FILE_PATH}/{FILENAME}"))
+
+
+def test_choose_level():
+    """Tests whether the coarsest sufficient level is chosen."""
+    shapes = {0: (64, 64), 1: (32, 32), 2: (16, 16)}
+    assert _choose_level(shapes, 16) == 2
+    assert _choose_level(shapes, (17, 8)) == 1
+    assert _choose_level(shapes, 100) == 0
+    assert _choose_level({1: (32, 32), 2: (16, 16)}, 100) == 1
+
+
+def test_too_many_levels():
+    """Tests whether a pyramid coarser than the grid raises an error."""
+    wavefunction = SpinOneWavefunction(Grid(8, 0.5))
+    with pytest.raises(ValueError):
+        DataManager(FILENAME, FILE_PATH, wavefunction, {}, pyramid_levels=4)
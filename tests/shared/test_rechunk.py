@@ -0,0 +1,185 @@
+import operator
+from pathlib import Path
+
+import h5py
+import numpy as np
+import pytest
+
+import pygpe.shared.data_manager_paths as dmp
+from pygpe.shared.grid import Grid
+from pygpe.shared.rechunk import _blocks, rechunk, rechunk_files
+from pygpe.spinone.data_manager import DataManager
+from pygpe.spinone.data_reader import DataReader
+from pygpe.spinone.wavefunction import SpinOneWavefunction
+
+FILENAME = "rechunk_test.hdf5"
+FILE_PATH = "."
+
+
+def save_frames(filename: str) -> list[dict[str, np.ndarray]]:
+    """Saves a short spin-1 trajectory with its density.
+
+    :return: The frames read back from the original file.
+    """
+    wavefunction = SpinOneWavefunction(Grid((16, 8), (0.5, 0.5)))
+    params = {"c0": 10, "c2": -0.5, "p": 0.0, "q": 0.5, "trap": 0.0, "dt": 1e-2}
+    data = DataManager(
+        filename,
+        FILE_PATH,
+        wavefunction,
+        params,
+        observables=["density"],
+        record_energy=True,
+    )
+    for i in range(5):
+        wavefunction.add_noise("all", 0.0, 1.0)
+        wavefunction.fft()
+        # The first frame records no time, which is saved as NaN
+        data.save_wavefunction(wavefunction, 0.1 * i if i else None, i)
+
+    with DataReader(filename, FILE_PATH) as reader:
+        return list(reader)
+
+
+def test_rechunk():
+    """Tests whether rechunking in place, in blocks of two frames of each
+    component, stores every time series time-major with one frame per chunk,
+    and is read back identically.
+    """
+    frames = save_frames(FILENAME)
+    with DataReader(FILENAME, FILE_PATH) as reader:
+        frame_table = reader.frame_table
+
+    assert rechunk(FILENAME, FILE_PATH, max_bytes=4096) == Path(
+        f"{FILE_PATH}/{FILENAME}"
+    )
+
+    with h5py.File(f"{FILE_PATH}/{FILENAME}", "r") as file:
+        dataset = file[DataManager._components["zero_component"]]
+        assert dataset.shape == (5, 16, 8)
+        assert dataset.chunks == (1, 16, 8)
+        assert dataset.attrs[dmp.TIME_AXIS] == 0
+    with DataReader(FILENAME, FILE_PATH) as reader:
+        assert reader.params["c0"] == 10
+        assert reader.frame_table.tobytes() == frame_table.tobytes()
+        for frame, expected in zip(reader, frames):
+            for name, data in expected.items():
+                np.testing.assert_array_equal(frame[name], data)
+
+    Path.unlink(Path(f"{FILE_PATH}/{FILENAME}"))
+
+
+
+def density_moments(reader: DataReader, index: int) -> np.ndarray:
+    density = reader.density(index)
+    return np.array([density.min(), density.mean(), density.max()])
+
+
+def test_rechunk_map_frames_outputs():
+    """Tests whether per-frame results saved by `map_frames` are rechunked
+    along their leading time axis, while reduced results are copied as is.
+    """
+    save_frames(FILENAME)
+    with DataReader(FILENAME, FILE_PATH) as reader:
+        moments = reader.map_frames(
+            density_moments, workers=1, output="analysis/moments"
+        )
+        total = reader.map_frames(
+            density_moments, workers=1, reduce=operator.add, output="analysis/total"
+        )
+
+    rechunk(FILENAME, FILE_PATH)
+
+    with h5py.File(f"{FILE_PATH}/{FILENAME}", "r") as file:
+        assert file["analysis/moments"].shape == (5, 3)
+        np.testing.assert_array_equal(file["analysis/moments"], moments)
+        np.testing.assert_array_equal(file["analysis/total"], total)
+
+    Path.unlink(Path(f"{FILE_PATH}/{FILENAME}"))
+
+
+
+def test_rechunk_without_saves():
+    """Tests whether rechunking a file without saved frames leaves out the
+    placeholder frame, so frames appended afterwards start at the first.
+    """
+    wavefunction = SpinOneWavefunction(Grid((16, 8), (0.5, 0.5)))
+    wavefunction.add_noise("all", 0.0, 1.0)
+    wavefunction.fft()
+    DataManager(FILENAME, FILE_PATH, wavefunction, {})
+
+    rechunk(FILENAME, FILE_PATH)
+
+    with h5py.File(f"{FILE_PATH}/{FILENAME}", "r") as file:
+        assert file[DataManager._components["zero_component"]].shape == (0, 16, 8)
+    data = DataManager(FILENAME, FILE_PATH, wavefunction, {}, append=True)
+    data.save_wavefunction(wavefunction, 0.5, 1)
+    with DataReader(FILENAME, FILE_PATH) as reader:
+        assert reader.num_frames == 1
+        np.testing.assert_array_equal(reader.times, [0.5])
+        np.testing.assert_array_equal(
+            reader[0]["zero_component"], wavefunction.zero_component
+        )
+
+    Path.unlink(Path(f"{FILE_PATH}/{FILENAME}"))
+
+
+def test_blocks_are_bounded_in_bytes():
+    """Tests whether blocks hold the frames fitting in the byte budget, and
+    at least one frame.
+    """
+    with h5py.File("blocks_test.hdf5", "w", driver="core", backing_store=False) as file:
+        dataset = file.create_dataset("series", (16, 8, 10), dtype="complex128")
+        assert [frames.stop for frames in _blocks(dataset, 10, 4 * 2048)] == [4, 8, 10]
+        assert len(list(_blocks(dataset, 10, 1))) == 10
+
+
+def test_rechunk_files():
+    """Tests whether files are rechunked in parallel with compression and
+    single precision.
+    """
+    filenames = [f"rechunk_test_{i}.hdf5" for i in range(2)]
+    frames = [save_frames(filename) for filename in filenames]
+
+    rechunk_files(
+        [Path(FILE_PATH) / name for name in filenames],
+        workers=2,
+        compression="gzip",
+        complex64=True,
+    )
+
+    for filename, saved in zip(filenames, frames):
+        with DataReader(filename, FILE_PATH) as reader:
+            assert reader.component("zero_component").dtype == np.complex64
+            np.testing.assert_allclose(
+                reader[-1]["zero_component"], saved[-1]["zero_component"], rtol=1e-6
+            )
+        Path.unlink(Path(f"{FILE_PATH}/{filename}"))
+
+
+def test_rechunk_contiguous():
+    """Tests whether contiguously rechunked series are memory-mapped by the
+    DataReader and read back identically.
+    """
+    frames = save_frames(FILENAME)
+    rechunk(FILENAME, FILE_PATH, contiguous=True)
+
+    with h5py.File(f"{FILE_PATH}/{FILENAME}", "r") as file:
+        assert file[DataManager._components["zero_component"]].chunks is None
+        assert file[f"{dmp.OBSERVABLES}/density"].chunks is None
+    with DataReader(FILENAME, FILE_PATH) as reader:
+        assert isinstance(reader.component("zero_component")._array, np.memmap)
+        for frame, expected in zip(reader, frames):
+            for name, data in expected.items():
+                np.testing.assert_array_equal(frame[name], data)
+    with pytest.raises(ValueError):
+        rechunk(FILENAME, FILE_PATH, contiguous=True, compression="gzip")
+
+    Path.unlink(Path(f"{FILE_PATH}/{FILENAME}"))
+
+
+def test_rechunk_missing_file():
+    """Tests whether a failed rechunk leaves no partial output behind."""
+    with pytest.raises(FileNotFoundError):
+        rechunk("missing.hdf5", FILE_PATH)
+    assert not Path(f"{FILE_PATH}/missing.hdf5.rechunk.tmp").exists()
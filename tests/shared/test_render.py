@@ -0,0 +1,144 @@
+from pathlib import Path
+import shutil
+
+import numpy as np
+import pytest
+
+from pygpe.shared.grid import Grid
+from pygpe.shared.render import (
+    _encode_movie,
+    _FrameRenderer,
+    _panel_data,
+    render_frames,
+)
+from pygpe.spinone.data_manager import DataManager
+from pygpe.spinone.data_reader import DataReader
+from pygpe.spinone.wavefunction import SpinOneWavefunction
+
+FILENAME = "render_test.hdf5"
+FILE_PATH = "."
+OUTPUT_DIR = "render_test_frames"
+
+
+def save_frames(num_frames: int) -> None:
+    """Saves a short 2D spin-1 trajectory."""
+    wavefunction = SpinOneWavefunction(Grid((16, 8), (0.5, 0.5)))
+    data = DataManager(FILENAME, FILE_PATH, wavefunction, {})
+    for i in range(num_frames):
+        wavefunction.add_noise("all", 0.0, 1.0)
+        wavefunction.fft()
+        data.save_wavefunction(wavefunction, 0.1 * i, i)
+
+
+def test_render_frames():
+    """Tests whether a numbered image is rendered for every frame."""
+    save_frames(4)
+    with DataReader(FILENAME, FILE_PATH) as reader:
+        images = render_frames(
+            reader, OUTPUT_DIR, ["density", "phase_zero_component"], workers=2
+        )
+
+    assert images == [f"{OUTPUT_DIR}/frame_{i:06d}.png" for i in range(4)]
+    assert all(Path(image).stat().st_size > 0 for image in images)
+
+    shutil.rmtree(OUTPUT_DIR)
+    Path.unlink(Path(f"{FILE_PATH}/{FILENAME}"))
+
+
+def test_panel_data():
+    """Tests whether unsaved observables are computed from the wavefunction,
+    and whether the figure is reused between frames.
+    """
+    save_frames(2)
+    with DataReader(FILENAME, FILE_PATH) as reader:
+        frame = reader[1]
+        spin_z = abs(frame["plus_component"]) ** 2 - abs(frame["minus_component"]) ** 2
+        np.testing.assert_array_almost_equal(_panel_data(reader, "spin_z", 1), spin_z)
+        np.testing.assert_array_equal(
+            _panel_data(reader, "phase", 1), np.angle(frame["plus_component"])
+        )
+        with pytest.raises(ValueError):
+            _panel_data(reader, "vorticity", 1)
+
+        Path(OUTPUT_DIR).mkdir()
+        renderer = _FrameRenderer(["spin_z"], Path(OUTPUT_DIR), {}, 50)
+        renderer(reader, 0)
+        figure = renderer._figure
+        renderer(reader, 1)
+        assert renderer._figure is figure
+
+    shutil.rmtree(OUTPUT_DIR)
+    Path.unlink(Path(f"{FILE_PATH}/{FILENAME}"))
+
+
+
+def test_1d_limits_follow_frames():
+    """Tests whether the y-limits of 1D panels follow the data of each frame,
+    unless fixed.
+    """
+    wavefunction = SpinOneWavefunction(Grid(16, 0.5))
+    data = DataManager(FILENAME, FILE_PATH, wavefunction, {})
+    for amplitude in (1.0, 10.0):
+        wavefunction.plus_component[:] = amplitude
+        wavefunction.fft()
+        data.save_wavefunction(wavefunction)
+
+    with DataReader(FILENAME, FILE_PATH) as reader:
+        Path(OUTPUT_DIR).mkdir()
+        renderer = _FrameRenderer(
+            ["density", "spin_z"], Path(OUTPUT_DIR), {"spin_z": (0, 2)}, 50
+        )
+        renderer(reader, 0)
+        renderer(reader, 1)
+        density_axes, spin_z_axes = renderer._axes
+        assert density_axes.get_ylim()[1] >= 100
+        assert spin_z_axes.get_ylim() == (0, 2)
+
+    shutil.rmtree(OUTPUT_DIR)
+    Path.unlink(Path(f"{FILE_PATH}/{FILENAME}"))
+
+
+def test_panel_data_3d():
+    """Tests whether panels of 3D frames show the middle plane of the last
+    axis, for saved observables and for data computed from the components.
+    """
+    wavefunction = SpinOneWavefunction(Grid((8, 6, 4), (0.5, 0.5, 0.5)))
+    data = DataManager(FILENAME, FILE_PATH, wavefunction, {}, observables=["density"])
+    wavefunction.add_noise("all", 0.0, 1.0)
+    wavefunction.fft()
+    data.save_wavefunction(wavefunction)
+
+    with DataReader(FILENAME, FILE_PATH) as reader:
+        frame = reader[0]
+        np.testing.assert_array_equal(
+            _panel_data(reader, "density", 0), reader.density(0)[..., 2]
+        )
+        np.testing.assert_array_equal(
+            _panel_data(reader, "phase", 0), np.angle(frame["plus_component"][..., 2])
+        )
+        assert _panel_data(reader, "spin_z", 0).shape == (8, 6)
+
+    Path.unlink(Path(f"{FILE_PATH}/{FILENAME}"))
+
+
+def test_encode_movie_only_uses_given_images(monkeypatch):
+    """Tests whether only the images of the current call are encoded, not
+    stale images in the output folder.
+    """
+    Path(OUTPUT_DIR).mkdir()
+    images = []
+    for i in range(3):
+        image = Path(OUTPUT_DIR) / f"frame_{i:06d}.png"
+        image.write_bytes(bytes([i]))
+        images.append(str(image))
+    encoded = []
+
+    def run(command, check):
+        folder = Path(command[command.index("-i") + 1]).parent
+        encoded.extend(path.read_bytes() for path in sorted(folder.iterdir()))
+
+    monkeypatch.setattr("subprocess.run", run)
+    _encode_movie(images[1:], Path("movie.mp4"), 25)
+    assert encoded == [bytes([1]), bytes([2])]
+
+    shutil.rmtree(OUTPUT_DIR)
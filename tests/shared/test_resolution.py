@@ -0,0 +1,49 @@
+import pytest
+
+import pygpe.spinhalf as gpe
+from pygpe.shared.backend import cp
+from pygpe.shared.resolution import resolution_report
+
+
+def gaussian(grid: gpe.Grid, width: float) -> gpe.SpinHalfWavefunction:
+    """A two-component wavefunction with Gaussian components of the given
+    width, with up-to-date Fourier-space components.
+    """
+    profile = cp.exp(-(grid.x_mesh**2 + grid.y_mesh**2) / (2 * width**2))
+    wfn = gpe.SpinHalfWavefunction(grid)
+    wfn.set_wavefunction(
+        profile.astype("complex128"), (profile * cp.exp(1j * grid.x_mesh)) / 2
+    )
+    wfn.fft()
+    return wfn
+
+
+def test_resolved():
+    """Tests whether a smooth wavefunction is resolved, and whether it is
+    still resolved on the suggested smaller grid.
+    """
+    report = resolution_report(gaussian(gpe.Grid((128, 96), (0.25, 0.25)), 2.0))
+    assert report.resolved
+    assert report.norm_fraction < 1e-6
+    assert all(n < m for n, m in zip(report.suggested_points, report.points))
+    assert all(n % 2 == 0 for n in report.suggested_points)
+
+    grid = report.suggested_grid()
+    assert grid.length_x == 32.0
+    assert grid.length_y == 24.0
+    assert resolution_report(gaussian(grid, 2.0)).resolved
+
+
+def test_under_resolved():
+    """Tests whether a wavefunction varying on the scale of the grid spacing
+    is reported, with a warning, as under-resolved.
+    """
+    with pytest.warns(UserWarning):
+        report = resolution_report(gaussian(gpe.Grid((32, 32), (0.5, 0.5)), 0.4))
+    assert not report.resolved
+    assert report.kinetic_fraction > report.tolerance
+    assert report.suggested_points is None
+    assert report.suggested_grid() is None
+
+    with pytest.raises(ValueError):
+        resolution_report(gaussian(gpe.Grid((32, 32), (0.5, 0.5)), 2.0), 1e-6, 1.5)
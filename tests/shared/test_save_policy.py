@@ -0,0 +1,163 @@
+import numpy as np
+from pathlib import Path
+
+import pytest
+
+from pygpe.scalar.data_manager import DataManager
+from pygpe.scalar.data_reader import DataReader
+from pygpe.scalar.wavefunction import ScalarWavefunction
+from pygpe.shared.grid import Grid
+from pygpe.shared.save_policy import (
+    ChangeTriggered,
+    LogSpacedTimes,
+    WallClockInterval,
+)
+
+FILENAME = "save_policy_test.hdf5"
+FILE_PATH = "."
+
+
+def generate_wavefunction() -> ScalarWavefunction:
+    """Generates a uniform 1D scalar wavefunction for use in testing."""
+    wavefunction = ScalarWavefunction(Grid(32, 0.5))
+    wavefunction.set_wavefunction(np.ones(32, dtype="complex128"))
+    wavefunction.fft()
+    return wavefunction
+
+
+def test_log_spaced_times():
+    """Tests whether frames are saved at the first step past each log-spaced
+    time, and their times recorded.
+    """
+    wavefunction = generate_wavefunction()
+    data = DataManager(
+        FILENAME,
+        FILE_PATH,
+        wavefunction,
+        {"dt": 0.1},
+        policies=[LogSpacedTimes(0.1, 10, 3)],
+    )
+    saved = [data.maybe_save(wavefunction, i * 0.1) for i in range(120)]
+
+    assert sum(saved) == 3
+    with DataReader(FILENAME, FILE_PATH) as reader:
+        np.testing.assert_array_almost_equal(reader.times, [0.1, 1.0, 10.0])
+
+    Path.unlink(Path(f"{FILE_PATH}/{FILENAME}"))
+
+
+def test_log_spaced_times_resume():
+    """Tests whether a resumed run continues from the target time after the
+    last saved frame, rather than saving the passed target times again.
+    """
+    wavefunction = generate_wavefunction()
+    data = DataManager(
+        FILENAME,
+        FILE_PATH,
+        wavefunction,
+        {"dt": 0.1},
+        policies=[LogSpacedTimes(0.1, 10, 3)],
+    )
+    for i in range(20):
+        data.maybe_save(wavefunction, i * 0.1)
+
+    data = DataManager(
+        FILENAME,
+        FILE_PATH,
+        wavefunction,
+        {"dt": 0.1},
+        policies=[LogSpacedTimes(0.1, 10, 3)],
+        append=True,
+    )
+    saved = [data.maybe_save(wavefunction, i * 0.1) for i in range(20, 120)]
+
+    assert sum(saved) == 1
+    with DataReader(FILENAME, FILE_PATH) as reader:
+        np.testing.assert_array_almost_equal(reader.times, [0.1, 1.0, 10.0])
+
+    Path.unlink(Path(f"{FILE_PATH}/{FILENAME}"))
+
+
+
+def test_log_spaced_times_untimed_save():
+    """Tests whether a frame saved without a time leaves the log-spaced
+    target times in place.
+    """
+    wavefunction = generate_wavefunction()
+    data = DataManager(
+        FILENAME,
+        FILE_PATH,
+        wavefunction,
+        {"dt": 0.1},
+        policies=[LogSpacedTimes(0.1, 10, 3)],
+    )
+    data.save_wavefunction(wavefunction)
+    saved = [data.maybe_save(wavefunction, i * 0.1) for i in range(120)]
+
+    assert sum(saved) == 3
+    with DataReader(FILENAME, FILE_PATH) as reader:
+        np.testing.assert_array_almost_equal(reader.times[1:], [0.1, 1.0, 10.0])
+
+    Path.unlink(Path(f"{FILE_PATH}/{FILENAME}"))
+
+
+def test_log_spaced_imaginary_times():
+    """Tests whether imaginary times are compared by their magnitude."""
+    wavefunction = generate_wavefunction()
+    data = DataManager(
+        FILENAME,
+        FILE_PATH,
+        wavefunction,
+        {"dt": -1j * 0.1},
+        policies=[LogSpacedTimes(0.1, 10, 3)],
+    )
+    saved = [data.maybe_save(wavefunction, -1j * i * 0.1) for i in range(120)]
+
+    assert sum(saved) == 3
+    with DataReader(FILENAME, FILE_PATH) as reader:
+        np.testing.assert_array_almost_equal(reader.times, [0.1, 1.0, 10.0])
+
+    Path.unlink(Path(f"{FILE_PATH}/{FILENAME}"))
+
+
+def test_maybe_save_without_policies():
+    """Tests whether calling maybe_save without save policies raises an
+    error rather than silently saving nothing.
+    """
+    wavefunction = generate_wavefunction()
+    data = DataManager(FILENAME, FILE_PATH, wavefunction, {})
+    with pytest.raises(ValueError):
+        data.maybe_save(wavefunction, 0.1)
+
+    Path.unlink(Path(f"{FILE_PATH}/{FILENAME}"))
+
+
+def test_change_triggered():
+    """Tests whether frames are only saved when the density has changed by
+    more than the threshold.
+    """
+    wavefunction = generate_wavefunction()
+    data = DataManager(
+        FILENAME,
+        FILE_PATH,
+        wavefunction,
+        {},
+        policies=[ChangeTriggered(0.1)],
+    )
+    assert data.maybe_save(wavefunction, -1j * 0.1)  # The first call always saves
+    assert not data.maybe_save(wavefunction, -1j * 0.2)
+
+    wavefunction.fourier_component *= 1.2
+    assert data.maybe_save(wavefunction, -1j * 0.3)
+
+    with DataReader(FILENAME, FILE_PATH) as reader:
+        np.testing.assert_array_almost_equal(reader.times, [0.1, 0.3])
+
+    Path.unlink(Path(f"{FILE_PATH}/{FILENAME}"))
+
+
+def test_wall_clock_interval():
+    """Tests whether the wall-clock policy only saves after its interval."""
+    wavefunction = generate_wavefunction()
+    assert WallClockInterval(0).should_save(wavefunction, 0)
+    assert not WallClockInterval(3600).should_save(wavefunction, 0)
@@ -0,0 +1,109 @@
+import h5py
+import numpy as np
+import pytest
+from pathlib import Path
+
+import pygpe.shared.data_manager_paths as dmp
+from pygpe.shared.grid import Grid
+from pygpe.shared.sharding import combine_shards, shard_filename
+from pygpe.spinhalf.data_manager import DataManager
+from pygpe.spinhalf.data_reader import DataReader
+from pygpe.spinhalf.wavefunction import SpinHalfWavefunction
+
+FILENAME = "sharded_test.hdf5"
+FILE_PATH = "."
+NUM_SHARDS = 3
+
+
+def generate_shards(num_frames: list[int]) -> list[list[np.ndarray]]:
+    """Writes one spin-1/2 shard file per entry of `num_frames`, each holding
+    the given number of frames.
+
+    :return: The saved plus components of each shard.
+    """
+    saved = []
+    for shard, frames in enumerate(num_frames):
+        wavefunction = SpinHalfWavefunction(Grid((16, 8), (0.5, 0.5)))
+        params = {"g_plus": 1, "g_minus": 1, "g_pm": 0.5, "dt": 1e-2, "t": 0}
+        data = DataManager(FILENAME, FILE_PATH, wavefunction, params, shard=shard)
+
+        saved.append([])
+        for _ in range(frames):
+            plus = np.random.uniform(size=(16, 8)) + 1j * shard
+            wavefunction.set_wavefunction(plus, np.zeros((16, 8), dtype="complex128"))
+            data.save_wavefunction(wavefunction)
+            saved[-1].append(plus)
+
+    return saved
+
+
+def remove_files() -> None:
+    Path.unlink(Path(f"{FILE_PATH}/{FILENAME}"))
+    for shard in range(NUM_SHARDS):
+        Path.unlink(Path(f"{FILE_PATH}/{shard_filename(FILENAME, shard)}"))
+
+
+def test_shard_filename():
+    """Tests whether shard filenames are derived from the combined filename."""
+    assert shard_filename("data.hdf5", 3) == "data_shard0003.hdf5"
+    with pytest.raises(ValueError):
+        shard_filename("data.hdf5", -1)
+
+
+def test_combined_dataset():
+    """Tests whether the master file presents all shards as one dataset."""
+    saved = generate_shards([2, 3, 3])
+    combine_shards(FILENAME, FILE_PATH)
+
+    with h5py.File(f"{FILE_PATH}/{FILENAME}", "r") as file:
+        combined = file[dmp.SPINHALF_WAVEFUNCTION_PLUS]
+        assert combined.is_virtual
+        assert combined.shape == (NUM_SHARDS, 16, 8, 3)
+        assert combined.attrs[dmp.TIME_AXIS] == 3
+        assert len(combined.virtual_sources()) == NUM_SHARDS
+        for shard, frames in enumerate(saved):
+            for index, frame in enumerate(frames):
+                np.testing.assert_array_almost_equal(combined[shard, ..., index], frame)
+        np.testing.assert_array_equal(combined[0, ..., 2], np.zeros((16, 8)))
+
+    with DataReader(FILENAME, FILE_PATH, realisation=1) as reader:
+        assert reader.params["g_pm"] == 0.5
+        np.testing.assert_array_almost_equal(reader[1]["plus_component"], saved[1][1])
+
+    remove_files()
+
+
+
+def test_unequal_shards():
+    """Tests whether each realisation of shards of unequal length holds only
+    its own frames, rather than the zero padding of shorter shards.
+    """
+    saved = generate_shards([3, 1, 2])
+    combine_shards(FILENAME, FILE_PATH)
+
+    for realisation, frames in enumerate(saved):
+        with DataReader(FILENAME, FILE_PATH, realisation=realisation) as reader:
+            assert reader.num_frames == len(frames)
+            assert len(reader.times) == len(frames)
+            np.testing.assert_array_almost_equal(
+                reader[:]["plus_component"], np.stack(frames)
+            )
+            with pytest.raises(IndexError):
+                reader[len(frames)]
+    with DataReader(FILENAME, FILE_PATH) as reader:
+        assert reader.num_frames == 3
+
+    remove_files()
+
+
+def test_mismatched_grids():
+    """Tests whether combining shards with different grids is refused."""
+    generate_shards([1, 1])
+    wavefunction = SpinHalfWavefunction(Grid((8, 8), (0.5, 0.5)))
+    DataManager(FILENAME, FILE_PATH, wavefunction, {"dt": 1e-2}, shard=2)
+
+    with pytest.raises(ValueError):
+        combine_shards(FILENAME, FILE_PATH)
+
+    for shard in range(NUM_SHARDS):
+        Path.unlink(Path(f"{FILE_PATH}/{shard_filename(FILENAME, shard)}"))
@@ -0,0 +1,74 @@
+import h5py
+import numpy as np
+import pytest
+from pathlib import Path
+
+import pygpe.shared.data_manager_paths as dmp
+from pygpe.scalar.data_manager import DataManager
+from pygpe.scalar.data_reader import DataReader
+from pygpe.scalar.wavefunction import ScalarWavefunction
+from pygpe.shared.grid import Grid
+from pygpe.shared.spectral import _energy_cutoff
+
+FILENAME = "spectral_test.hdf5"
+FILE_PATH = "."
+
+
+def generate_band_limited_wavefunction(k_max: float) -> ScalarWavefunction:
+    """Generates a 2D scalar wavefunction containing only modes with wave
+    number at most `k_max`.
+    """
+    wavefunction = ScalarWavefunction(Grid((32, 32), (0.5, 0.5)))
+    rng = np.random.default_rng(1)
+    fourier = rng.normal(size=(32, 32)) + 1j * rng.normal(size=(32, 32))
+    fourier[wavefunction.grid.wave_number > k_max**2] = 0
+    wavefunction.fourier_component = fourier
+    wavefunction.ifft()
+    return wavefunction
+
+
+def test_truncated_frames_are_reconstructed():
+    """Tests whether frames within the cutoff are stored as a smaller box of
+    modes and reconstructed exactly on read.
+    """
+    wavefunction = generate_band_limited_wavefunction(2.0)
+    data = DataManager(FILENAME, FILE_PATH, wavefunction, {"g": 1}, k_cutoff=2.0)
+    data.save_wavefunction(wavefunction)
+
+    with h5py.File(f"{FILE_PATH}/{FILENAME}", "r") as file:
+        dataset = file[dmp.SCALAR_WAVEFUNCTION]
+        assert dataset.attrs[dmp.K_CUTOFF] == 2.0
+        assert dataset.size < 32 * 32 / 4
+
+    with DataReader(FILENAME, FILE_PATH) as reader:
+        np.testing.assert_array_almost_equal(
+            reader[0]["component"], wavefunction.component
+        )
+        np.testing.assert_array_almost_equal(
+            reader.fourier_component("component")[0:1],
+            wavefunction.fourier_component[np.newaxis],
+        )
+
+    Path.unlink(Path(f"{FILE_PATH}/{FILENAME}"))
+
+
+def test_energy_cutoff():
+    """Tests whether the automatic cutoff keeps all modes of a band-limited
+    wavefunction and discards more modes as the tolerance grows.
+    """
+    wavefunction = generate_band_limited_wavefunction(2.0)
+    grid = wavefunction.grid
+    fourier = [wavefunction.fourier_component]
+
+    assert _energy_cutoff(grid, fourier, 0.0) == pytest.approx(
+        np.sqrt(grid.wave_number[grid.wave_number <= 4.0].max())
+    )
+    assert _energy_cutoff(grid, fourier, 0.5) < _energy_cutoff(grid, fourier, 0.0)
+    assert _energy_cutoff(grid, [np.zeros((32, 32))], 0.1) == 0.0
+
+
+def test_negative_cutoff():
+    """Tests whether a negative momentum cutoff raises an error."""
+    wavefunction = generate_band_limited_wavefunction(2.0)
+    with pytest.raises(ValueError):
+        DataManager(FILENAME, FILE_PATH, wavefunction, {"g": 1}, k_cutoff=-1.0)
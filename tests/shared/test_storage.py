@@ -0,0 +1,199 @@
+import json
+import shutil
+import numpy as np
+import pytest
+from pathlib import Path
+
+from pygpe.shared.grid import Grid
+from pygpe.shared.storage import METADATA_FILE
+from pygpe.spinone.data_manager import DataManager
+from pygpe.spinone.data_reader import DataReader
+from pygpe.spinone.wavefunction import SpinOneWavefunction
+
+FILENAME = "storage_test"
+FILE_PATH = "."
+
+
+def generate_parameters() -> dict:
+    """Generates a spin-1 parameters dictionary containing complex and array
+    values.
+    """
+    return {
+        "c0": 10,
+        "c2": -0.5,
+        "p": 0.0,
+        "q": 0.1,
+        "n0": 1.0,
+        "trap": np.linspace(0, 1, 16),
+        "dt": -1j * 1e-2,
+        "t": 0,
+    }
+
+
+def save_frames(backend: str, num_frames: int) -> list[SpinOneWavefunction]:
+    """Saves a short spin-1 trajectory using the specified storage backend.
+
+    :return: Copies of the saved zero components.
+    """
+    params = generate_parameters()
+    wavefunction = SpinOneWavefunction(Grid((16, 4), (0.5, 0.5)))
+    data = DataManager(FILENAME, FILE_PATH, wavefunction, params, backend=backend)
+
+    saved = []
+    for _ in range(num_frames):
+        wavefunction.set_ground_state("polar", params)
+        wavefunction.add_noise("all", 0.0, 1e-2)
+        wavefunction.fft()
+        data.save_wavefunction(wavefunction)
+        saved.append(wavefunction.zero_component.copy())
+    return saved
+
+
+def remove_store() -> None:
+    path = Path(f"{FILE_PATH}/{FILENAME}")
+    if path.is_dir():
+        shutil.rmtree(path)
+    else:
+        Path.unlink(path)
+
+
+@pytest.mark.parametrize("backend", ["hdf5", "memmap", "zarr"])
+def test_round_trip(backend):
+    """Tests whether saved data is read back identically from each backend."""
+    if backend == "zarr":
+        pytest.importorskip("zarr")
+    saved = save_frames(backend, 3)
+
+    with DataReader(FILENAME, FILE_PATH) as reader:
+        assert reader.grid.shape == (16, 4)
+        assert reader.params["dt"] == -1j * 1e-2
+        np.testing.assert_array_equal(reader.params["trap"], np.linspace(0, 1, 16))
+        assert len(reader) == 3
+        np.testing.assert_array_equal(reader[1]["zero_component"], saved[1])
+        np.testing.assert_array_equal(
+            reader[::2]["zero_component"], np.stack(saved[::2])
+        )
+
+    remove_store()
+
+
+
+@pytest.mark.parametrize("backend", ["hdf5", "memmap", "zarr"])
+def test_append(backend):
+    """Tests whether reopening a store in append mode continues after the
+    saved frames, including before any frame was saved.
+    """
+    if backend == "zarr":
+        pytest.importorskip("zarr")
+    params = generate_parameters()
+    wavefunction = SpinOneWavefunction(Grid((16, 4), (0.5, 0.5)))
+    wavefunction.set_ground_state("polar", params)
+    wavefunction.fft()
+    DataManager(FILENAME, FILE_PATH, wavefunction, params, backend=backend)
+
+    for i in range(3):
+        data = DataManager(
+            FILENAME, FILE_PATH, wavefunction, params, backend=backend, append=True
+        )
+        assert data._time_index == i
+        data.save_wavefunction(wavefunction, 0.1 * i, i)
+
+    with DataReader(FILENAME, FILE_PATH) as reader:
+        assert len(reader) == 3
+        np.testing.assert_array_almost_equal(reader.times, [0.0, 0.1, 0.2])
+        np.testing.assert_array_equal(
+            reader[0]["zero_component"], wavefunction.zero_component
+        )
+
+    remove_store()
+
+
+def test_memmap_layout():
+    """Tests whether the memmap backend writes plain, memory-mappable `.npy`
+    files and JSON metadata.
+    """
+    saved = save_frames("memmap", 2)
+
+    store = Path(f"{FILE_PATH}/{FILENAME}")
+    with open(store / METADATA_FILE) as file:
+        metadata = json.load(file)
+    assert metadata["grid"]["nx"] == 16
+    assert metadata["parameters"]["q"] == 0.1
+
+    zero = np.load(store / "wavefunction" / "psi_zero.npy", mmap_mode="r")
+    assert isinstance(zero, np.memmap)
+    np.testing.assert_array_equal(zero, np.stack(saved))
+
+    remove_store()
+
+
+def test_unknown_backend():
+    """Tests whether an unsupported backend raises an error."""
+    wavefunction = SpinOneWavefunction(Grid((16, 4), (0.5, 0.5)))
+    with pytest.raises(ValueError):
+        DataManager(FILENAME, FILE_PATH, wavefunction, {}, backend="netcdf")
+
+
+def test_memmap_observables():
+    """Tests whether observables saved to a memmap store are found by the
+    reader.
+    """
+    wavefunction = SpinOneWavefunction(Grid((16, 4), (0.5, 0.5)))
+    wavefunction.add_noise("all", 0.0, 1.0)
+    wavefunction.fft()
+    data = DataManager(
+        FILENAME,
+        FILE_PATH,
+        wavefunction,
+        generate_parameters(),
+        backend="memmap",
+        observables=["spin_z", "spin_perp"],
+    )
+    data.save_wavefunction(wavefunction)
+
+    with DataReader(FILENAME, FILE_PATH) as reader:
+        assert sorted(reader.observables) == ["spin_perp", "spin_z"]
+        np.testing.assert_allclose(
+            reader.observable("spin_z")[0],
+            abs(wavefunction.plus_component) ** 2
+            - abs(wavefunction.minus_component) ** 2,
+        )
+        assert reader[0]["spin_perp"].dtype == np.float64
+        assert reader.wavefunction(0).atom_num_zero is not None
+
+    remove_store()
+
+
+def test_swmr():
+    """Tests whether frames written in SWMR mode are picked up by a reader
+    following the file while it is written.
+    """
+    params = generate_parameters()
+    wavefunction = SpinOneWavefunction(Grid((16, 4), (0.5, 0.5)))
+    wavefunction.set_ground_state("polar", params)
+    wavefunction.fft()
+
+    with DataManager(FILENAME, FILE_PATH, wavefunction, params, swmr=True) as data:
+        reader = DataReader(FILENAME, FILE_PATH, swmr=True)
+        assert reader.num_frames == 0
+
+        for i in range(2):
+            data.save_wavefunction(wavefunction, 0.1 * i, i)
+        assert list(reader.tail(poll_interval=0.01, timeout=0.05)) == [0, 1]
+
+        data.save_wavefunction(wavefunction, 0.2, 2)
+        assert list(reader.tail(poll_interval=0.01, timeout=0.05, start=2)) == [2]
+        np.testing.assert_array_almost_equal(reader.times, [0.0, 0.1, 0.2])
+        np.testing.assert_array_equal(
+            reader[2]["zero_component"], wavefunction.zero_component
+        )
+        reader.close()
+
+    remove_store()
+
+
+def test_swmr_unsupported_backend():
+    """Tests whether SWMR mode raises an error for directory backends."""
+    wavefunction = SpinOneWavefunction(Grid((16, 4), (0.5, 0.5)))
+    with pytest.raises(ValueError):
+        DataManager(FILENAME, FILE_PATH, wavefunction, {}, backend="memmap", swmr=True)
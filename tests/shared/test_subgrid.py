@@ -0,0 +1,103 @@
+import numpy as np
+import pytest
+from pathlib import Path
+
+from pygpe.scalar.data_manager import DataManager
+from pygpe.scalar.data_reader import DataReader
+from pygpe.scalar.wavefunction import ScalarWavefunction
+from pygpe.shared.grid import Grid
+
+FILENAME = "subgrid_test.hdf5"
+FILE_PATH = "."
+
+
+def generate_wavefunction(points: tuple[int, ...]) -> ScalarWavefunction:
+    """Generates a scalar wavefunction with noise for use in testing."""
+    wavefunction = ScalarWavefunction(Grid(points, (0.5,) * len(points)))
+    wavefunction.set_wavefunction(np.ones(points, dtype="complex128"))
+    wavefunction.add_noise(0.0, 1e-1)
+    wavefunction.fft()
+    return wavefunction
+
+
+def test_plane_region():
+    """Tests whether a plane of a 3D grid is saved along with the coordinates
+    needed to rebuild its grid.
+    """
+    wavefunction = generate_wavefunction((16, 8, 8))
+    data = DataManager(
+        FILENAME,
+        FILE_PATH,
+        wavefunction,
+        {"g": 1},
+        region=(slice(4, 12), slice(None), 3),
+        observables=["density"],
+    )
+    data.save_wavefunction(wavefunction)
+
+    with DataReader(FILENAME, FILE_PATH) as reader:
+        assert reader.full_grid.shape == (16, 8, 8)
+        assert reader.grid.shape == (8, 8)
+        assert reader.origin == (-2.0, -2.0)
+        np.testing.assert_array_equal(
+            reader[0]["component"], wavefunction.component[4:12, :, 3]
+        )
+        np.testing.assert_array_almost_equal(
+            reader.observable("density")[0],
+            abs(wavefunction.component[4:12, :, 3]) ** 2,
+        )
+
+    Path.unlink(Path(f"{FILE_PATH}/{FILENAME}"))
+
+
+def test_stride():
+    """Tests whether strided decimation records the coarser grid spacing."""
+    wavefunction = generate_wavefunction((16, 8))
+    data = DataManager(FILENAME, FILE_PATH, wavefunction, {"g": 1}, stride=(2, 4))
+    data.save_wavefunction(wavefunction)
+
+    with DataReader(FILENAME, FILE_PATH) as reader:
+        assert reader.grid.shape == (8, 2)
+        assert reader.grid.grid_spacing_x == 1.0
+        assert reader.grid.grid_spacing_y == 2.0
+        np.testing.assert_array_equal(
+            reader[0]["component"], wavefunction.component[::2, ::4]
+        )
+
+    Path.unlink(Path(f"{FILE_PATH}/{FILENAME}"))
+
+
+def test_coarsen():
+    """Tests whether Fourier downsampling keeps a band-limited wavefunction
+    exact on the coarse grid.
+    """
+    wavefunction = ScalarWavefunction(Grid(32, 0.5))
+    x = wavefunction.grid.x_mesh
+    wavefunction.set_wavefunction(
+        (1 + 0.5 * np.cos(2 * np.pi * x / 16)).astype("complex128")
+    )
+    wavefunction.fft()
+    data = DataManager(FILENAME, FILE_PATH, wavefunction, {"g": 1}, coarsen=4)
+    data.save_wavefunction(wavefunction)
+
+    with DataReader(FILENAME, FILE_PATH) as reader:
+        assert reader.grid.shape == 8
+        assert reader.grid.grid_spacing_x == 2.0
+        np.testing.assert_array_almost_equal(
+            reader[0]["component"], wavefunction.component[::4]
+        )
+
+    Path.unlink(Path(f"{FILE_PATH}/{FILENAME}"))
+
+
+def test_invalid_subgrids():
+    """Tests whether invalid sub-grid options raise errors."""
+    wavefunction = generate_wavefunction((16, 8))
+    with pytest.raises(ValueError):
+        DataManager(FILENAME, FILE_PATH, wavefunction, {}, region=(slice(None),))
+    with pytest.raises(ValueError):
+        DataManager(FILENAME, FILE_PATH, wavefunction, {}, region=(0, 0))
+    with pytest.raises(ValueError):
+        DataManager(FILENAME, FILE_PATH, wavefunction, {}, stride=2, coarsen=2)
+    with pytest.raises(ValueError):
+        DataManager(FILENAME, FILE_PATH, wavefunction, {}, stride=2, fourier=True)
@@ -0,0 +1,86 @@
+import json
+from pathlib import Path
+
+import pytest
+
+import pygpe.scalar as scalar
+import pygpe.spinone as spinone
+from pygpe.shared.backend import cp
+from pygpe.shared.telemetry import Telemetry
+
+FILENAME = "telemetry_test.hdf5"
+TELEMETRY_FILENAME = "telemetry_test.jsonl"
+FILE_PATH = "."
+
+
+def test_telemetry_file():
+    """Tests whether records are appended to a file every few steps, with
+    the throughput, remaining time, I/O share and conservation drifts.
+    """
+    params = {"c0": 10, "c2": 0.5, "p": 0, "q": 0.1, "trap": 0, "n0": 1}
+    params.update({"dt": 1e-2, "t": 0})
+    wavefunction = spinone.SpinOneWavefunction(spinone.Grid((16, 16), (0.5, 0.5)))
+    wavefunction.set_ground_state("polar", params)
+    wavefunction.add_noise("all", 0.0, 1e-2)
+    wavefunction.fft()
+    data = spinone.DataManager(FILENAME, FILE_PATH, wavefunction, params)
+
+    with Telemetry(
+        TELEMETRY_FILENAME,
+        wavefunction,
+        params,
+        every=5,
+        total_steps=20,
+        data_manager=data,
+        energy=True,
+        magnetisation=True,
+    ) as telemetry:
+        for i in range(20):
+            spinone.step_wavefunction(wavefunction, params)
+            if i % 10 == 0:
+                data.save_wavefunction(wavefunction, params["t"], i)
+            params["t"] += params["dt"]
+            telemetry.update(wavefunction)
+
+    records = [
+        json.loads(line) for line in Path(TELEMETRY_FILENAME).read_text().splitlines()
+    ]
+    assert [record["step"] for record in records] == [5, 10, 15, 20]
+    assert records[-1]["t"] == pytest.approx(0.2)
+    assert records[-1]["eta"] == 0
+    assert all(record["steps_per_second"] > 0 for record in records)
+    assert all(0 <= record["io_fraction"] <= 1 for record in records)
+    assert data.save_time > 0
+    assert set(records[0]["atom_num_drift"]) == {
+        "atom_num_plus",
+        "atom_num_zero",
+        "atom_num_minus",
+    }
+    assert all(abs(record["total_atom_num_drift"]) < 1e-10 for record in records)
+    assert abs(records[-1]["energy_drift"]) < 1e-2
+    assert abs(records[-1]["magnetisation"]) < 1e-2
+
+    Path.unlink(Path(f"{FILE_PATH}/{FILENAME}"))
+    Path.unlink(Path(TELEMETRY_FILENAME))
+
+
+def test_telemetry_callable():
+    """Tests whether records are passed to a callable sink, and whether the
+    magnetisation of a scalar system raises an error.
+    """
+    params = {"g": 1, "trap": 0, "dt": -1j * 1e-2, "t": 0}
+    wavefunction = scalar.ScalarWavefunction(scalar.Grid(64, 0.5))
+    wavefunction.set_wavefunction(cp.ones(64, dtype="complex128"))
+    wavefunction.fft()
+    records = []
+
+    telemetry = Telemetry(records.append, wavefunction, params, every=2)
+    for _ in range(5):
+        scalar.step_wavefunction(wavefunction, params)
+        telemetry.update(wavefunction)
+    assert len(records) == 2
+    assert "eta" not in records[0]
+    assert list(records[0]["atom_num_drift"]) == ["atom_num"]
+
+    with pytest.raises(ValueError):
+        Telemetry(records.append, wavefunction, params, magnetisation=True)
@@ -0,0 +1,140 @@
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+import h5py
+import numpy as np
+import pytest
+
+from pygpe.shared.grid import Grid
+from pygpe.shared.xdmf import write_xdmf
+from pygpe.spinone.data_manager import DataManager
+from pygpe.spinone.data_reader import DataReader
+from pygpe.spinone.wavefunction import SpinOneWavefunction
+
+FILENAME = "xdmf_test.hdf5"
+XDMF_FILENAME = "xdmf_test.xmf"
+FILE_PATH = "."
+
+
+def save_frames(**kwargs) -> None:
+    """Saves three frames of a 3D spin-1 wavefunction with its density."""
+    wavefunction = SpinOneWavefunction(Grid((8, 6, 4), (0.5, 0.5, 1.0)))
+    data = DataManager(
+        FILENAME, FILE_PATH, wavefunction, {}, observables=["density"], **kwargs
+    )
+    for i in range(3):
+        wavefunction.add_noise("all", 0.0, 1.0)
+        wavefunction.fft()
+        data.save_wavefunction(wavefunction, 0.5 * i, i)
+    data.close()
+
+
+def read_hyperslab(hyperslab: ET.Element) -> np.ndarray:
+    """Reads the data referenced by a hyperslab data item of a descriptor."""
+    selection, source = hyperslab
+    start, _, count = np.array(selection.text.split(), dtype=int).reshape(3, -1)
+    filename, path = source.text.split(":")
+    with h5py.File(Path(FILE_PATH) / filename, "r") as file:
+        key = tuple(slice(i, i + n) for i, n in zip(start, count))
+        shape = [int(n) for n in hyperslab.get("Dimensions").split()]
+        return file[path][key].reshape(shape)
+
+
+def test_data_manager_xdmf():
+    """Tests whether the descriptor written while saving describes the grid,
+    frame times and the density of each frame, and matches the descriptor
+    written for the existing file.
+    """
+    save_frames(xdmf=True)
+    descriptor = Path(f"{FILE_PATH}/{XDMF_FILENAME}").read_text()
+
+    frames = ET.fromstring(descriptor).findall("./Domain/Grid/Grid")
+    assert [float(frame.find("Time").get("Value")) for frame in frames] == [
+        0.0,
+        0.5,
+        1.0,
+    ]
+    assert frames[0].find("Topology").get("Dimensions") == "8 6 4"
+    origin, spacings = frames[0].find("Geometry")
+    assert spacings.text.split() == ["0.5", "0.5", "1.0"]
+    assert float(origin.text.split()[0]) == -2.0
+
+    with DataReader(FILENAME, FILE_PATH) as reader:
+        for index, frame in enumerate(frames):
+            hyperslab = frame.find("./Attribute[@Name='density']/DataItem")
+            np.testing.assert_array_equal(
+                read_hyperslab(hyperslab), reader.density(index)
+            )
+
+    assert write_xdmf(FILENAME, FILE_PATH) == Path(f"{FILE_PATH}/{XDMF_FILENAME}")
+    assert Path(f"{FILE_PATH}/{XDMF_FILENAME}").read_text() == descriptor
+
+    Path.unlink(Path(f"{FILE_PATH}/{FILENAME}"))
+    Path.unlink(Path(f"{FILE_PATH}/{XDMF_FILENAME}"))
+
+
+def test_xdmf_every():
+    """Tests whether the descriptor is only written every `xdmf_every` saves
+    and when the DataManager is closed.
+    """
+    xdmf_path = Path(f"{FILE_PATH}/{XDMF_FILENAME}")
+    wavefunction = SpinOneWavefunction(Grid((8, 6, 4), (0.5, 0.5, 1.0)))
+    data = DataManager(
+        FILENAME,
+        FILE_PATH,
+        wavefunction,
+        {},
+        observables=["density"],
+        xdmf=True,
+        xdmf_every=2,
+    )
+    num_frames = []
+    for i in range(3):
+        data.save_wavefunction(wavefunction, 0.5 * i, i)
+        num_frames.append(
+            len(ET.parse(xdmf_path).findall("./Domain/Grid/Grid"))
+            if xdmf_path.exists()
+            else 0
+        )
+    data.close()
+    assert num_frames == [0, 2, 2]
+    assert len(ET.parse(xdmf_path).findall("./Domain/Grid/Grid")) == 3
+
+    Path.unlink(Path(f"{FILE_PATH}/{FILENAME}"))
+    Path.unlink(xdmf_path)
+
+
+def test_region_xdmf():
+    """Tests whether the descriptor of a saved plane describes a 2D grid."""
+    save_frames(region=(slice(None), slice(None), 2))
+    write_xdmf(FILENAME, FILE_PATH)
+
+    frame = ET.parse(f"{FILE_PATH}/{XDMF_FILENAME}").find("./Domain/Grid/Grid")
+    assert frame.find("Topology").get("TopologyType") == "2DCoRectMesh"
+    assert frame.find("Topology").get("Dimensions") == "8 6"
+
+    Path.unlink(Path(f"{FILE_PATH}/{FILENAME}"))
+    Path.unlink(Path(f"{FILE_PATH}/{XDMF_FILENAME}"))
+
+
+
+def test_xdmf_without_saves():
+    """Tests whether the descriptor of a file without saved frames describes
+    no frames, rather than the placeholder frame of its datasets.
+    """
+    wavefunction = SpinOneWavefunction(Grid((8, 6, 4), (0.5, 0.5, 1.0)))
+    DataManager(FILENAME, FILE_PATH, wavefunction, {}, observables=["density"])
+    write_xdmf(FILENAME, FILE_PATH)
+
+    collection = ET.parse(f"{FILE_PATH}/{XDMF_FILENAME}").find("./Domain/Grid")
+    assert collection.findall("Grid") == []
+
+    Path.unlink(Path(f"{FILE_PATH}/{FILENAME}"))
+    Path.unlink(Path(f"{FILE_PATH}/{XDMF_FILENAME}"))
+
+
+def test_xdmf_without_observables():
+    """Tests whether describing a file without observables raises an error."""
+    wavefunction = SpinOneWavefunction(Grid((8, 6, 4), (0.5, 0.5, 1.0)))
+    with pytest.raises(ValueError):
+        DataManager(FILENAME, FILE_PATH, wavefunction, {}, xdmf=True)
@@ -0,0 +1,106 @@
+import numpy as np
+from pathlib import Path
+
+from pygpe.shared.grid import Grid
+from pygpe.spinone.data_manager import DataManager
+from pygpe.spinone.data_reader import DataReader
+from pygpe.spinone.wavefunction import SpinOneWavefunction
+
+FILENAME = "spinone_reader_test.hdf5"
+FILE_PATH = "."
+
+
+def test_spinone_wavefunction_round_trip():
+    """Tests whether a saved spin-1 wavefunction is read back correctly."""
+    params = {"c0": 10, "c2": 0.5, "p": 0.0, "q": 0.0, "n0": 1.0, "dt": 1e-2}
+    wavefunction = SpinOneWavefunction(Grid(64, 0.5))
+    wavefunction.set_ground_state("polar", params)
+    wavefunction.add_noise("all", 0.0, 1e-2)
+    wavefunction.fft()
+
+    data = DataManager(FILENAME, FILE_PATH, wavefunction, params)
+    data.save_wavefunction(wavefunction)
+
+    with DataReader(FILENAME, FILE_PATH) as reader:
+        assert reader.grid.ndim == 1
+        saved = reader.wavefunction(0)
+        for name in ["plus_component", "zero_component", "minus_component"]:
+            np.testing.assert_array_equal(
+                getattr(saved, name), getattr(wavefunction, name)
+            )
+            np.testing.assert_array_equal(
+                reader.component(name)[0], getattr(wavefunction, name)
+            )
+
+    Path.unlink(Path(f"{FILE_PATH}/{FILENAME}"))
+
+
+def test_frame_table():
+    """Tests whether the frame table records the step, time, atom numbers and
+    energy of each frame, and is used to look up frames by time.
+    """
+    params = {"c0": 10, "c2": 0.5, "p": 0.0, "q": 0.0, "trap": 0.0, "dt": 1e-2}
+    wavefunction = SpinOneWavefunction(Grid(64, 0.5))
+    wavefunction.set_ground_state("polar", {"n0": 1.0})
+    wavefunction.fft()
+
+    data = DataManager(FILENAME, FILE_PATH, wavefunction, params, record_energy=True)
+    for step in range(3):
+        data.save_wavefunction(wavefunction, t=step * 0.5, step=10 * step)
+
+    with DataReader(FILENAME, FILE_PATH) as reader:
+        table = reader.frame_table
+        np.testing.assert_array_equal(table["step"], [0, 10, 20])
+        np.testing.assert_array_equal(reader.times, [0.0, 0.5, 1.0])
+        np.testing.assert_array_almost_equal(table["atom_num_zero"], [32.0] * 3)
+        np.testing.assert_array_equal(table["atom_num_plus"], [0.0] * 3)
+        np.testing.assert_array_almost_equal(table["energy"], [160.0] * 3)
+        assert np.all(np.diff(table["wall_time"]) >= 0)
+        assert reader.frame_at(0.6) == 1
+
+    Path.unlink(Path(f"{FILE_PATH}/{FILENAME}"))
+
+
+def max_density(reader: DataReader, index: int) -> float:
+    return float(reader.density(index).max())
+
+
+def test_map_frames():
+    """Tests whether mapping over the frames in parallel matches a serial
+    loop, for both per-frame results and reductions, and whether results are
+    saved to a new dataset.
+    """
+    wavefunction = SpinOneWavefunction(Grid((16, 16), (0.5, 0.5)))
+    data = DataManager(FILENAME, FILE_PATH, wavefunction, {})
+    for _ in range(5):
+        wavefunction.add_noise("all", 0.0, 1.0)
+        wavefunction.fft()
+        data.save_wavefunction(wavefunction)
+
+    with DataReader(FILENAME, FILE_PATH) as reader:
+        expected = [max_density(reader, i) for i in range(5)]
+        assert reader.map_frames(max_density, workers=2) == expected
+        assert reader.map_frames(max_density, workers=1, reduce=max) == max(expected)
+
+        reader.map_frames(max_density, workers=3, output="analysis/max_density")
+        np.testing.assert_array_equal(
+            reader._backend.read_value("analysis/max_density"), expected
+        )
+        assert len(reader) == 5
+
+    Path.unlink(Path(f"{FILE_PATH}/{FILENAME}"))
+
+
+def test_map_frames_without_saves():
+    """Tests whether mapping over a file without saved frames gives an empty
+    result, or the initial value of a reduction.
+    """
+    wavefunction = SpinOneWavefunction(Grid((16, 16), (0.5, 0.5)))
+    DataManager(FILENAME, FILE_PATH, wavefunction, {})
+
+    with DataReader(FILENAME, FILE_PATH) as reader:
+        assert reader.map_frames(max_density, workers=2) == []
+        assert reader.map_frames(max_density, workers=2, reduce=max) is None
+        assert reader.map_frames(max_density, reduce=max, initial=0.0) == 0.0
+
+    Path.unlink(Path(f"{FILE_PATH}/{FILENAME}"))
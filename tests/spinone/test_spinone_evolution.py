@@ -1,4 +1,5 @@
 import numpy as np
+import pytest
 
 import pygpe.spinone.evolution as evo
 from pygpe.shared.grid import Grid
@@ -60,3 +61,26 @@ def test_atom_number():
     wavefunction.set_ground_state("polar", params={"n0": 1.0})
 
     assert evo._calculate_atom_num(wavefunction) == 1024
+
+
+def test_energy():
+    """Tests whether the energy of a uniform polar state is purely from the
+    density interaction, and is conserved during real time evolution.
+    """
+    params = {"c0": 10, "c2": -0.5, "p": 0.0, "q": 0.5, "trap": 0.0, "dt": 1e-2}
+    wavefunction = SpinOneWavefunction(Grid((64, 64), (0.5, 0.5)))
+    wavefunction.set_ground_state("polar", params={"n0": 1.0})
+    wavefunction.fft()
+
+    assert evo._calculate_energy(wavefunction, params) == 0.5 * params["c0"] * 1024
+
+    wavefunction.add_noise("all", 0.0, 1e-2)
+    wavefunction.fft()
+    initial_energy = evo._calculate_energy(wavefunction, params)
+    for _ in range(50):
+        evo.step_wavefunction(wavefunction, params)
+    wavefunction.ifft()
+
+    assert evo._calculate_energy(wavefunction, params) == pytest.approx(
+        initial_energy, rel=1e-4
+    )
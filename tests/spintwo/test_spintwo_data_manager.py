@@ -1,5 +1,7 @@
+import shutil
 import h5py
 import numpy as np
+import pytest
 from pathlib import Path
 
 import pygpe.shared.data_manager_paths as dmp
@@ -106,3 +108,84 @@ def test_correct_wavefunction():
         )
 
     Path.unlink(Path(f"{FILE_PATH}/{FILENAME}"))
+
+
+def test_observables_only():
+    """Tests whether observables are saved as real-valued datasets in place of
+    the wavefunction components.
+    """
+    wavefunction = generate_wavefunction((16, 16))
+    wavefunction.add_noise("all", 0.0, 1.0)
+    wavefunction.fft()
+    data = DataManager(
+        FILENAME,
+        FILE_PATH,
+        wavefunction,
+        generate_parameters(),
+        observables=["density", "singlet_amplitude"],
+        save_components=False,
+        observable_dtype="float32",
+    )
+    data.save_wavefunction(wavefunction)
+
+    singlet = (
+        wavefunction.zero_component**2
+        - 2 * wavefunction.plus1_component * wavefunction.minus1_component
+        + 2 * wavefunction.plus2_component * wavefunction.minus2_component
+    ) / np.sqrt(5)
+    with h5py.File(f"{FILE_PATH}/{FILENAME}", "r") as file:
+        assert dmp.SPIN2_WAVEFUNCTION_ZERO not in file
+        saved_singlet = file[f"{dmp.OBSERVABLES}/singlet_amplitude"]
+        assert saved_singlet.dtype == np.float32
+        np.testing.assert_allclose(saved_singlet[..., 0], abs(singlet), rtol=1e-5)
+        np.testing.assert_allclose(
+            file[f"{dmp.OBSERVABLES}/density"][..., 0],
+            sum(
+                abs(getattr(wavefunction, name)) ** 2
+                for name in DataManager._components
+            ),
+            rtol=1e-5,
+        )
+
+    Path.unlink(Path(f"{FILE_PATH}/{FILENAME}"))
+
+
+def test_unsupported_observable():
+    """Tests whether an unsupported observable raises an error."""
+    with pytest.raises(ValueError):
+        DataManager(
+            FILENAME,
+            FILE_PATH,
+            generate_wavefunction(),
+            generate_parameters(),
+            observables=["vorticity"],
+        )
+
+
+def test_memmap_with_energy():
+    """Tests whether the wide spin-2 frame table, recording the energy, is
+    written to memory-mappable `.npy` files by the memmap backend.
+    """
+    wavefunction = generate_wavefunction((16, 16))
+    wavefunction.add_noise("all", 0.0, 1.0)
+    wavefunction.fft()
+    params = {**generate_parameters(), "trap": 0.0}
+    data = DataManager(
+        "spintwo_test",
+        FILE_PATH,
+        wavefunction,
+        params,
+        backend="memmap",
+        record_energy=True,
+    )
+    for i in range(2):
+        data.save_wavefunction(wavefunction, 0.1 * i, i)
+
+    store = Path(f"{FILE_PATH}/spintwo_test")
+    frames = np.load(store / f"{dmp.FRAMES}.npy", mmap_mode="r")
+    assert isinstance(frames, np.memmap)
+    np.testing.assert_array_equal(frames["step"], [0, 1])
+    zero = np.load(store / f"{dmp.SPIN2_WAVEFUNCTION_ZERO}.npy", mmap_mode="r")
+    np.testing.assert_array_equal(zero[1], wavefunction.zero_component)
+
+    shutil.rmtree(store)